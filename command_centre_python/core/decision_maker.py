@@ -1,31 +1,70 @@
 import ell
 from .models import ActionPlan, ActionStep
 from .entities import DataEntry
-from typing import Dict, Any
+from .priority_scheduler import PriorityScheduler
+from ..utils.llm_gateway import default_gateway
+from ..utils.llm_cascade import ModelCascade
+from typing import Dict, Any, Optional
 import asyncio
+import json
 
 # Initialize EllAI
 ell.init(store="./ell_logs", autocommit=True)
 
+# Action plans run most urgent first once the workers are saturated
+action_scheduler = PriorityScheduler()
+
+
+PLAN_SYSTEM = (
+    "You are an AI assistant that creates detailed action plans based on the given data and context.\n"
+    "Provide a structured plan with steps and considerations.\n"
+    f"Reply with a JSON object matching this schema: {json.dumps(ActionPlan.model_json_schema())}"
+)
+
+# Plans that do not parse, have no steps, or that the provider flags, escalate
+# to the large model
+planning_cascade = ModelCascade(default_gateway, ["gpt-4o-mini", "gpt-4"])
+
+
+def parse_action_plan_response(text: str) -> Optional[ActionPlan]:
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        return ActionPlan.model_validate_json(text[start : end + 1])
+    except ValueError:
+        return None
+
+
+def is_usable_action_plan(text: str) -> bool:
+    """A plan parses as an ``ActionPlan`` and has at least one step."""
+    action_plan = parse_action_plan_response(text)
+    return action_plan is not None and bool(action_plan.steps)
+
 
-@ell.complex(model="gpt-4", response_format=ActionPlan)
 async def plan_action(data_entry: DataEntry, metadata: Dict[str, Any]) -> ActionPlan:
-    """
-    You are an AI assistant that creates detailed action plans based on the given data and context.
-    Provide a structured plan with steps and considerations.
-    """
-    return f"Data: {data_entry.data}\nMetadata: {metadata}\nPlan an appropriate course of action."
+    response = await planning_cascade.complete(
+        PLAN_SYSTEM,
+        f"Data: {data_entry.data}\nMetadata: {metadata}\nPlan an appropriate course of action.",
+        validate=is_usable_action_plan,
+        # Confidence is the first token's probability, which for a JSON plan
+        # is the opening brace; plan quality is judged by validate instead.
+        min_confidence=0.0,
+    )
+    action_plan = parse_action_plan_response(response.text)
+    if action_plan is None or not action_plan.steps:
+        raise ValueError(f"{response.model} did not return a valid action plan")
+    return action_plan
 
 
 async def determine_best_action(data_entry: DataEntry, metadata: Dict[str, Any]):
-    # Use EllAI to get a structured action plan
-    plan_message = await plan_action(data_entry, metadata)
-    action_plan = plan_message.parsed  # This is an instance of ActionPlan
+    # Get a structured action plan from the model cascade
+    action_plan = await plan_action(data_entry, metadata)
 
     # Review the plan (you might add human approval here if needed)
     approved = await review_action_plan(action_plan)
     if approved:
-        await execute_action_plan(action_plan, data_entry, metadata)
+        await schedule_action_plan(action_plan, data_entry, metadata)
     else:
         print("Action plan was not approved.")
 
@@ -36,6 +75,16 @@ async def review_action_plan(action_plan: ActionPlan) -> bool:
     return True
 
 
+async def schedule_action_plan(
+    action_plan: ActionPlan, data_entry: DataEntry, metadata: Dict[str, Any]
+):
+    """Execute an action plan through the scheduler at the plan's priority."""
+    await action_scheduler.run(
+        action_plan.priority,
+        lambda: execute_action_plan(action_plan, data_entry, metadata),
+    )
+
+
 async def execute_action_plan(
     action_plan: ActionPlan, data_entry: DataEntry, metadata: Dict[str, Any]
 ):
@@ -2,9 +2,9 @@ from __future__ import annotations
 from datetime import datetime
 from typing import ClassVar, Optional, Dict, Any, Literal, List
 from pydantic import Field
-from sqlmodel import SQLModel, Field as SQLField, Relationship
+from sqlmodel import SQLModel, Field as SQLField, Relationship, select
 
-from .db import SQLModelBase
+from .db import SQLModelBase, async_session
 
 
 class EntityBase(SQLModelBase, table=True):
@@ -31,12 +31,25 @@ class DataEntry(EntityBase, table=True):
     )
     data_source: Optional["DataSource"] = Relationship(back_populates="data_entries")
     data: Dict[str, Any] = Field(default_factory=dict)
+    # Bumped on every save; drives incremental semantic trigger evaluation.
+    updated_at: datetime = SQLField(default_factory=datetime.utcnow, index=True)
 
     async def save(self):
+        self.updated_at = datetime.utcnow()
         await super().save()
         # Notify the dispatcher about the new data
         await semantic_dispatcher.monitor_data_sources()
 
+    @classmethod
+    async def changed_since(cls, since: Optional[datetime]) -> List["DataEntry"]:
+        """Entries modified at or after ``since``, oldest first."""
+        statement = select(cls).order_by(cls.updated_at, cls.id)
+        if since is not None:
+            statement = statement.where(cls.updated_at >= since)
+        async with async_session() as session:
+            result = await session.execute(statement)
+            return list(result.scalars().all())
+
 
 class Event(EntityBase, table=True):
     __tablename__ = "events"
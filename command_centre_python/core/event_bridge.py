@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from collections import deque
+from threading import Lock
+from typing import Any, Awaitable, Callable, Deque, List
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadSafeEventBridge:
+    """Hands events from foreign threads to an asyncio event loop.
+
+    ``submit`` never blocks: the event is appended to a pending deque and at
+    most one ``call_soon_threadsafe`` wakeup is scheduled until the loop has
+    drained it, so a burst of events from many producer threads costs a
+    single loop wakeup and is handed to ``deliver_many`` as one batch. When
+    ``max_pending`` events are already waiting the oldest one is dropped and
+    counted in ``dropped``.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        deliver_many: Callable[[List[Any]], Awaitable[None]],
+        max_pending: int = 10000,
+    ):
+        self.loop = loop
+        self.deliver_many = deliver_many
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.wakeups = 0
+        self._pending: Deque[Any] = deque()
+        self._wakeup_scheduled = False
+        self._lock = Lock()
+
+    def submit(self, event: Any):
+        self.submit_many([event])
+
+    def submit_many(self, events: List[Any]):
+        with self._lock:
+            self._pending.extend(events)
+            overflow = len(self._pending) - self.max_pending
+            for _ in range(max(overflow, 0)):
+                self._pending.popleft()
+            self.dropped += max(overflow, 0)
+            schedule_wakeup = not self._wakeup_scheduled
+            self._wakeup_scheduled = True
+        if overflow > 0:
+            logger.warning(f"Event bridge overflow, dropped {overflow} pending events")
+        if not schedule_wakeup:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._drain)
+        except RuntimeError:
+            # The loop is closed; nothing will ever drain the events.
+            with self._lock:
+                self._wakeup_scheduled = False
+            logger.error("Event bridge loop is closed, events were not delivered")
+
+    def _drain(self):
+        with self._lock:
+            self._wakeup_scheduled = False
+            batch = list(self._pending)
+            self._pending.clear()
+        if batch:
+            self.wakeups += 1
+            self.loop.create_task(self._deliver_batch(batch))
+
+    async def _deliver_batch(self, batch: List[Any]):
+        try:
+            await self.deliver_many(batch)
+        except Exception as e:
+            logger.error(f"Error delivering {len(batch)} bridged events: {e}")
@@ -0,0 +1,318 @@
+import importlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Frame header: payload length, CRC32 of the payload, record offset.
+FRAME_HEADER = struct.Struct("<IIQ")
+# Payload prefix: length of the event type name that precedes the body.
+TYPE_NAME_LENGTH = struct.Struct("<H")
+
+SEGMENT_SUFFIX = ".log"
+OFFSETS_FILE = "offsets.json"
+
+_event_classes: Dict[str, type] = {}
+
+
+def event_type_name(event_class: type) -> str:
+    return f"{event_class.__module__}:{event_class.__qualname__}"
+
+
+def resolve_event_type(type_name: str) -> type:
+    event_class = _event_classes.get(type_name)
+    if event_class is None:
+        module_name, qualname = type_name.split(":", 1)
+        event_class = importlib.import_module(module_name)
+        for attr in qualname.split("."):
+            event_class = getattr(event_class, attr)
+        _event_classes[type_name] = event_class
+    return event_class
+
+
+def encode_event(event: Any) -> Tuple[str, bytes]:
+    """Serialize an event to its type name and a JSON body."""
+    if hasattr(event, "model_dump_json"):
+        body = event.model_dump_json().encode()
+    else:
+        body = json.dumps(vars(event), default=str).encode()
+    return event_type_name(event.__class__), body
+
+
+def decode_event(type_name: str, body: bytes) -> Any:
+    event_class = resolve_event_type(type_name)
+    if hasattr(event_class, "model_validate_json"):
+        return event_class.model_validate_json(body)
+    event = event_class.__new__(event_class)
+    event.__dict__.update(json.loads(body))
+    return event
+
+
+class _Segment:
+    def __init__(self, path: str, base_offset: int, size: int):
+        self.path = path
+        self.base_offset = base_offset
+        self.position = 0
+        self.next_offset = base_offset
+        self._file = open(path, "r+b" if os.path.exists(path) else "w+b")
+        if os.fstat(self._file.fileno()).st_size < size:
+            self._file.truncate(size)
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.map = mmap.mmap(self._file.fileno(), self.size)
+
+    def recover(self):
+        """Find the end of the last intact frame after a restart."""
+        for offset, _, _, end in scan_frames(self.map, self.base_offset, self.size):
+            self.next_offset = offset + 1
+            self.position = end
+
+    def fits(self, frame_size: int) -> bool:
+        return self.position + frame_size <= self.size
+
+    def write(self, frame: bytes):
+        self.map[self.position : self.position + len(frame)] = frame
+        self.position += len(frame)
+        self.next_offset += 1
+
+    def flush(self):
+        self.map.flush()
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self._file.close()
+
+
+def scan_frames(
+    buffer: Any, expected_offset: int, limit: int
+) -> Iterator[Tuple[int, str, bytes, int]]:
+    """Yield ``(offset, type_name, body, end_position)`` for intact frames.
+
+    Scanning stops at the first frame that is empty, torn, fails its CRC or
+    does not carry the next expected offset.
+    """
+    position = 0
+    while position + FRAME_HEADER.size <= limit:
+        length, crc, offset = FRAME_HEADER.unpack_from(buffer, position)
+        start = position + FRAME_HEADER.size
+        end = start + length
+        if length == 0 or end > limit or offset != expected_offset:
+            return
+        payload = bytes(buffer[start:end])
+        if zlib.crc32(payload) != crc:
+            return
+        (name_length,) = TYPE_NAME_LENGTH.unpack_from(payload)
+        name_end = TYPE_NAME_LENGTH.size + name_length
+        type_name = payload[TYPE_NAME_LENGTH.size : name_end].decode()
+        yield offset, type_name, payload[name_end:], end
+        expected_offset += 1
+        position = end
+
+
+class EventLog:
+    """Append-only, segmented, memory-mapped journal of dispatched events.
+
+    Records get consecutive offsets and are written straight into a
+    preallocated, memory-mapped segment file; when a segment is full a new
+    one named after its first offset is started. A background thread flushes
+    the active segment to disk every ``flush_interval`` seconds, or as soon as
+    ``group_commit_size`` records are pending, so many appends share one
+    ``msync``. ``committed_offset`` is the offset below which every record is
+    known to be on disk. A full segment is handed to the flusher, which
+    flushes and closes it, so no segment is closed while it is being flushed.
+
+    Consumers record how far they got with ``commit_offset`` and resume from
+    ``consumer_offset``; ``read`` replays records from any offset.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 64 * 1024 * 1024,
+        flush_interval: float = 0.05,
+        group_commit_size: int = 1000,
+    ):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.flush_interval = flush_interval
+        self.group_commit_size = group_commit_size
+        self.committed_offset = 0
+        self._lock = threading.Lock()
+        self._flush_requested = threading.Condition(self._lock)
+        # Serializes flushes; always taken before ``_lock``.
+        self._flush_lock = threading.Lock()
+        # Full segments not yet flushed and closed, owned by whoever takes them.
+        self._retired: List[_Segment] = []
+        self._pending = 0
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+        self._offsets: Dict[str, int] = self._load_offsets()
+        bases = self._segment_bases()
+        self._active = self._open_segment(bases[-1] if bases else 0)
+        self._active.recover()
+        self.committed_offset = self._active.next_offset
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    @property
+    def next_offset(self) -> int:
+        return self._active.next_offset
+
+    def _segment_path(self, base_offset: int) -> str:
+        return os.path.join(self.directory, f"{base_offset:020d}{SEGMENT_SUFFIX}")
+
+    def _segment_bases(self) -> List[int]:
+        return sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _open_segment(self, base_offset: int) -> _Segment:
+        return _Segment(self._segment_path(base_offset), base_offset, self.segment_size)
+
+    def append(self, event: Any) -> int:
+        """Journal an event and return its offset."""
+        return self.append_many([event])[0]
+
+    def append_many(self, events: List[Any]) -> List[int]:
+        encoded = [encode_event(event) for event in events]
+        offsets = []
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EventLog is closed")
+            for type_name, body in encoded:
+                offsets.append(self._write(type_name, body))
+            self._pending += len(encoded)
+            if self._pending >= self.group_commit_size:
+                self._flush_requested.notify()
+        return offsets
+
+    def _write(self, type_name: str, body: bytes) -> int:
+        name = type_name.encode()
+        payload = TYPE_NAME_LENGTH.pack(len(name)) + name + body
+        offset = self._active.next_offset
+        frame = FRAME_HEADER.pack(len(payload), zlib.crc32(payload), offset) + payload
+        if not self._active.fits(len(frame)) and self._active.position > 0:
+            self._retired.append(self._active)
+            self._active = self._open_segment(offset)
+        if not self._active.fits(len(frame)):
+            raise ValueError(f"Event of {len(frame)} bytes does not fit in a segment")
+        self._active.write(frame)
+        return offset
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                if not self._closed and self._pending < self.group_commit_size:
+                    self._flush_requested.wait(self.flush_interval)
+                if self._closed:
+                    return
+                if not self._pending:
+                    continue
+            with self._flush_lock:
+                with self._lock:
+                    if self._closed:
+                        return
+                    retired, self._retired = self._retired, []
+                    segment = self._active
+                    target_offset = segment.next_offset
+                    self._pending = 0
+                # msync outside the lock so appends keep flowing during the
+                # flush. A rollover meanwhile only retires the segment, and
+                # close() waits for the flush lock, so it stays open.
+                for old in retired:
+                    old.close()
+                segment.flush()
+                with self._lock:
+                    self.committed_offset = max(self.committed_offset, target_offset)
+
+    def _flush_locked(self):
+        retired, self._retired = self._retired, []
+        for old in retired:
+            old.close()
+        self._active.flush()
+        self._pending = 0
+        self.committed_offset = self._active.next_offset
+
+    def flush(self):
+        """Force every appended record to disk."""
+        with self._flush_lock, self._lock:
+            self._flush_locked()
+
+    def read(self, from_offset: int = 0) -> Iterator[Tuple[int, Any]]:
+        """Replay ``(offset, event)`` pairs starting at ``from_offset``."""
+        for offset, type_name, body in self.read_raw(from_offset):
+            yield offset, decode_event(type_name, body)
+
+    def read_raw(self, from_offset: int = 0) -> Iterator[Tuple[int, str, bytes]]:
+        with self._lock:
+            bases = self._segment_bases()
+            end_offset = self._active.next_offset
+        start = 0
+        for index, base in enumerate(bases):
+            if base <= from_offset:
+                start = index
+        for base in bases[start:]:
+            with open(self._segment_path(base), "rb") as segment_file:
+                size = os.fstat(segment_file.fileno()).st_size
+                if size == 0:
+                    continue
+                with mmap.mmap(
+                    segment_file.fileno(), size, access=mmap.ACCESS_READ
+                ) as segment_map:
+                    for offset, type_name, body, _ in scan_frames(
+                        segment_map, base, size
+                    ):
+                        if offset >= end_offset:
+                            return
+                        if offset >= from_offset:
+                            yield offset, type_name, body
+
+    def consumer_offset(self, consumer: str) -> int:
+        return self._offsets.get(consumer, 0)
+
+    def commit_offset(self, consumer: str, offset: int):
+        """Record that ``consumer`` has processed every record below ``offset``."""
+        with self._lock:
+            self._offsets = {**self._offsets, consumer: offset}
+            path = os.path.join(self.directory, OFFSETS_FILE)
+            with open(path + ".tmp", "w") as f:
+                json.dump(self._offsets, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+
+    def _load_offsets(self) -> Dict[str, int]:
+        path = os.path.join(self.directory, OFFSETS_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def truncate_before(self, offset: int):
+        """Delete whole segments that only hold records below ``offset``."""
+        with self._lock:
+            bases = self._segment_bases()
+            open_bases = {self._active.base_offset}
+            open_bases.update(segment.base_offset for segment in self._retired)
+            for base, next_base in zip(bases, bases[1:]):
+                if next_base <= offset and base not in open_bases:
+                    os.remove(self._segment_path(base))
+                    logger.info(f"Removed event log segment starting at {base}")
+
+    def close(self):
+        with self._flush_lock, self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            self._flush_requested.notify()
+        self._flusher.join()
+        self._active.close()
@@ -1,81 +1,572 @@
+import asyncio
+import inspect
 import logging
-from typing import Dict, List, Callable, Type, Optional
+from typing import Dict, List, Callable, Type, Optional, Literal, Tuple, Union
 from pydantic import Field
 from threading import Lock
 
-from .entities import EntityBase
+from .entities import EntityBase, DataEntry
+from .event_bridge import ThreadSafeEventBridge
+from .event_log import EventLog
+from .event_transport import EventTransport
+from .priority_scheduler import DEFAULT_PRIORITY, PriorityScheduler
 
 logger = logging.getLogger(__name__)
 
 
+BackpressurePolicy = Literal["block", "drop_oldest", "reject"]
+BulkheadPolicy = Literal["wait", "reject"]
+ListenerKey = Union[str, type]
+
+WILDCARD = "*"
+
+
 class Event:
     """Base class for all events."""
 
     pass
 
 
+class EventQueueFull(Exception):
+    """Raised when a queued event is rejected because its queue is full."""
+
+    pass
+
+
+def listener_key_matches(key: ListenerKey, event_class: type) -> bool:
+    """Whether listeners registered under ``key`` receive ``event_class`` events.
+
+    A key is an event class (matching it and its subclasses), a class name
+    (matching any class of that name in the MRO), ``"*"`` (every event) or a
+    module prefix such as ``"command_centre_python.modules.calendar.*"``.
+    """
+    if isinstance(key, type):
+        return issubclass(event_class, key)
+    if key == WILDCARD:
+        return True
+    if key.endswith(".*"):
+        module = event_class.__module__
+        return module == key[:-2] or module.startswith(key[:-1])
+    return any(cls.__name__ == key for cls in event_class.__mro__)
+
+
+class ListenerPolicy:
+    """Timeout, bulkhead and failure accounting for a single listener.
+
+    With ``max_concurrency`` set, the ``"wait"`` bulkhead queues extra calls
+    on a semaphore and ``"reject"`` skips them, counting each in ``rejected``.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        batch: bool = False,
+        bulkhead: BulkheadPolicy = "wait",
+    ):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.batch = batch
+        self.bulkhead = bulkhead
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_key: Optional[Tuple[asyncio.AbstractEventLoop, int]] = None
+
+    def semaphore(self) -> asyncio.Semaphore:
+        """The bulkhead semaphore for the running loop and current limit."""
+        key = (asyncio.get_running_loop(), self.max_concurrency)
+        if self._semaphore is None or self._semaphore_key != key:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_key = key
+        return self._semaphore
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+        }
+
+
 class EventManager:
-    """Centralized event management system."""
+    """Centralized event management system.
+
+    By default events are delivered inline: ``dispatch`` awaits every
+    listener before returning. With ``queued=True`` each event type gets its
+    own bounded ``asyncio.Queue`` drained by ``consumers_per_type`` consumer
+    tasks, so ``dispatch`` only waits for the enqueue and ``backpressure``
+    decides what happens when a queue is full:
+
+    - ``"block"``: wait for room in the queue.
+    - ``"drop_oldest"``: discard the oldest queued event to make room.
+    - ``"reject"``: raise ``EventQueueFull``.
+
+    With ``fan_out=True`` the listeners of an event run concurrently instead
+    of one after another. Every listener call is bounded by its own timeout
+    (``listener_timeout`` unless overridden in ``add_listener``) and, when
+    ``max_concurrency`` is set, by a bulkhead that lets at most that many
+    invocations of the listener run at once. Extra calls wait their turn, or
+    are skipped and counted when the listener's ``bulkhead`` is ``"reject"``.
+
+    ``dispatch_many`` delivers a burst of events in one pass: routing is
+    resolved once per event class, listeners registered with ``batch=True``
+    receive the whole list of events of a class in a single call and the
+    others are called once per event. Queue consumers drain up to
+    ``max_batch_size`` queued events at a time the same way.
+
+    When a ``journal`` (an ``EventLog``) is given, every dispatched event is
+    appended to it before delivery, and ``replay`` re-drives listeners from
+    any journal offset.
+
+    When a ``transport`` is given, dispatched events are published to it
+    instead of being delivered directly; ``start`` subscribes this manager
+    to the transport, which then delivers its share of the stream. With a
+    ``BrokerTransport`` several backend nodes can share one trigger stream.
+
+    When a ``scheduler`` is given, listener execution goes through it at the
+    event's ``priority`` (the most urgent one for a batch), so urgent events
+    overtake a backlog of low-priority ones once the workers are saturated.
 
-    listeners: Dict[str, List[Callable[[Event], None]]] = Field(default_factory=dict)
-    triggers: List["Trigger"] = Field(default_factory=list)
+    Listeners are keyed by anything ``listener_key_matches`` understands. The
+    listeners for a concrete event class are resolved once by walking its MRO
+    and cached in a routing table, so dispatch costs a single dict lookup;
+    ``add_listener`` and ``remove_listener`` only evict the routes their key
+    matches.
+
+    The listener, route and trigger registries are copy-on-write: writers
+    build a new tuple or dict under ``_lock`` and publish it with a single
+    attribute assignment, so dispatch reads them without taking the lock.
+    Published registries must never be mutated in place.
+    """
+
+    listeners: Dict[ListenerKey, Tuple[Callable[[Event], None], ...]] = Field(
+        default_factory=dict
+    )
+    triggers: Tuple["Trigger", ...] = Field(default_factory=tuple)
     _lock: Lock = Lock()
 
-    def __init__(self):
+    def __init__(
+        self,
+        queued: bool = False,
+        max_queue_size: int = 1000,
+        consumers_per_type: int = 1,
+        backpressure: BackpressurePolicy = "block",
+        fan_out: bool = False,
+        listener_timeout: Optional[float] = None,
+        max_batch_size: int = 100,
+        journal: Optional[EventLog] = None,
+        transport: Optional[EventTransport] = None,
+        scheduler: Optional[PriorityScheduler] = None,
+    ):
         self.listeners = {}
-        self.triggers = []
+        self.triggers = ()
         self._lock = Lock()
+        self.queued = queued
+        self.max_queue_size = max_queue_size
+        self.consumers_per_type = consumers_per_type
+        self.backpressure = backpressure
+        self.fan_out = fan_out
+        self.listener_timeout = listener_timeout
+        self.max_batch_size = max_batch_size
+        self.journal = journal
+        self.transport = transport
+        self.scheduler = scheduler
+        self.listener_policies: Dict[Callable, ListenerPolicy] = {}
+        self._routes: Dict[type, Tuple[Callable[[Event], None], ...]] = {}
+        self.dropped_events: Dict[str, int] = {}
+        self._queues: Dict[type, asyncio.Queue] = {}
+        self._consumers: List[asyncio.Task] = []
+        self._bridge: Optional[ThreadSafeEventBridge] = None
+        self._warned_unbound = False
 
     def register_trigger(self, trigger: "Trigger"):
         with self._lock:
-            self.triggers.append(trigger)
-            trigger.dispatcher.event_manager = self  # Pass the EventManager instance
-            trigger.dispatcher.start()
+            self.triggers = self.triggers + (trigger,)
+            dispatcher = trigger.dispatcher
+            dispatcher.event_manager = self  # Pass the EventManager instance
+            # One dispatcher serves all of its triggers; start it with the first.
+            first = not len(dispatcher.trigger_index)
+            dispatcher.add_trigger(trigger)
+            if first:
+                dispatcher.start()
             logger.info(f"Registered trigger: {trigger}")
 
     def unregister_trigger(self, trigger: "Trigger"):
         with self._lock:
-            trigger.dispatcher.stop()
-            self.triggers.remove(trigger)
+            dispatcher = trigger.dispatcher
+            dispatcher.remove_trigger(trigger)
+            # Keep delivering for the dispatcher's other triggers.
+            if not len(dispatcher.trigger_index):
+                dispatcher.stop()
+            triggers = list(self.triggers)
+            triggers.remove(trigger)
+            self.triggers = tuple(triggers)
             logger.info(f"Unregistered trigger: {trigger}")
 
-    def add_listener(self, event_type: str, callback: Callable[[Event], None]):
+    def triggers_for(self, event: Event) -> List["Trigger"]:
+        """The registered triggers a trigger event matched, from its ``trigger_ids``."""
+        trigger_ids = set(getattr(event, "trigger_ids", ()))
+        return [trigger for trigger in self.triggers if id(trigger) in trigger_ids]
+
+    def add_listener(
+        self,
+        event_type: ListenerKey,
+        callback: Callable[[Event], None],
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        batch: bool = False,
+        bulkhead: Optional[BulkheadPolicy] = None,
+    ):
         with self._lock:
-            if event_type not in self.listeners:
-                self.listeners[event_type] = []
-            self.listeners[event_type].append(callback)
+            listeners = dict(self.listeners)
+            listeners[event_type] = listeners.get(event_type, ()) + (callback,)
+            policy = self.listener_policies.get(callback)
+            if policy is None:
+                policy = ListenerPolicy()
+                self.listener_policies = {**self.listener_policies, callback: policy}
+            if timeout is not None:
+                policy.timeout = timeout
+            if max_concurrency is not None:
+                policy.max_concurrency = max_concurrency
+            if batch:
+                policy.batch = True
+            if bulkhead is not None:
+                policy.bulkhead = bulkhead
+            self.listeners = listeners
+            self._invalidate_routes(event_type)
             logger.info(f"Added listener for event type: {event_type}")
 
-    def remove_listener(self, event_type: str, callback: Callable[[Event], None]):
+    def remove_listener(
+        self, event_type: ListenerKey, callback: Callable[[Event], None]
+    ):
         with self._lock:
             if event_type in self.listeners:
-                self.listeners[event_type].remove(callback)
+                callbacks = list(self.listeners[event_type])
+                callbacks.remove(callback)
+                listeners = dict(self.listeners)
+                if callbacks:
+                    listeners[event_type] = tuple(callbacks)
+                else:
+                    del listeners[event_type]
+                self.listeners = listeners
+                if not any(callback in cbs for cbs in listeners.values()):
+                    self.listener_policies = {
+                        cb: policy
+                        for cb, policy in self.listener_policies.items()
+                        if cb is not callback
+                    }
+                self._invalidate_routes(event_type)
                 logger.info(f"Removed listener for event type: {event_type}")
 
+    def _invalidate_routes(self, key: ListenerKey):
+        # Called with _lock held.
+        self._routes = {
+            event_class: route
+            for event_class, route in self._routes.items()
+            if not listener_key_matches(key, event_class)
+        }
+
+    def _route(self, event_class: type) -> Tuple[Callable[[Event], None], ...]:
+        route = self._routes.get(event_class)
+        if route is not None:
+            return route
+        listeners = self.listeners
+        callbacks = []
+        for cls in event_class.__mro__:
+            callbacks.extend(listeners.get(cls, ()))
+            callbacks.extend(listeners.get(cls.__name__, ()))
+        for key, key_callbacks in listeners.items():
+            if isinstance(key, str) and (key == WILDCARD or key.endswith(".*")):
+                if listener_key_matches(key, event_class):
+                    callbacks.extend(key_callbacks)
+        # A listener subscribed through several keys is only called once.
+        route = tuple(dict.fromkeys(callbacks))
+        with self._lock:
+            # Only cache the route if no writer published since the snapshot.
+            if self.listeners is listeners:
+                self._routes = {**self._routes, event_class: route}
+        return route
+
+    def bind_loop(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Bind the loop that ``dispatch_threadsafe`` hands events to."""
+        loop = loop or asyncio.get_running_loop()
+        self._bridge = ThreadSafeEventBridge(loop, self.dispatch_many)
+
+    def dispatch_threadsafe(self, event: Event):
+        """Dispatch an event from any thread without blocking it."""
+        self.dispatch_many_threadsafe([event])
+
+    def dispatch_many_threadsafe(self, events: List[Event]):
+        """Dispatch a burst of events from any thread without blocking it.
+
+        Before ``start`` (or ``bind_loop``) has bound a loop, events are
+        delivered directly on the calling thread instead; queued and
+        transport-backed managers need their loop and raise.
+        """
+        bridge = self._bridge
+        if bridge is None:
+            try:
+                self.bind_loop()
+            except RuntimeError:
+                self._dispatch_unbound(events)
+                return
+            bridge = self._bridge
+        bridge.submit_many(events)
+
+    def _dispatch_unbound(self, events: List[Event]):
+        if self.queued or self.transport is not None:
+            raise RuntimeError(
+                "EventManager is not bound to an event loop; call start() first"
+            )
+        if not self._warned_unbound:
+            self._warned_unbound = True
+            logger.warning(
+                "EventManager is not bound to an event loop, delivering "
+                "events on the dispatching thread"
+            )
+        asyncio.run(self.dispatch_many(events))
+
+    async def start(self):
+        """Start consuming events from the transport, if there is one."""
+        self.bind_loop()
+        if self.transport is not None:
+            await self.transport.start(self._deliver_from_transport)
+
+    async def _deliver_from_transport(self, events: List[Event]):
+        await self._dispatch_local(events)
+        if self.queued:
+            # Only let the transport commit once the listeners have run.
+            await self.join()
+
     async def dispatch(self, event: Event):
-        event_type = event.__class__.__name__
-        logger.debug(f"Dispatching event: {event_type}")
-        async with self._lock:
-            listeners = self.listeners.get(event_type, [])
-        for callback in listeners:
+        if self.journal is not None:
+            self.journal.append(event)
+        if self.transport is not None:
+            await self.transport.publish([event])
+        elif self.queued:
+            await self._enqueue(event)
+        else:
+            await self._deliver(event.__class__, [event])
+
+    async def dispatch_many(self, events: List[Event]):
+        if self.journal is not None:
+            self.journal.append_many(events)
+        if self.transport is not None:
+            await self.transport.publish(events)
+        else:
+            await self._dispatch_local(events)
+
+    async def replay(
+        self,
+        from_offset: Optional[int] = None,
+        consumer: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """Re-drive listeners with journaled events and return the next offset.
+
+        Replay starts at ``from_offset`` or, when omitted, at the offset last
+        committed by ``consumer``. Replayed events are not journaled again,
+        and ``consumer``'s offset is committed after every batch.
+        """
+        if self.journal is None:
+            raise RuntimeError("EventManager has no journal to replay")
+        if from_offset is None:
+            from_offset = self.journal.consumer_offset(consumer) if consumer else 0
+        next_offset = from_offset
+        batch = []
+        for offset, event in self.journal.read(from_offset):
+            batch.append(event)
+            next_offset = offset + 1
+            if len(batch) >= batch_size:
+                await self._replay_batch(batch, consumer, next_offset)
+                batch = []
+        if batch:
+            await self._replay_batch(batch, consumer, next_offset)
+        return next_offset
+
+    async def _replay_batch(
+        self, batch: List[Event], consumer: Optional[str], next_offset: int
+    ):
+        await self._dispatch_local(batch)
+        if self.queued:
+            await self.join()
+        if consumer:
+            self.journal.commit_offset(consumer, next_offset)
+
+    async def _dispatch_local(self, events: List[Event]):
+        groups: Dict[type, List[Event]] = {}
+        for event in events:
+            groups.setdefault(event.__class__, []).append(event)
+        for event_class, group in groups.items():
+            if self.queued:
+                for event in group:
+                    await self._enqueue(event)
+            else:
+                await self._deliver(event_class, group)
+
+    async def _deliver(self, event_class: type, events: List[Event]):
+        if self.scheduler is None:
+            await self._deliver_now(event_class, events)
+            return
+        priority = min(getattr(e, "priority", DEFAULT_PRIORITY) for e in events)
+        await self.scheduler.run(
+            priority, lambda: self._deliver_now(event_class, events)
+        )
+
+    async def _deliver_now(self, event_class: type, events: List[Event]):
+        event_type = event_class.__name__
+        logger.debug(f"Dispatching {len(events)} event(s): {event_type}")
+        listeners = self._route(event_class)
+        calls = [self._call_listener(cb, events, event_type) for cb in listeners]
+        if self.fan_out and len(calls) > 1:
+            await asyncio.gather(*calls)
+        else:
+            for call in calls:
+                await call
+
+    async def _call_listener(
+        self, callback: Callable[[Event], None], events: List[Event], event_type: str
+    ):
+        policy = self.listener_policies.get(callback)
+        if policy is None:
+            # The listener was removed after the route was read.
+            policy = ListenerPolicy()
+        if policy.batch:
+            await self._invoke(callback, policy, events, event_type)
+        else:
+            for event in events:
+                await self._invoke(callback, policy, event, event_type)
+
+    async def _invoke(
+        self,
+        callback: Callable[[Event], None],
+        policy: ListenerPolicy,
+        payload: Union[Event, List[Event]],
+        event_type: str,
+    ):
+        if policy.max_concurrency is None:
+            await self._run_listener(callback, policy, payload, event_type)
+            return
+        semaphore = policy.semaphore()
+        if semaphore.locked() and policy.bulkhead == "reject":
+            policy.rejected += 1
+            logger.warning(
+                f"Listener bulkhead full for {event_type}, skipping {callback!r}"
+            )
+            return
+        policy.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            policy.waiting -= 1
+        try:
+            await self._run_listener(callback, policy, payload, event_type)
+        finally:
+            semaphore.release()
+
+    async def _run_listener(
+        self,
+        callback: Callable[[Event], None],
+        policy: ListenerPolicy,
+        payload: Union[Event, List[Event]],
+        event_type: str,
+    ):
+        timeout = (
+            policy.timeout if policy.timeout is not None else self.listener_timeout
+        )
+        policy.in_flight += 1
+        policy.calls += 1
+        try:
+            result = callback(payload)
+            if inspect.isawaitable(result):
+                await asyncio.wait_for(result, timeout)
+        except asyncio.TimeoutError:
+            policy.timeouts += 1
+            logger.error(f"Listener for {event_type} timed out after {timeout}s")
+        except Exception as e:
+            policy.failures += 1
+            logger.error(f"Error in listener for {event_type}: {e}")
+        finally:
+            policy.in_flight -= 1
+
+    async def _enqueue(self, event: Event):
+        queue = self._get_queue(event.__class__)
+        if self.backpressure == "block":
+            await queue.put(event)
+            return
+        if queue.full():
+            event_type = event.__class__.__name__
+            if self.backpressure == "reject":
+                raise EventQueueFull(f"Queue for {event_type} is full")
+            queue.get_nowait()
+            queue.task_done()
+            self.dropped_events[event_type] = self.dropped_events.get(event_type, 0) + 1
+            logger.warning(f"Dropped oldest queued {event_type} event")
+        queue.put_nowait(event)
+
+    def _get_queue(self, event_class: type) -> asyncio.Queue:
+        queue = self._queues.get(event_class)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._queues[event_class] = queue
+            for _ in range(self.consumers_per_type):
+                self._consumers.append(asyncio.create_task(self._consume(queue)))
+            logger.debug(f"Created event queue for {event_class.__name__}")
+        return queue
+
+    async def _consume(self, queue: asyncio.Queue):
+        while True:
+            events = [await queue.get()]
+            while len(events) < self.max_batch_size and not queue.empty():
+                events.append(queue.get_nowait())
             try:
-                await callback(event)
-            except Exception as e:
-                logger.error(f"Error in listener for {event_type}: {e}")
+                await self._deliver(events[0].__class__, events)
+            finally:
+                for _ in events:
+                    queue.task_done()
+
+    async def join(self):
+        """Wait until every queued event has been delivered."""
+        for queue in list(self._queues.values()):
+            await queue.join()
+
+    async def close(self):
+        """Drain the event queues and stop their consumer tasks."""
+        if self.transport is not None:
+            await self.transport.close()
+        await self.join()
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers.clear()
+        self._queues.clear()
+        # The loop may be about to close; later events take the unbound path.
+        self._bridge = None
 
     def stop_all_triggers(self):
         logger.info("Stopping all triggers...")
         with self._lock:
-            for trigger in self.triggers:
-                trigger.dispatcher.stop()
-            self.triggers.clear()
+            triggers, self.triggers = self.triggers, ()
+        for trigger in triggers:
+            trigger.dispatcher.stop()
 
     def dispatch_semantic_event(self, data_entry: DataEntry):
         event_type = "SemanticEvent"
-        with self._lock:
-            listeners = self.listeners.get(event_type, [])
+        listeners = self.listeners.get(event_type, ())
         for callback in listeners:
             try:
                 callback(data_entry)
             except Exception as e:
                 logger.error(f"Error in listener for {event_type}: {e}")
+
+
+# Shared by the server, the system and the trigger dispatchers.
+event_manager = EventManager()
@@ -0,0 +1,520 @@
+import asyncio
+import base64
+import json
+import logging
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .event_log import TYPE_NAME_LENGTH, decode_event, encode_event
+
+logger = logging.getLogger(__name__)
+
+# (partition, offset, value) as returned by ``fetch``.
+Record = Tuple[int, int, bytes]
+
+
+def encode_record(event: Any) -> bytes:
+    type_name, body = encode_event(event)
+    name = type_name.encode()
+    return TYPE_NAME_LENGTH.pack(len(name)) + name + body
+
+
+def decode_record(value: bytes) -> Any:
+    (name_length,) = TYPE_NAME_LENGTH.unpack_from(value)
+    name_end = TYPE_NAME_LENGTH.size + name_length
+    return decode_event(
+        value[TYPE_NAME_LENGTH.size : name_end].decode(), value[name_end:]
+    )
+
+
+class EventTransport(ABC):
+    """Carries published events to the nodes that deliver them to listeners."""
+
+    @abstractmethod
+    async def start(self, deliver: Callable[[List[Any]], Awaitable[None]]):
+        pass
+
+    @abstractmethod
+    async def publish(self, events: List[Any]):
+        pass
+
+    @abstractmethod
+    async def close(self):
+        pass
+
+
+class _ConsumerGroup:
+    def __init__(self):
+        self.committed: Dict[int, int] = {}
+        self.members: Dict[str, float] = {}
+        self.assignments: Dict[str, List[int]] = {}
+
+
+class _Partition:
+    def __init__(self):
+        self.base_offset = 0  # Offset of records[0]; earlier ones were trimmed.
+        self.records: List[bytes] = []
+
+    @property
+    def end_offset(self) -> int:
+        return self.base_offset + len(self.records)
+
+    def trim(self, offset: int) -> int:
+        """Drop the records below ``offset`` and return how many went."""
+        count = min(offset, self.end_offset) - self.base_offset
+        if count <= 0:
+            return 0
+        del self.records[:count]
+        self.base_offset += count
+        return count
+
+
+class InMemoryBroker:
+    """In-process stand-in for a partitioned log broker.
+
+    Topics are split into partitions addressed by a hash of the record key,
+    so records with the same key stay ordered. A topic is created with
+    ``default_partitions`` the first time it is used, unless ``create_topic``
+    came first. Consumer groups share a topic's partitions round-robin
+    between their live members and rebalance whenever a member joins, leaves
+    or misses ``session_timeout``. ``fetch`` always reads from the group's
+    committed offsets, so anything fetched but not committed is delivered
+    again: delivery is at-least-once.
+
+    Records every group of a topic has committed are dropped, and a
+    partition never keeps more than ``max_records_per_partition`` records;
+    the oldest go first and are counted in ``expired``. A group that falls
+    behind the retained records resumes at the oldest one left.
+    """
+
+    def __init__(
+        self,
+        session_timeout: float = 30.0,
+        default_partitions: int = 8,
+        max_records_per_partition: Optional[int] = 100_000,
+    ):
+        self.session_timeout = session_timeout
+        self.default_partitions = default_partitions
+        self.max_records_per_partition = max_records_per_partition
+        self.expired = 0
+        self._topics: Dict[str, List[_Partition]] = {}
+        self._groups: Dict[Tuple[str, str], _ConsumerGroup] = {}
+        self._data_available = asyncio.Condition()
+
+    async def create_topic(self, topic: str, partitions: Optional[int] = None):
+        self._partitions(topic, partitions)
+
+    def _partitions(self, topic: str, count: Optional[int] = None) -> List[_Partition]:
+        partitions = self._topics.get(topic)
+        if partitions is None:
+            count = count or self.default_partitions
+            partitions = self._topics[topic] = [_Partition() for _ in range(count)]
+            logger.info(f"Created topic {topic} with {count} partitions")
+        return partitions
+
+    async def produce(self, topic: str, records: List[Tuple[str, bytes]]):
+        partitions = self._partitions(topic)
+        for key, value in records:
+            partition = partitions[zlib.crc32(key.encode()) % len(partitions)]
+            partition.records.append(value)
+            limit = self.max_records_per_partition
+            if limit is not None and len(partition.records) > limit:
+                self.expired += partition.trim(partition.end_offset - limit)
+        async with self._data_available:
+            self._data_available.notify_all()
+
+    def _group(self, group: str, topic: str) -> _ConsumerGroup:
+        return self._groups.setdefault((group, topic), _ConsumerGroup())
+
+    def _rebalance(self, topic: str, consumer_group: _ConsumerGroup):
+        members = sorted(consumer_group.members)
+        consumer_group.assignments = {member: [] for member in members}
+        for partition in range(len(self._partitions(topic))):
+            if members:
+                member = members[partition % len(members)]
+                consumer_group.assignments[member].append(partition)
+
+    def _expire_members(self, topic: str, consumer_group: _ConsumerGroup):
+        deadline = time.monotonic() - self.session_timeout
+        expired = [m for m, seen in consumer_group.members.items() if seen < deadline]
+        for member in expired:
+            del consumer_group.members[member]
+            logger.warning(f"Consumer {member} timed out, rebalancing {topic}")
+        if expired:
+            self._rebalance(topic, consumer_group)
+
+    async def join(self, group: str, topic: str, member: str) -> List[int]:
+        consumer_group = self._group(group, topic)
+        consumer_group.members[member] = time.monotonic()
+        self._expire_members(topic, consumer_group)
+        self._rebalance(topic, consumer_group)
+        return consumer_group.assignments[member]
+
+    async def leave(self, group: str, topic: str, member: str):
+        consumer_group = self._group(group, topic)
+        if consumer_group.members.pop(member, None) is not None:
+            self._rebalance(topic, consumer_group)
+
+    async def fetch(
+        self,
+        group: str,
+        topic: str,
+        member: str,
+        max_records: int = 500,
+        max_wait: float = 1.0,
+    ) -> List[Record]:
+        consumer_group = self._group(group, topic)
+        if member not in consumer_group.members:
+            await self.join(group, topic, member)
+        deadline = time.monotonic() + max_wait
+        while True:
+            consumer_group.members[member] = time.monotonic()
+            self._expire_members(topic, consumer_group)
+            records = self._read(topic, consumer_group, member, max_records)
+            remaining = deadline - time.monotonic()
+            if records or remaining <= 0:
+                return records
+            async with self._data_available:
+                try:
+                    await asyncio.wait_for(self._data_available.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _read(
+        self, topic: str, consumer_group: _ConsumerGroup, member: str, max_records: int
+    ) -> List[Record]:
+        partitions = self._partitions(topic)
+        records = []
+        for partition in consumer_group.assignments.get(member, []):
+            log = partitions[partition]
+            start = max(consumer_group.committed.get(partition, 0), log.base_offset)
+            for offset in range(start, log.end_offset):
+                if len(records) >= max_records:
+                    return records
+                records.append(
+                    (partition, offset, log.records[offset - log.base_offset])
+                )
+        return records
+
+    async def commit(
+        self, group: str, topic: str, member: str, offsets: Dict[int, int]
+    ) -> bool:
+        """Commit next-offsets; rejected if the member lost a partition."""
+        consumer_group = self._group(group, topic)
+        owned = consumer_group.assignments.get(member, [])
+        if any(partition not in owned for partition in offsets):
+            logger.warning(f"Rejected commit from {member} after rebalance")
+            return False
+        for partition, offset in offsets.items():
+            committed = consumer_group.committed.get(partition, 0)
+            consumer_group.committed[partition] = max(committed, offset)
+        self._trim_consumed(topic, offsets)
+        return True
+
+    def _trim_consumed(self, topic: str, partitions: Iterable[int]):
+        groups = [
+            consumer_group
+            for (_, group_topic), consumer_group in self._groups.items()
+            if group_topic == topic
+        ]
+        for partition in partitions:
+            consumed = min(group.committed.get(partition, 0) for group in groups)
+            self._partitions(topic)[partition].trim(consumed)
+
+    async def close(self):
+        pass
+
+
+class BrokerServer:
+    """Exposes an ``InMemoryBroker`` on a localhost TCP port.
+
+    The protocol is one JSON object per line: requests carry an ``id``, an
+    ``op`` naming a broker method and its ``args``; record values travel
+    base64-encoded. Requests run concurrently, so a long-polling ``fetch``
+    does not hold up other requests on the same connection.
+    """
+
+    OPS = ("create_topic", "produce", "join", "leave", "fetch", "commit")
+
+    def __init__(
+        self,
+        broker: Optional[InMemoryBroker] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.broker = broker or InMemoryBroker()
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Event broker listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._handle(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _handle(
+        self, line: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock
+    ):
+        response: Dict[str, Any] = {"id": None}
+        try:
+            request = json.loads(line)
+            response["id"] = request["id"]
+            if request["op"] not in self.OPS:
+                raise ValueError(f"Unknown broker operation {request['op']}")
+            args = request["args"]
+            if request["op"] == "produce":
+                args["records"] = [
+                    (key, base64.b64decode(value)) for key, value in args["records"]
+                ]
+            if request["op"] == "commit":
+                args["offsets"] = {int(p): o for p, o in args["offsets"].items()}
+            result = await getattr(self.broker, request["op"])(**args)
+            if request["op"] == "fetch":
+                result = [
+                    (partition, offset, base64.b64encode(value).decode())
+                    for partition, offset, value in result
+                ]
+            response["result"] = result
+        except Exception as e:
+            response["error"] = str(e)
+            if response["id"] is None:
+                logger.error(f"Malformed broker request: {e}")
+        async with write_lock:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+
+class RemoteBroker:
+    """Client for a ``BrokerServer`` with the same API as ``InMemoryBroker``.
+
+    When the connection drops, calls still waiting fail with
+    ``ConnectionError`` and the next call reconnects.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9092):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._reader_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def close(self):
+        writer = self._writer
+        if self._reader_task:
+            self._reader_task.cancel()
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+        if writer:
+            writer.close()
+            await writer.wait_closed()
+            self._writer = None
+
+    async def _read_responses(self):
+        try:
+            while line := await self._reader.readline():
+                response = json.loads(line)
+                future = self._pending.pop(response["id"], None)
+                if future is None or future.done():
+                    continue
+                if "error" in response:
+                    future.set_exception(RuntimeError(response["error"]))
+                else:
+                    future.set_result(response["result"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error reading from event broker: {e}")
+        finally:
+            # Nothing will answer the calls still waiting, and the next call
+            # opens a new connection.
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Broker connection lost"))
+            self._pending.clear()
+
+    async def _call(self, op: str, **args) -> Any:
+        if self._writer is None:
+            await self.connect()
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        request = {"id": request_id, "op": op, "args": args}
+        async with self._write_lock:
+            # A connection lost while we waited has already failed the future.
+            if self._writer is not None:
+                self._writer.write(json.dumps(request).encode() + b"\n")
+                await self._writer.drain()
+        return await future
+
+    async def create_topic(self, topic: str, partitions: int = 8):
+        await self._call("create_topic", topic=topic, partitions=partitions)
+
+    async def produce(self, topic: str, records: List[Tuple[str, bytes]]):
+        encoded = [(key, base64.b64encode(value).decode()) for key, value in records]
+        await self._call("produce", topic=topic, records=encoded)
+
+    async def join(self, group: str, topic: str, member: str) -> List[int]:
+        return await self._call("join", group=group, topic=topic, member=member)
+
+    async def leave(self, group: str, topic: str, member: str):
+        await self._call("leave", group=group, topic=topic, member=member)
+
+    async def fetch(
+        self,
+        group: str,
+        topic: str,
+        member: str,
+        max_records: int = 500,
+        max_wait: float = 1.0,
+    ) -> List[Record]:
+        result = await self._call(
+            "fetch",
+            group=group,
+            topic=topic,
+            member=member,
+            max_records=max_records,
+            max_wait=max_wait,
+        )
+        return [(p, o, base64.b64decode(value)) for p, o, value in result]
+
+    async def commit(
+        self, group: str, topic: str, member: str, offsets: Dict[int, int]
+    ) -> bool:
+        return await self._call(
+            "commit", group=group, topic=topic, member=member, offsets=offsets
+        )
+
+
+class BrokerTransport(EventTransport):
+    """Shares one trigger stream between nodes through a partitioned broker.
+
+    By default events are spread over partitions by a hash of their content;
+    pass ``partition_key`` (e.g. ``lambda event: type(event).__name__``) to
+    keep the events sharing a key in order instead. Every node in ``group`` consumes a share of the partitions
+    and commits offsets only after its listeners ran; a failed batch is
+    fetched again, and after ``max_attempts`` failures it is skipped.
+    """
+
+    def __init__(
+        self,
+        broker: Any,
+        topic: str = "events",
+        group: str = "command-centre",
+        partitions: int = 8,
+        member: Optional[str] = None,
+        max_batch_size: int = 500,
+        max_attempts: int = 5,
+        partition_key: Optional[Callable[[Any], str]] = None,
+    ):
+        self.broker = broker
+        self.topic = topic
+        self.group = group
+        self.partitions = partitions
+        self.member = member or f"node-{uuid.uuid4().hex[:12]}"
+        self.max_batch_size = max_batch_size
+        self.max_attempts = max_attempts
+        self.partition_key = partition_key
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Callable[[List[Any]], Awaitable[None]]):
+        await self.broker.create_topic(self.topic, self.partitions)
+        partitions = await self.broker.join(self.group, self.topic, self.member)
+        logger.info(f"{self.member} joined {self.group} with partitions {partitions}")
+        self._task = asyncio.create_task(self._consume(deliver))
+
+    async def publish(self, events: List[Any]):
+        records = []
+        for event in events:
+            value = encode_record(event)
+            if self.partition_key is not None:
+                key = self.partition_key(event)
+            else:
+                key = str(zlib.crc32(value))
+            records.append((key, value))
+        await self.broker.produce(self.topic, records)
+
+    async def _consume(self, deliver: Callable[[List[Any]], Awaitable[None]]):
+        attempts = 0
+        while True:
+            try:
+                records = await self.broker.fetch(
+                    self.group, self.topic, self.member, self.max_batch_size
+                )
+            except Exception as e:
+                logger.error(f"Error fetching from event broker: {e}")
+                await asyncio.sleep(1)
+                continue
+            if not records:
+                continue
+            offsets = {}
+            for partition, offset, _ in records:
+                offsets[partition] = max(offsets.get(partition, 0), offset + 1)
+            try:
+                await deliver([decode_record(value) for _, _, value in records])
+                attempts = 0
+            except Exception as e:
+                attempts += 1
+                if attempts < self.max_attempts:
+                    logger.error(f"Error delivering events, will retry: {e}")
+                    await asyncio.sleep(min(2**attempts * 0.1, 5))
+                    continue
+                logger.error(
+                    f"Skipping {len(records)} events after {attempts} attempts"
+                )
+                attempts = 0
+            try:
+                committed = await self.broker.commit(
+                    self.group, self.topic, self.member, offsets
+                )
+            except Exception as e:
+                logger.error(f"Error committing to event broker: {e}")
+                await asyncio.sleep(1)
+                continue
+            if not committed:
+                # A rebalance moved these partitions away; their new owner
+                # fetches the uncommitted records again.
+                logger.warning(
+                    f"{self.member} lost partitions {sorted(offsets)}, "
+                    f"{len(records)} events will be delivered again"
+                )
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.broker.leave(self.group, self.topic, self.member)
+        await self.broker.close()
@@ -1,13 +1,14 @@
 import json
-import openai  # Ensure OpenAI API is properly installed and configured
 from typing import Any, Dict, Optional
 from .event_manager import event_manager
+from ..utils.llm_gateway import default_gateway
 from .utils.triggers import (
     invoke_trigger_by_name,
     SemanticTrigger,
     SemanticTriggerDispatcher,
 )
 from .models import ActionPlan
+from .decision_maker import schedule_action_plan
 
 
 async def process_user_input(user_input: str) -> str:
@@ -21,7 +22,7 @@ async def process_user_input(user_input: str) -> str:
         if action_plan:
             trigger = SemanticTrigger(
                 condition=condition,
-                action=lambda data_entry, metadata: execute_action_plan(
+                action=lambda data_entry, metadata: schedule_action_plan(
                     action_plan, data_entry, metadata
                 ),
             )
@@ -45,18 +46,13 @@ def parse_action_plan(action_plan_str: str) -> Optional[ActionPlan]:
 
 
 async def llm_parse_user_mandate(user_input: str) -> Dict[str, Any]:
-    # Use OpenAI's API to parse the user mandate
-    response = await openai.ChatCompletion.acreate(
-        model="gpt-4",
-        messages=[
-            {
-                "role": "system",
-                "content": "As an assistant, parse the user's request into a JSON object with 'condition' and 'action_plan' fields. The action plan should follow the provided schema.",
-            },
-            {"role": "user", "content": user_input},
-        ],
+    # Ask the model to parse the user mandate through the shared gateway
+    response = await default_gateway.complete(
+        "gpt-4",
+        "As an assistant, parse the user's request into a JSON object with 'condition' and 'action_plan' fields. The action plan should follow the provided schema.",
+        user_input,
     )
-    result = response["choices"][0]["message"]["content"]
+    result = response.text
     # The assistant should return a JSON with 'condition' and 'action_plan'
     try:
         trigger_info = json.loads(result)
@@ -67,10 +63,11 @@ async def llm_parse_user_mandate(user_input: str) -> Dict[str, Any]:
 
 async def llm_tool_call(user_input: str) -> str:
     # Call the LLM with function calling capability
-    completion = await openai.ChatCompletion.acreate(
-        model="gpt-4-0613",
-        messages=[{"role": "user", "content": user_input}],
-        functions=[
+    response = await default_gateway.complete(
+        "gpt-4-0613",
+        "As an assistant, call invoke_trigger when the user's request asks for a trigger to run, with the trigger's name, parameters and any metadata; otherwise answer in text.",
+        user_input,
+        tools=[
             {
                 "name": "invoke_trigger",
                 "description": "Invoke a trigger with specified parameters",
@@ -85,13 +82,10 @@ async def llm_tool_call(user_input: str) -> str:
                 },
             }
         ],
-        function_call="auto",
     )
 
-    message = completion.choices[0].message
-    if message.get("function_call"):
-        function_name = message["function_call"]["name"]
-        arguments = json.loads(message["function_call"]["arguments"])
+    if response.tool_calls:
+        arguments = response.tool_calls[0]["arguments"]
         result = await invoke_trigger_by_name(
             arguments["trigger_name"],
             arguments["params"],
@@ -99,7 +93,7 @@ async def llm_tool_call(user_input: str) -> str:
         )
         return f"Trigger '{arguments['trigger_name']}' invoked successfully."
     else:
-        return message["content"]
+        return response.text
 
 
 # ...
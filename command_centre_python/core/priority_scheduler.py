@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HIGHEST_PRIORITY = 1
+LOWEST_PRIORITY = 5
+DEFAULT_PRIORITY = 3
+
+
+class _ScheduledWork:
+    def __init__(
+        self, priority: int, work: Callable[[], Awaitable[Any]], future: asyncio.Future
+    ):
+        self.priority = priority
+        self.level = priority
+        self.work = work
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class PriorityScheduler:
+    """Runs async work on a pool of workers, most urgent first.
+
+    Priorities follow ``ActionPlan.priority``: 1 is the highest and 5 the
+    lowest. Each priority has its own FIFO queue and idle workers always take
+    from the highest non-empty one. To prevent starvation, work is promoted
+    one level for every ``aging_interval`` seconds it has waited.
+
+    Workers run on the loop of the latest ``submit``. When that changes, for
+    example across ``asyncio.run`` calls, the workers are restarted on the
+    new loop and work left over from the old one is dropped.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        aging_interval: float = 5.0,
+        levels: int = LOWEST_PRIORITY,
+    ):
+        self.workers = workers
+        self.aging_interval = aging_interval
+        self.levels = levels
+        self.promoted = 0
+        self._queues: Dict[int, Deque[_ScheduledWork]] = {
+            level: deque() for level in range(HIGHEST_PRIORITY, levels + 1)
+        }
+        self._available: Optional[asyncio.Semaphore] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._next_promotion = float("inf")
+
+    def _clamp(self, priority: Optional[int]) -> int:
+        if priority is None:
+            return DEFAULT_PRIORITY
+        return min(max(int(priority), HIGHEST_PRIORITY), self.levels)
+
+    def submit(
+        self, priority: Optional[int], work: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Future:
+        """Queue ``work`` (a coroutine factory) and return its result future."""
+        loop = asyncio.get_running_loop()
+        self.start()
+        item = _ScheduledWork(self._clamp(priority), work, loop.create_future())
+        self._queues[item.level].append(item)
+        self._next_promotion = min(self._next_promotion, self._promotion_due(item))
+        self._available.release()
+        return item.future
+
+    async def run(
+        self, priority: Optional[int], work: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        return await self.submit(priority, work)
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and not all(task.done() for task in self._tasks):
+            return
+        if self._loop is not loop:
+            stale = sum(len(queue) for queue in self._queues.values())
+            if stale:
+                logger.warning(
+                    f"Dropping {stale} scheduled items left on a previous event loop"
+                )
+            for queue in self._queues.values():
+                queue.clear()
+        # Workers left on another loop exit once they see the new semaphore.
+        self._loop = loop
+        self._available = asyncio.Semaphore(
+            sum(len(queue) for queue in self._queues.values())
+        )
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for queue in self._queues.values():
+            while queue:
+                queue.popleft().future.cancel()
+
+    def _promotion_due(self, item: _ScheduledWork) -> float:
+        """When ``item`` has waited long enough to move up from its level."""
+        if item.level <= HIGHEST_PRIORITY:
+            return float("inf")
+        return item.enqueued_at + (item.priority - item.level + 1) * self.aging_interval
+
+    def _age(self):
+        now = time.monotonic()
+        if now < self._next_promotion:
+            return
+        # Promoted items join the back of their new queue, behind newer work,
+        # so every item has to be checked rather than just the heads.
+        next_promotion = float("inf")
+        for level in range(HIGHEST_PRIORITY + 1, self.levels + 1):
+            queue = self._queues[level]
+            kept: Deque[_ScheduledWork] = deque()
+            for item in queue:
+                waited_levels = int((now - item.enqueued_at) / self.aging_interval)
+                target = max(item.priority - waited_levels, HIGHEST_PRIORITY)
+                if target < level:
+                    item.level = target
+                    self._queues[target].append(item)
+                    self.promoted += 1
+                else:
+                    kept.append(item)
+                next_promotion = min(next_promotion, self._promotion_due(item))
+            self._queues[level] = kept
+        self._next_promotion = next_promotion
+
+    def _next(self) -> _ScheduledWork:
+        self._age()
+        for level in range(HIGHEST_PRIORITY, self.levels + 1):
+            if self._queues[level]:
+                return self._queues[level].popleft()
+        raise RuntimeError("PriorityScheduler signalled work but none is queued")
+
+    async def _worker(self):
+        available = self._available
+        while True:
+            await available.acquire()
+            if available is not self._available:
+                return
+            item = self._next()
+            if item.future.cancelled():
+                continue
+            try:
+                result = await item.work()
+            except Exception as e:
+                if not item.future.cancelled():
+                    item.future.set_exception(e)
+            else:
+                if not item.future.cancelled():
+                    item.future.set_result(result)
+
+    def queue_depths(self) -> Dict[int, int]:
+        return {level: len(queue) for level, queue in self._queues.items()}
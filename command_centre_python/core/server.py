@@ -1,8 +1,20 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
+from .event_manager import event_manager
 from .llm_integration import process_user_input
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Trigger dispatchers hand their events to the server's loop.
+    await event_manager.start()
+    yield
+    event_manager.stop_all_triggers()
+    await event_manager.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.post("/chat")
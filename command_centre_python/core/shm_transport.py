@@ -0,0 +1,373 @@
+import asyncio
+import logging
+import multiprocessing
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from .event_log import decode_event, encode_event, event_type_name, resolve_event_type
+
+logger = logging.getLogger(__name__)
+
+# Ring header: consumer position, producer position, data capacity.
+RING_HEADER = struct.Struct("<QQQ")
+HEAD_OFFSET = 0
+TAIL_OFFSET = 8
+HEADER_SIZE = 64  # Keep the data area cache-line aligned.
+# Frame header: payload length, event type id.
+FRAME_HEADER = struct.Struct("<IH")
+WRAP_MARKER = 0xFFFFFFFF
+POSITION = struct.Struct("<Q")
+ALIGNMENT = 8
+
+
+def _aligned(size: int) -> int:
+    return (size + ALIGNMENT - 1) & ~(ALIGNMENT - 1)
+
+
+# Segments created by this process, whose tracker registration it owns.
+_created: Set[str] = set()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing segment without this process's tracker owning it.
+
+    A resource tracker unlinks the segments registered with it when its
+    processes exit, so an attaching process with a tracker of its own would
+    destroy the creator's ring on exit.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the segment. The creator and its
+    # children share one tracker holding a set of names, where this is a
+    # no-op and unregistering would drop the creator's registration.
+    shm = shared_memory.SharedMemory(name=name)
+    if multiprocessing.parent_process() is None and shm.name not in _created:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class ShmRingBuffer:
+    """Single-producer, single-consumer ring buffer in shared memory.
+
+    The producer only ever writes ``tail`` and the consumer only ever writes
+    ``head``; both are monotonically increasing byte positions stored as
+    aligned 8-byte words, so neither side needs a lock. A frame is published
+    by writing its bytes first and advancing ``tail`` afterwards. Frames are
+    8-byte aligned and never straddle the end of the buffer: when one does
+    not fit, a wrap marker sends the consumer back to the start.
+    """
+
+    def __init__(self, name: Optional[str] = None, capacity: int = 4 * 1024 * 1024):
+        create = name is None
+        capacity = _aligned(capacity)
+        if create:
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=HEADER_SIZE + capacity
+            )
+            _created.add(self._shm.name)
+        else:
+            self._shm = _attach(name)
+        self._buf = self._shm.buf
+        if create:
+            RING_HEADER.pack_into(self._buf, 0, 0, 0, capacity)
+        self.capacity = RING_HEADER.unpack_from(self._buf, 0)[2]
+        self.owner = create
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _position(self, offset: int) -> int:
+        return POSITION.unpack_from(self._buf, offset)[0]
+
+    def try_write(self, type_id: int, payload: bytes) -> bool:
+        """Append a frame, returning False when the ring is full."""
+        frame_size = _aligned(FRAME_HEADER.size + len(payload))
+        if frame_size > self.capacity:
+            raise ValueError(f"Frame of {frame_size} bytes exceeds ring capacity")
+        head = self._position(HEAD_OFFSET)
+        tail = self._position(TAIL_OFFSET)
+        index = tail % self.capacity
+        padding = self.capacity - index if index + frame_size > self.capacity else 0
+        if tail + padding + frame_size - head > self.capacity:
+            return False
+        if padding:
+            struct.pack_into("<I", self._buf, HEADER_SIZE + index, WRAP_MARKER)
+            index = 0
+        start = HEADER_SIZE + index
+        FRAME_HEADER.pack_into(self._buf, start, len(payload), type_id)
+        data_start = start + FRAME_HEADER.size
+        self._buf[data_start : data_start + len(payload)] = payload
+        POSITION.pack_into(self._buf, TAIL_OFFSET, tail + padding + frame_size)
+        return True
+
+    def read_batch(self, max_frames: int = 1000) -> List[Tuple[int, bytes]]:
+        """Consume up to ``max_frames`` frames as ``(type_id, payload)``."""
+        head = self._position(HEAD_OFFSET)
+        tail = self._position(TAIL_OFFSET)
+        frames = []
+        while head < tail and len(frames) < max_frames:
+            index = head % self.capacity
+            start = HEADER_SIZE + index
+            length = struct.unpack_from("<I", self._buf, start)[0]
+            if length == WRAP_MARKER:
+                head += self.capacity - index
+                continue
+            type_id = FRAME_HEADER.unpack_from(self._buf, start)[1]
+            data_start = start + FRAME_HEADER.size
+            frames.append((type_id, bytes(self._buf[data_start : data_start + length])))
+            head += _aligned(FRAME_HEADER.size + length)
+        POSITION.pack_into(self._buf, HEAD_OFFSET, head)
+        return frames
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+            _created.discard(self._shm.name)
+
+
+class EventCodec:
+    """Compact framing of events: a small type id plus the event's JSON body.
+
+    Both processes build the codec from the same ordered list of event type
+    names, so the id is all a frame needs to identify its class. Pydantic
+    events are serialized with ``model_dump_json``; nothing is pickled.
+    """
+
+    def __init__(self, event_types: List[str]):
+        self.event_types = list(event_types)
+        self._ids = {name: type_id for type_id, name in enumerate(self.event_types)}
+
+    @classmethod
+    def for_classes(cls, event_classes: List[type]) -> "EventCodec":
+        return cls([event_type_name(event_class) for event_class in event_classes])
+
+    def encode(self, event: Any) -> Tuple[int, bytes]:
+        type_name, body = encode_event(event)
+        type_id = self._ids.get(type_name)
+        if type_id is None:
+            raise ValueError(f"Event type {type_name} is not registered with codec")
+        return type_id, body
+
+    def decode(self, type_id: int, body: bytes) -> Any:
+        return decode_event(self.event_types[type_id], body)
+
+
+class RingEventSink:
+    """Stands in for the EventManager inside a dispatcher process.
+
+    Dispatchers call ``dispatch_threadsafe`` as usual; events are framed into
+    the ring instead. A full ring is retried with a short back-off for up to
+    ``full_timeout`` seconds before the event is dropped and counted.
+
+    Calls from a thread running an event loop never wait: what fits is
+    written at once and the rest goes to a writer thread, which keeps the
+    frames in order and does the waiting.
+    """
+
+    def __init__(
+        self, ring: ShmRingBuffer, codec: EventCodec, full_timeout: float = 5.0
+    ):
+        self.ring = ring
+        self.codec = codec
+        self.full_timeout = full_timeout
+        self.dropped = 0
+        # The ring has a single producer; serialize this process's threads.
+        self._lock = threading.Lock()
+        self._handed_off = 0
+        self._writer: Optional[ThreadPoolExecutor] = None
+
+    def dispatch_threadsafe(self, event: Any):
+        self.dispatch_many_threadsafe([event])
+
+    def dispatch_many_threadsafe(self, events: List[Any]):
+        frames = [self.codec.encode(event) for event in events]
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(frames)
+            return
+        with self._lock:
+            written = 0
+            # Frames already handed off must reach the ring first.
+            if not self._handed_off:
+                while written < len(frames) and self.ring.try_write(*frames[written]):
+                    written += 1
+            if written == len(frames):
+                return
+            self._handed_off += 1
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(1, thread_name_prefix="ring-writer")
+        self._writer.submit(self._write_handed_off, frames[written:])
+
+    def _write_handed_off(self, frames: List[Tuple[int, bytes]]):
+        try:
+            self._write(frames)
+        finally:
+            with self._lock:
+                self._handed_off -= 1
+
+    def _write(self, frames: List[Tuple[int, bytes]]):
+        for type_id, body in frames:
+            deadline = time.monotonic() + self.full_timeout
+            while True:
+                # Hold the lock per attempt only, so a loop thread is never
+                # stuck behind a writer waiting for room.
+                with self._lock:
+                    if self.ring.try_write(type_id, body):
+                        break
+                if time.monotonic() >= deadline:
+                    with self._lock:
+                        self.dropped += 1
+                    logger.error("Shared-memory ring full, dropped event")
+                    break
+                time.sleep(0.001)
+
+    def close(self):
+        """Wait for the writer thread to write or drop what it was handed."""
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+
+
+def _run_dispatcher(
+    dispatcher_factory: Callable[[], Any],
+    ring_name: str,
+    event_types: List[str],
+    stop_event: Any,
+):
+    ring = ShmRingBuffer(name=ring_name)
+    for type_name in event_types:
+        resolve_event_type(type_name)
+    dispatcher = dispatcher_factory()
+    sink = RingEventSink(ring, EventCodec(event_types))
+    dispatcher.event_manager = sink
+    dispatcher.start()
+    try:
+        stop_event.wait()
+    finally:
+        dispatcher.stop()
+        sink.close()
+        ring.close()
+
+
+class DispatcherProcess:
+    """Runs a trigger dispatcher in its own process, feeding a shared ring.
+
+    ``dispatcher_factory`` must be picklable (e.g. a module-level function)
+    and build the dispatcher inside the child process. ``event_classes``
+    lists every event class the dispatcher can emit.
+    """
+
+    def __init__(
+        self,
+        dispatcher_factory: Callable[[], Any],
+        event_classes: List[type],
+        capacity: int = 4 * 1024 * 1024,
+    ):
+        self.dispatcher_factory = dispatcher_factory
+        self.codec = EventCodec.for_classes(event_classes)
+        self.capacity = capacity
+        self.ring: Optional[ShmRingBuffer] = None
+        self._process: Optional[multiprocessing.Process] = None
+        self._stop_event = multiprocessing.Event()
+
+    def start(self):
+        self.ring = ShmRingBuffer(capacity=self.capacity)
+        self._process = multiprocessing.Process(
+            target=_run_dispatcher,
+            args=(
+                self.dispatcher_factory,
+                self.ring.name,
+                self.codec.event_types,
+                self._stop_event,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        logger.info(f"Started dispatcher process {self._process.pid}")
+
+    def stop(self, timeout: float = 10.0):
+        self._stop_event.set()
+        if self._process:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+        logger.info("Stopped dispatcher process")
+
+    def close(self):
+        if self.ring:
+            self.ring.close()
+            self.ring = None
+
+
+class SharedMemoryTransport:
+    """Pumps events from dispatcher processes into an EventManager.
+
+    A single task on the EventManager's loop drains every ring, decodes the
+    frames and hands each batch to ``dispatch_many``. When all rings are
+    empty it backs off from ``min_idle_sleep`` up to ``max_idle_sleep``.
+    """
+
+    def __init__(
+        self,
+        event_manager: Any,
+        processes: List[DispatcherProcess],
+        max_batch_size: int = 1000,
+        min_idle_sleep: float = 0.0005,
+        max_idle_sleep: float = 0.05,
+    ):
+        self.event_manager = event_manager
+        self.processes = processes
+        self.max_batch_size = max_batch_size
+        self.min_idle_sleep = min_idle_sleep
+        self.max_idle_sleep = max_idle_sleep
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        for process in self.processes:
+            process.start()
+        self._task = asyncio.create_task(self._pump())
+
+    async def _pump(self):
+        idle_sleep = self.min_idle_sleep
+        while True:
+            received = 0
+            for process in self.processes:
+                frames = process.ring.read_batch(self.max_batch_size)
+                if not frames:
+                    continue
+                received += len(frames)
+                events = [process.codec.decode(*frame) for frame in frames]
+                try:
+                    await self.event_manager.dispatch_many(events)
+                except Exception as e:
+                    logger.error(f"Error dispatching events from ring: {e}")
+            if received:
+                idle_sleep = self.min_idle_sleep
+                await asyncio.sleep(0)
+            else:
+                await asyncio.sleep(idle_sleep)
+                idle_sleep = min(idle_sleep * 2, self.max_idle_sleep)
+
+    async def stop(self):
+        for process in self.processes:
+            process.stop()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Deliver whatever the dispatchers wrote before they stopped.
+        for process in self.processes:
+            while process.ring and (frames := process.ring.read_batch()):
+                events = [process.codec.decode(*frame) for frame in frames]
+                await self.event_manager.dispatch_many(events)
+        for process in self.processes:
+            process.close()
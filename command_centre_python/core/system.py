@@ -3,7 +3,7 @@ from typing import List
 from pydantic import Field
 import ell
 from .entities import EntityBase, Service
-from .event_manager import EventManager
+from .event_manager import EventManager, event_manager
 from .utils.triggers import SemanticTriggerDispatcher
 from ..modules.cloud_providers.aws_dispatcher import AWSDispatcher
 from ..modules.cloud_providers.aws_s3_trigger import AWSS3Trigger
@@ -46,7 +46,6 @@ class System(SystemBase):
 # Initialize EllAI
 ell.init(store="./ell_logs", autocommit=True)
 
-event_manager = EventManager()
 semantic_dispatcher = SemanticTriggerDispatcher(event_manager)
 
 # Initialize AWS Dispatcher
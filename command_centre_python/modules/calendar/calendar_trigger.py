@@ -5,7 +5,6 @@ from command_centre_python.utils.triggers import (
     Trigger,
     TriggerEvent,
 )
-import threading
 from datetime import datetime, timedelta
 import logging
 from google.oauth2.credentials import Credentials
@@ -24,33 +23,31 @@ class CalendarEventTriggerDispatcher(PollingTriggerDispatcher):
     calendar_id: str = "primary"  # Default to primary calendar
 
     def start(self):
-        super().start()
         self.service = build("calendar", "v3", credentials=self.credentials)
-        threading.Thread(target=self._poll_and_handle_events, daemon=True).start()
+        super().start()
         logger.info("CalendarEventTriggerDispatcher started")
 
     def _poll_and_handle_events(self):
-        while not self._stop_event.is_set():
-            now = datetime.utcnow().isoformat() + "Z"  # 'Z' indicates UTC time
-            events_result = (
-                self.service.events()
-                .list(
-                    calendarId=self.calendar_id,
-                    timeMin=now,
-                    maxResults=10,
-                    singleEvents=True,
-                    orderBy="startTime",
-                )
-                .execute()
+        now = datetime.utcnow().isoformat() + "Z"  # 'Z' indicates UTC time
+        events_result = (
+            self.service.events()
+            .list(
+                calendarId=self.calendar_id,
+                timeMin=now,
+                maxResults=10,
+                singleEvents=True,
+                orderBy="startTime",
             )
-            events = events_result.get("items", [])
+            .execute()
+        )
+        events = events_result.get("items", [])
 
-            for event in events:
-                self.handle_event(event)
-            self._stop_event.wait(self.update_interval)
+        self.dispatch_many(
+            [CalendarEventTriggerFired(event_data=event) for event in events]
+        )
 
     def stop(self):
-        self._stop_event.set()
+        super().stop()
         logger.info("CalendarEventTriggerDispatcher stopped")
 
     def handle_event(self, event_data: dict):
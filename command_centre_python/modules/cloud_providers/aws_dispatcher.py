@@ -1,10 +1,17 @@
 import boto3
 from .dispatcher_base import CloudProviderDispatcherBase
+from command_centre_python.utils.polling_scheduler import AdaptiveInterval
 from typing import Dict, Any
 import asyncio
 
 
 class AWSDispatcher(CloudProviderDispatcherBase):
+    update_interval: float = 5
+    # Opt in to back off towards max_interval while no events arrive.
+    adaptive_polling: bool = False
+    min_interval: float = 1
+    max_interval: float = 60
+
     def __init__(self, aws_access_key_id, aws_secret_access_key, region_name):
         self.session = boto3.Session(
             aws_access_key_id=aws_access_key_id,
@@ -20,13 +27,22 @@ class AWSDispatcher(CloudProviderDispatcherBase):
 
     async def monitor_events(self):
         self._running = True
+        if self.adaptive_polling:
+            interval = AdaptiveInterval(
+                self.update_interval, self.min_interval, self.max_interval
+            )
+        else:
+            interval = AdaptiveInterval(
+                self.update_interval, self.update_interval, self.update_interval
+            )
         while self._running:
             # Poll for AWS events (e.g., CloudWatch events)
-            await asyncio.sleep(5)  # Adjust polling interval as needed
+            await asyncio.sleep(interval.current)
             # Fetch events and dispatch
             events = self.fetch_events()
             for event in events:
                 self.dispatch_event(event)
+            interval.update(len(events))
 
     def fetch_events(self) -> list:
         # Implement logic to fetch events from AWS services
@@ -1,39 +1,40 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
-    TriggerDispatcherBase,
+    PollingTriggerDispatcher,
     TriggerEvent,
     Trigger,
 )
-import threading
+from command_centre_python.utils.keyword_matcher import (
+    KeywordCondition,
+    KeywordIndex,
+    keyword_in,
+)
 import imaplib
 import email
-import time
 
 
 class EmailReceivedTriggerFired(TriggerEvent):
     event_data: dict
 
 
-class EmailReceivedTriggerDispatcher(TriggerDispatcherBase):
+class EmailReceivedTriggerDispatcher(PollingTriggerDispatcher):
     email_address: str
     credentials: Dict[str, str]
-    _stop_event: threading.Event = threading.Event()
-
-    def start(self):
-        threading.Thread(target=self._check_email, daemon=True).start()
+    update_interval: int = 10  # In seconds
+    trigger_index_factory = KeywordIndex
 
-    def _check_email(self):
+    def _poll_and_handle_events(self) -> int:
         # Implement email checking logic here
-        while not self._stop_event.is_set():
-            # Placeholder for actual implementation
-            time.sleep(10)
-
-    def stop(self):
-        self._stop_event.set()
+        return 0
 
     def handle_event(self, event_data: dict):
-        trigger_event = EmailReceivedTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = EmailReceivedTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
 
@@ -41,12 +42,30 @@ class EmailReceivedTrigger(Trigger):
     dispatcher: EmailReceivedTriggerDispatcher
     sender_email: Optional[str]
     subject_contains: Optional[str]
+    case_sensitive: bool = True
+    whole_word: bool = False
 
     def check_conditions(self, event_data: Dict[str, Any]) -> bool:
-        if self.sender_email and event_data.get("sender") != self.sender_email:
-            return False
-        if self.subject_contains and self.subject_contains not in event_data.get(
-            "subject", ""
+        if self.subject_contains and not keyword_in(
+            event_data.get("subject", ""),
+            self.subject_contains,
+            self.case_sensitive,
+            self.whole_word,
         ):
             return False
-        return True
+        return self.check_residual_conditions(event_data)
+
+    def keyword_conditions(self) -> Optional[List[KeywordCondition]]:
+        if not self.subject_contains:
+            return []
+        return [
+            KeywordCondition(
+                field="subject",
+                keyword=self.subject_contains,
+                case_sensitive=self.case_sensitive,
+                whole_word=self.whole_word,
+            )
+        ]
+
+    def check_residual_conditions(self, event_data: Dict[str, Any]) -> bool:
+        return not self.sender_email or event_data.get("sender") == self.sender_email
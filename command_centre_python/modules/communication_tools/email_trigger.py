@@ -1,14 +1,13 @@
 from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
-    TriggerDispatcherBase,
+    PollingTriggerDispatcher,
     Trigger,
     TriggerEvent,
 )
-import threading
+from command_centre_python.utils.condition_index import ConditionIndex
 import imaplib
 import email
-import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,66 +18,72 @@ class EmailTriggerFired(TriggerEvent):
     body: str
     sender: str
 
+    def __repr__(self) -> str:
+        return f"EmailTriggerFired(subject='{self.subject}', sender='{self.sender}')"
+
 
-class EmailTriggerDispatcher(TriggerDispatcherBase):
+class EmailTriggerDispatcher(PollingTriggerDispatcher):
     email: str
     smtp_server: str
     smtp_port: int
     username: str
     password: str
-    _stop_event: threading.Event = Field(default_factory=threading.Event)
+    update_interval: int = 10  # In seconds
+    trigger_index_factory = ConditionIndex
     _logger: logging.Logger = Field(
         default_factory=lambda: logging.getLogger(f"{__name__}_{id(__name__)}")
     )
-    _thread: Optional[threading.Thread] = None
     _imap: Optional[imaplib.IMAP4_SSL] = None
 
     def start(self):
-        self._stop_event = threading.Event()
         self._imap = imaplib.IMAP4_SSL(self.smtp_server, self.smtp_port)
         self._imap.login(self.username, self.password)
-        self._thread = threading.Thread(target=self._email_loop, daemon=True)
-        self._thread.start()
+        super().start()
         logger.info("EmailTriggerDispatcher started")
 
     def stop(self):
-        self._stop_event.set()
+        super().stop()
         if self._imap:
             try:
                 self._imap.logout()
             except Exception as e:
                 self._logger.error(f"Error logging out from IMAP: {e}")
-        if self._thread:
-            self._thread.join()
         logger.info("EmailTriggerDispatcher stopped")
 
-    def _email_loop(self):
-        while not self._stop_event.is_set():
-            try:
-                self._imap.select("INBOX")
-                result, data = self._imap.search(None, "UNSEEN")
+    def _poll_and_handle_events(self) -> int:
+        self._imap.select("INBOX")
+        result, data = self._imap.search(None, "UNSEEN")
+        if result != "OK":
+            return 0
+        received = data[0].split()
+        events = []
+        try:
+            for num in received:
+                result, msg_data = self._imap.fetch(num, "(RFC822)")
                 if result == "OK":
-                    for num in data[0].split():
-                        result, msg_data = self._imap.fetch(num, "(RFC822)")
-                        if result == "OK":
-                            msg = email.message_from_bytes(msg_data[0][1])
-                            subject = self._decode_mime_words(msg["Subject"])
-                            from_ = msg.get("From")
-                            body = self._get_email_body(msg)
-                            self._logger.info(
-                                f"Received email from {from_} with subject '{subject}'"
-                            )
-                            event_data = {
-                                "subject": subject,
-                                "body": body,
-                                "sender": from_,
-                            }
-                            self.handle_event(event_data)
-                            self._imap.store(num, "+FLAGS", "\\Seen")
-                time.sleep(10)  # Poll every 10 seconds
-            except Exception as e:
-                self._logger.error(f"Error in email loop: {e}")
-                time.sleep(10)
+                    msg = email.message_from_bytes(msg_data[0][1])
+                    subject = self._decode_mime_words(msg["Subject"])
+                    from_ = msg.get("From")
+                    body = self._get_email_body(msg)
+                    self._logger.info(
+                        f"Received email from {from_} with subject '{subject}'"
+                    )
+                    event_data = {
+                        "subject": subject,
+                        "body": body,
+                        "sender": from_,
+                    }
+                    trigger_ids = self.matched_trigger_ids(event_data)
+                    if trigger_ids is not None:
+                        events.append(
+                            EmailTriggerFired(**event_data, trigger_ids=trigger_ids)
+                        )
+                    self._imap.store(num, "+FLAGS", "\\Seen")
+        finally:
+            # Emails already flagged as seen must still be dispatched.
+            self.dispatch_many(events)
+        # Unmatched emails still count as activity for the adaptive interval.
+        return len(received)
 
     def _decode_mime_words(self, s):
         decoded_words = email.header.decode_header(s)
@@ -104,7 +109,10 @@ class EmailTriggerDispatcher(TriggerDispatcherBase):
         return ""
 
     def handle_event(self, event_data: Dict[str, Any]):
-        trigger_event = EmailTriggerFired(**event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = EmailTriggerFired(**event_data, trigger_ids=trigger_ids)
         self.dispatch(trigger_event)
 
 
@@ -124,11 +132,13 @@ class EmailTrigger(Trigger):
                 return False
         return True
 
+    def equality_conditions(self) -> Optional[Dict[str, Any]]:
+        return {
+            key: value
+            for key, value in self.conditions.items()
+            if key != "subject_prefix"
+        }
 
-class EmailTriggerFired(TriggerEvent, BaseModel):
-    subject: str
-    body: str
-    sender: str
-
-    def __repr__(self) -> str:
-        return f"EmailTriggerFired(subject='{self.subject}', sender='{self.sender}')"
+    def check_residual_conditions(self, event_data: Dict[str, Any]) -> bool:
+        subject_prefix = self.conditions.get("subject_prefix")
+        return not subject_prefix or event_data["subject"].startswith(subject_prefix)
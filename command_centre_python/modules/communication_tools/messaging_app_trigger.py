@@ -5,6 +5,11 @@ from command_centre_python.utils.triggers import (
     Trigger,
     TriggerEvent,
 )
+from command_centre_python.utils.keyword_matcher import (
+    KeywordCondition,
+    KeywordIndex,
+    keyword_in,
+)
 import threading
 
 
@@ -16,13 +21,19 @@ class MessagingAppTriggerDispatcher(PollingTriggerDispatcher):
     platform: str  # e.g., 'Slack', 'Teams'
     credentials: Dict[str, str]
     channels: List[str]
+    trigger_index_factory = KeywordIndex
 
     def _poll_and_handle_events(self):
         # Implement messaging app monitoring logic here
         pass
 
     def handle_event(self, event_data: dict):
-        trigger_event = MessagingAppTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = MessagingAppTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
 
@@ -30,11 +41,28 @@ class MessagingAppMessageTrigger(Trigger):
     dispatcher: MessagingAppTriggerDispatcher
     keyword: Optional[str]
     user: Optional[str]
+    case_sensitive: bool = False
+    whole_word: bool = False
 
     def check_conditions(self, event_data: Dict[str, Any]) -> bool:
         content = event_data.get("content", "")
-        if self.keyword and self.keyword.lower() not in content.lower():
-            return False
-        if self.user and event_data.get("user") != self.user:
+        if self.keyword and not keyword_in(
+            content, self.keyword, self.case_sensitive, self.whole_word
+        ):
             return False
-        return True
+        return self.check_residual_conditions(event_data)
+
+    def keyword_conditions(self) -> Optional[List[KeywordCondition]]:
+        if not self.keyword:
+            return []
+        return [
+            KeywordCondition(
+                field="content",
+                keyword=self.keyword,
+                case_sensitive=self.case_sensitive,
+                whole_word=self.whole_word,
+            )
+        ]
+
+    def check_residual_conditions(self, event_data: Dict[str, Any]) -> bool:
+        return not self.user or event_data.get("user") == self.user
@@ -1,16 +1,18 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
     TriggerDispatcherBase,
     Trigger,
     TriggerEvent,
 )
+from command_centre_python.utils.condition_index import ConditionIndex
 from flask import Flask, request, jsonify
 import threading
 
 
 class WebhookTriggerDispatcher(TriggerDispatcherBase):
     url: str
+    trigger_index_factory = ConditionIndex
     _stop_event: threading.Event = Field(default_factory=threading.Event)
     _logger: logging.Logger = Field(
         default_factory=lambda: logging.getLogger(f"{__name__}_{id(__name__)}")
@@ -46,6 +48,11 @@ class WebhookTriggerDispatcher(TriggerDispatcherBase):
         self.handle_event(payload)
         return jsonify({"status": "received"}), 200
 
+    def handle_event(self, payload: Dict[str, Any]):
+        trigger_ids = self.matched_trigger_ids(payload)
+        if trigger_ids is not None:
+            self.dispatch(WebhookTriggerFired(payload=payload, trigger_ids=trigger_ids))
+
 
 class WebhookTrigger(Trigger):
     dispatcher: WebhookTriggerDispatcher
@@ -56,6 +63,9 @@ class WebhookTrigger(Trigger):
             event_data.get(key) == value for key, value in self.conditions.items()
         )
 
+    def equality_conditions(self) -> Optional[Dict[str, Any]]:
+        return dict(self.conditions)
+
 
 class WebhookTriggerFired(TriggerEvent, BaseModel):
     payload: Dict[str, Any]
@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
     TriggerDispatcherBase,
@@ -6,6 +6,7 @@ from command_centre_python.utils.triggers import (
     TriggerEvent,
     PollingTriggerDispatcher,
 )
+from command_centre_python.utils.condition_index import ConditionIndex
 
 
 class UserSignupTriggerFired(TriggerEvent):
@@ -14,13 +15,19 @@ class UserSignupTriggerFired(TriggerEvent):
 
 class UserSignupTriggerDispatcher(PollingTriggerDispatcher):
     platform: str  # e.g., 'Website', 'MobileApp'
+    trigger_index_factory = ConditionIndex
 
     def _poll_and_handle_events(self):
         # Implement user signup monitoring logic here
         pass
 
     def handle_event(self, event_data: dict):
-        trigger_event = UserSignupTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = UserSignupTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
 
@@ -33,3 +40,6 @@ class UserSignupTrigger(Trigger):
             if event_data.get(key) != value:
                 return False
         return True
+
+    def equality_conditions(self) -> Optional[Dict[str, Any]]:
+        return dict(self.conditions)
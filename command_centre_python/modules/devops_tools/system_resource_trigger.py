@@ -1,10 +1,14 @@
-from typing import Dict, Any, Literal
+from typing import Dict, Any, List, Literal, Optional
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
     PollingTriggerDispatcher,
     Trigger,
     TriggerEvent,
 )
+from command_centre_python.utils.threshold_index import (
+    ThresholdCondition,
+    ThresholdIndex,
+)
 import psutil  # For system resource monitoring
 
 
@@ -15,6 +19,7 @@ class SystemResourceTriggerFired(TriggerEvent):
 class SystemResourceTriggerDispatcher(PollingTriggerDispatcher):
     resource_type: Literal["cpu", "memory", "disk"]
     threshold: float  # Percentage
+    trigger_index_factory = ThresholdIndex
 
     def _poll_and_handle_events(self):
         usage = self._get_resource_usage()
@@ -32,7 +37,12 @@ class SystemResourceTriggerDispatcher(PollingTriggerDispatcher):
             return None
 
     def handle_event(self, event_data: dict):
-        trigger_event = SystemResourceTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = SystemResourceTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
 
@@ -50,3 +60,10 @@ class SystemResourceThresholdTrigger(Trigger):
         if self.condition == "below" and usage < self.threshold_value:
             return True
         return False
+
+    def threshold_conditions(self) -> Optional[List[ThresholdCondition]]:
+        return [
+            ThresholdCondition(
+                field="usage", comparison=self.condition, value=self.threshold_value
+            )
+        ]
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Literal
+from typing import Dict, Any, List, Literal, Optional
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
     TriggerDispatcherBase,
@@ -6,6 +6,10 @@ from command_centre_python.utils.triggers import (
     TriggerEvent,
     PollingTriggerDispatcher,
 )
+from command_centre_python.utils.threshold_index import (
+    ThresholdCondition,
+    ThresholdIndex,
+)
 
 
 class PaymentTransactionTriggerFired(TriggerEvent):
@@ -15,15 +19,35 @@ class PaymentTransactionTriggerFired(TriggerEvent):
 class PaymentTransactionTriggerDispatcher(PollingTriggerDispatcher):
     payment_provider: str  # e.g., 'Stripe', 'PayPal'
     credentials: Dict[str, str]
+    trigger_index_factory = ThresholdIndex
 
     def _poll_and_handle_events(self):
         # Implement payment transaction monitoring logic here
         pass
 
     def handle_event(self, event_data: dict):
-        trigger_event = PaymentTransactionTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = PaymentTransactionTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
+    def handle_events(self, events_data: List[dict]):
+        """Evaluate a batch of transactions in one pass and dispatch the matches."""
+        self.dispatch_many(
+            [
+                PaymentTransactionTriggerFired(
+                    event_data=event_data, trigger_ids=trigger_ids
+                )
+                for event_data, trigger_ids in zip(
+                    events_data, self.matched_trigger_ids_many(events_data)
+                )
+                if trigger_ids is not None
+            ]
+        )
+
 
 class PaymentTransactionTrigger(Trigger):
     dispatcher: PaymentTransactionTriggerDispatcher
@@ -41,3 +65,18 @@ class PaymentTransactionTrigger(Trigger):
             if amount >= self.amount_condition["less_than"]:
                 return False
         return True
+
+    def threshold_conditions(self) -> Optional[List[ThresholdCondition]]:
+        where = {"transaction_type": self.transaction_type}
+        conditions = [
+            ThresholdCondition(
+                field="amount",
+                comparison=comparison,
+                value=self.amount_condition[key],
+                where=where,
+            )
+            for key, comparison in (("greater_than", "above"), ("less_than", "below"))
+            if key in self.amount_condition
+        ]
+        # A trigger without amount bounds only filters on the transaction type.
+        return conditions or None
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List, Literal
+from typing import Dict, Any, List, Literal, Optional
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
     TriggerDispatcherBase,
@@ -6,6 +6,10 @@ from command_centre_python.utils.triggers import (
     TriggerEvent,
     PollingTriggerDispatcher,
 )
+from command_centre_python.utils.threshold_index import (
+    ThresholdCondition,
+    ThresholdIndex,
+)
 import threading
 
 
@@ -17,25 +21,79 @@ class StockMarketTriggerFired(TriggerEvent):
 class StockCondition(BaseModel):
     stock_symbol: str
     comparison: Literal["above", "below", "equal"]
+    threshold: float
+    field: str = "price"  # Quote field compared against the threshold
+
+    def is_met(self, event_data: Dict[str, Any]) -> bool:
+        if event_data.get("stock_symbol") != self.stock_symbol:
+            return False
+        value = event_data.get(self.field)
+        if value is None:
+            return False
+        if self.comparison == "above":
+            return value > self.threshold
+        if self.comparison == "below":
+            return value < self.threshold
+        return value == self.threshold
 
 
 class StockMarketTriggerDispatcher(PollingTriggerDispatcher):
     stock_symbols: List[str]
     update_interval: int  # Seconds between updates
+    trigger_index_factory = ThresholdIndex
 
     def _poll_and_handle_events(self):
         # Implement stock market monitoring logic here
         pass
 
     def handle_event(self, event_data: dict):
-        trigger_event = StockMarketTriggerFired(event_data=event_data)
-        self.dispatch(trigger_event)
+        self.handle_events([event_data])
+
+    def handle_events(self, events_data: List[dict]):
+        """Evaluate a batch of quotes in one pass and dispatch the matches."""
+        if not len(self.trigger_index):
+            self.dispatch_many(
+                [
+                    StockMarketTriggerFired(
+                        event_data=event_data, triggered_conditions=[]
+                    )
+                    for event_data in events_data
+                ]
+            )
+            return
+        events = []
+        matches = self.trigger_index.match_many_details(events_data)
+        for event_data, details in zip(events_data, matches):
+            triggered_conditions = [
+                trigger.conditions[position]
+                for trigger, positions in details
+                for position in positions
+            ]
+            if triggered_conditions:
+                events.append(
+                    StockMarketTriggerFired(
+                        event_data=event_data,
+                        triggered_conditions=triggered_conditions,
+                    )
+                )
+        self.dispatch_many(events)
 
 
 class StockMarketTrigger(Trigger):
     dispatcher: StockMarketTriggerDispatcher
     conditions: List[StockCondition]
+    threshold_match = "any"  # Fires when any of its conditions is met
 
     def check_conditions(self, event_data: Dict[str, Any]) -> bool:
-        # Implement condition checks based on StockCondition
-        return True
+        return any(condition.is_met(event_data) for condition in self.conditions)
+
+    def threshold_conditions(self) -> Optional[List[ThresholdCondition]]:
+        return [
+            ThresholdCondition(
+                field=condition.field,
+                comparison=condition.comparison,
+                value=condition.threshold,
+                where={"stock_symbol": condition.stock_symbol},
+            )
+            for condition in self.conditions
+        ]
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Literal
+from typing import Dict, Any, List, Literal, Optional, Union
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
     TriggerDispatcherBase,
@@ -6,30 +6,74 @@ from command_centre_python.utils.triggers import (
     Trigger,
     PollingTriggerDispatcher,
 )
+from command_centre_python.utils.geofence_index import (
+    CircleArea,
+    GeoArea,
+    GeoFenceIndex,
+    PolygonArea,
+    parse_geo_area,
+)
 import threading
 
 
 class GeoLocationTriggerFired(TriggerEvent):
     event_data: dict
+    transition: Optional[Literal["enter", "exit"]] = None
+    area: Optional[GeoArea] = None
 
 
 class GeoLocationTriggerDispatcher(PollingTriggerDispatcher):
     device_id: str  # ID of the device to monitor
+    trigger_index_factory = GeoFenceIndex
 
     def _poll_and_handle_events(self):
         # Implement geolocation monitoring logic here
         pass
 
     def handle_event(self, event_data: dict):
-        trigger_event = GeoLocationTriggerFired(event_data=event_data)
-        self.dispatch(trigger_event)
+        self.handle_events([event_data])
+
+    def handle_events(self, events_data: List[dict]):
+        """Track a batch of positions, in order, and dispatch fence transitions.
+
+        Positions without a ``device_id`` are attributed to this dispatcher's
+        device. Without registered fences every position is dispatched.
+        """
+        events = []
+        for event_data in events_data:
+            event_data = {"device_id": self.device_id, **event_data}
+            if not len(self.trigger_index):
+                events.append(GeoLocationTriggerFired(event_data=event_data))
+                continue
+            for trigger in self.matching_triggers(event_data):
+                events.append(
+                    GeoLocationTriggerFired(
+                        event_data=event_data,
+                        transition=trigger.enter_exit,
+                        area=trigger.geofence(),
+                        trigger_ids=[id(trigger)],
+                    )
+                )
+        self.dispatch_many(events)
 
 
 class GeoFenceTrigger(Trigger):
     dispatcher: GeoLocationTriggerDispatcher
-    area: Dict[str, Any]  # Define the geofence area
+    area: Union[CircleArea, PolygonArea, Dict[str, Any]]  # Circle or polygon fence
     enter_exit: Literal["enter", "exit"]
 
+    def geofence(self) -> GeoArea:
+        return parse_geo_area(self.area)
+
     def check_conditions(self, event_data: Dict[str, Any]) -> bool:
-        # Implement geofence condition check
-        return True
+        """Whether the position lies inside the fence.
+
+        Enter/exit transitions need per-device state and are detected by the
+        dispatcher's ``GeoFenceIndex``.
+        """
+        try:
+            latitude = float(event_data["latitude"])
+            longitude = float(event_data["longitude"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return self.geofence().contains(latitude, longitude)
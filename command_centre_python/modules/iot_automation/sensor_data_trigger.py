@@ -1,10 +1,14 @@
-from typing import Dict, Any, Literal
+from typing import Dict, Any, List, Literal, Optional
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
     PollingTriggerDispatcher,
     Trigger,
     TriggerEvent,
 )
+from command_centre_python.utils.threshold_index import (
+    ThresholdCondition,
+    ThresholdIndex,
+)
 
 
 class SensorDataTriggerFired(TriggerEvent):
@@ -13,15 +17,33 @@ class SensorDataTriggerFired(TriggerEvent):
 
 class SensorDataTriggerDispatcher(PollingTriggerDispatcher):
     sensor_id: str  # ID of the sensor to monitor
+    trigger_index_factory = ThresholdIndex
 
     def _poll_and_handle_events(self):
         # Implement sensor data monitoring logic here
         pass
 
     def handle_event(self, event_data: dict):
-        trigger_event = SensorDataTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = SensorDataTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
+    def handle_events(self, events_data: List[dict]):
+        """Evaluate a batch of readings in one pass and dispatch the matches."""
+        self.dispatch_many(
+            [
+                SensorDataTriggerFired(event_data=event_data, trigger_ids=trigger_ids)
+                for event_data, trigger_ids in zip(
+                    events_data, self.matched_trigger_ids_many(events_data)
+                )
+                if trigger_ids is not None
+            ]
+        )
+
 
 class SensorThresholdTrigger(Trigger):
     dispatcher: SensorDataTriggerDispatcher
@@ -37,3 +59,10 @@ class SensorThresholdTrigger(Trigger):
         if self.condition == "below" and sensor_value < self.threshold_value:
             return True
         return False
+
+    def threshold_conditions(self) -> Optional[List[ThresholdCondition]]:
+        return [
+            ThresholdCondition(
+                field="value", comparison=self.condition, value=self.threshold_value
+            )
+        ]
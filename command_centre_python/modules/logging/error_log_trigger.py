@@ -1,10 +1,15 @@
-from typing import Dict, Any, Optional, Literal
+from typing import Dict, Any, List, Optional, Literal
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
     PollingTriggerDispatcher,
     Trigger,
     TriggerEvent,
 )
+from command_centre_python.utils.keyword_matcher import (
+    KeywordCondition,
+    KeywordIndex,
+    keyword_in,
+)
 import time
 
 
@@ -15,6 +20,7 @@ class ErrorLogTriggerFired(TriggerEvent):
 class ErrorLogTriggerDispatcher(PollingTriggerDispatcher):
     log_file_path: str
     error_level: Literal["ERROR", "WARNING", "CRITICAL"]
+    trigger_index_factory = KeywordIndex
     _last_position: int = 0
 
     def _poll_and_handle_events(self):
@@ -22,25 +28,55 @@ class ErrorLogTriggerDispatcher(PollingTriggerDispatcher):
             log_file.seek(self._last_position)
             lines = log_file.readlines()
             self._last_position = log_file.tell()
-            for line in lines:
-                if self.error_level in line:
-                    self.handle_event(
-                        {"message": line.strip(), "level": self.error_level}
-                    )
+        events_data = [
+            {"message": line.strip(), "level": self.error_level}
+            for line in lines
+            if self.error_level in line
+        ]
+        self.dispatch_many(
+            [
+                ErrorLogTriggerFired(event_data=event_data, trigger_ids=trigger_ids)
+                for event_data, trigger_ids in zip(
+                    events_data, self.matched_trigger_ids_many(events_data)
+                )
+                if trigger_ids is not None
+            ]
+        )
 
     def handle_event(self, event_data: dict):
-        trigger_event = ErrorLogTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = ErrorLogTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
 
 class ErrorLogTrigger(Trigger):
     dispatcher: ErrorLogTriggerDispatcher
     error_message_contains: Optional[str]
+    case_sensitive: bool = True
+    whole_word: bool = False
 
     def check_conditions(self, event_data: Dict[str, Any]) -> bool:
-        if (
-            self.error_message_contains
-            and self.error_message_contains not in event_data.get("message", "")
+        if self.error_message_contains and not keyword_in(
+            event_data.get("message", ""),
+            self.error_message_contains,
+            self.case_sensitive,
+            self.whole_word,
         ):
             return False
         return True
+
+    def keyword_conditions(self) -> Optional[List[KeywordCondition]]:
+        if not self.error_message_contains:
+            return []
+        return [
+            KeywordCondition(
+                field="message",
+                keyword=self.error_message_contains,
+                case_sensitive=self.case_sensitive,
+                whole_word=self.whole_word,
+            )
+        ]
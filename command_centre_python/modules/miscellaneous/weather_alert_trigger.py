@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 from command_centre_python.utils.triggers import (
@@ -6,6 +6,7 @@ from command_centre_python.utils.triggers import (
     Trigger,
     TriggerEvent,
 )
+from command_centre_python.utils.condition_index import ConditionIndex
 
 
 class WeatherAlertTriggerFired(TriggerEvent):
@@ -34,6 +35,7 @@ class WeatherAlertTriggerDispatcher(PollingTriggerDispatcher):
     location: str
     alert_types: List[str]
     api_key: str
+    trigger_index_factory = ConditionIndex
 
     def __init__(self, *args, **kwargs):
         super().__init__()
@@ -45,7 +47,12 @@ class WeatherAlertTriggerDispatcher(PollingTriggerDispatcher):
             self.handle_event(alert)
 
     def handle_event(self, event_data: dict):
-        trigger_event = WeatherAlertTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = WeatherAlertTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
 
@@ -63,3 +70,8 @@ class WeatherAlertTrigger(Trigger):
                 return False
 
         return True
+
+    def equality_conditions(self) -> Optional[Dict[str, Any]]:
+        if self.conditions.get("type", self.alert_type) != self.alert_type:
+            return None
+        return {**self.conditions, "type": self.alert_type}
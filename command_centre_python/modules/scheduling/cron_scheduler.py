@@ -0,0 +1,153 @@
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from croniter import croniter
+
+logger = logging.getLogger(__name__)
+
+
+class _CronEntry:
+    def __init__(self, dispatcher: Any, schedule: str, start: datetime):
+        self.dispatcher = dispatcher
+        self.schedule = schedule
+        self.cron = croniter(schedule, start)
+        self.next_fire: datetime = self.cron.get_next(datetime)
+        self.cancelled = False
+
+
+class CronScheduler:
+    """A single thread that fires every registered cron schedule.
+
+    Next fire times are kept in a heap, so the thread sleeps until the
+    earliest one whatever the number of schedules. All entries due at the
+    same wake-up are fired together, and each dispatcher receives its fires
+    in one ``handle_events`` call.
+
+    After the process was suspended (or the thread fell behind), every
+    missed slot is fired in order with its scheduled time as the
+    timestamp, up to ``max_catch_up`` per schedule; further missed slots are
+    skipped. With ``catch_up=False`` only the latest missed slot fires. The
+    thread never sleeps longer than ``max_sleep`` so clock jumps are noticed
+    promptly.
+    """
+
+    def __init__(
+        self, catch_up: bool = True, max_catch_up: int = 100, max_sleep: float = 30.0
+    ):
+        self.catch_up = catch_up
+        self.max_catch_up = max_catch_up
+        self.max_sleep = max_sleep
+        self.skipped = 0
+        self._heap: List[Tuple[float, int, _CronEntry]] = []
+        self._entries: Dict[int, _CronEntry] = {}
+        self._sequence = 0
+        self._wakeup = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def add(self, dispatcher: Any, schedule: str):
+        """Fire ``dispatcher.handle_events`` on every slot of ``schedule``."""
+        entry = _CronEntry(dispatcher, schedule, datetime.now())
+        with self._wakeup:
+            previous = self._entries.pop(id(dispatcher), None)
+            if previous is not None:
+                previous.cancelled = True
+            self._entries[id(dispatcher)] = entry
+            self._push(entry)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+
+    def remove(self, dispatcher: Any):
+        with self._wakeup:
+            entry = self._entries.pop(id(dispatcher), None)
+            if entry is not None:
+                # Cancelled entries are discarded when they reach the heap top.
+                entry.cancelled = True
+
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _push(self, entry: _CronEntry):
+        self._sequence += 1
+        heapq.heappush(self._heap, (entry.next_fire.timestamp(), self._sequence, entry))
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self._stopped:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    now = time.time()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    timeout = self.max_sleep
+                    if self._heap:
+                        timeout = min(self._heap[0][0] - now, timeout)
+                    self._wakeup.wait(timeout)
+                if self._stopped:
+                    return
+                fires = self._collect_due(now)
+            for dispatcher, events_data in fires:
+                try:
+                    dispatcher.handle_events(events_data)
+                except Exception as e:
+                    logger.error(f"Error firing schedule for {dispatcher}: {e}")
+
+    def _collect_due(self, now: float) -> List[Tuple[Any, List[Dict[str, Any]]]]:
+        now_dt = datetime.fromtimestamp(now)
+        fires = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, entry = heapq.heappop(self._heap)
+            if entry.cancelled:
+                continue
+            slots = [entry.next_fire]
+            next_fire = entry.cron.get_next(datetime)
+            while next_fire <= now_dt and len(slots) < self.max_catch_up:
+                slots.append(next_fire)
+                next_fire = entry.cron.get_next(datetime)
+            if next_fire <= now_dt:
+                entry.cron = croniter(entry.schedule, now_dt)
+                next_fire = entry.cron.get_next(datetime)
+                self.skipped += 1
+                logger.warning(
+                    f"Schedule '{entry.schedule}' fell more than "
+                    f"{self.max_catch_up} slots behind, skipping to {next_fire}"
+                )
+            if not self.catch_up:
+                slots = slots[-1:]
+            entry.next_fire = next_fire
+            self._push(entry)
+            fires.append(
+                (
+                    entry.dispatcher,
+                    [
+                        {
+                            "timestamp": slot.astimezone(timezone.utc)
+                            .replace(tzinfo=None)
+                            .isoformat(),
+                            # Slots older than the latest one were missed.
+                            "catch_up": slot is not slots[-1],
+                        }
+                        for slot in slots
+                    ],
+                )
+            )
+        return fires
+
+
+default_scheduler = CronScheduler()
@@ -1,14 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
     TriggerDispatcherBase,
     TriggerEvent,
     Trigger,
 )
-import threading
-import time
 from datetime import datetime
-from croniter import croniter
+from .cron_scheduler import CronScheduler, default_scheduler
 
 
 class TimeTriggerFired(TriggerEvent):
@@ -17,27 +15,23 @@ class TimeTriggerFired(TriggerEvent):
 
 class TimeTriggerDispatcher(TriggerDispatcherBase):
     schedule: str  # e.g., cron expression
-    _stop_event: threading.Event = Field(default_factory=threading.Event)
+    scheduler: CronScheduler = default_scheduler  # Shared by every dispatcher
 
     def start(self):
-        threading.Thread(target=self._run_schedule, daemon=True).start()
-
-    def _run_schedule(self):
-        cron = croniter(self.schedule, datetime.now())
-        while not self._stop_event.is_set():
-            next_run = cron.get_next(datetime)
-            wait_time = (next_run - datetime.now()).total_seconds()
-            if self._stop_event.wait(wait_time):
-                break
-            self.handle_event({"timestamp": datetime.utcnow().isoformat()})
+        self.scheduler.add(self, self.schedule)
 
     def stop(self):
-        self._stop_event.set()
+        self.scheduler.remove(self)
 
     def handle_event(self, event_data: dict):
         trigger_event = TimeTriggerFired(event_data=event_data)
         self.dispatch(trigger_event)
 
+    def handle_events(self, events_data: List[dict]):
+        self.dispatch_many(
+            [TimeTriggerFired(event_data=event_data) for event_data in events_data]
+        )
+
 
 class TimeTrigger(Trigger):
     dispatcher: TimeTriggerDispatcher
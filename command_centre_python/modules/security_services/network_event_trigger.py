@@ -5,23 +5,31 @@ from command_centre_python.utils.triggers import (
     Trigger,
     TriggerEvent,
 )
+from command_centre_python.utils.condition_index import ConditionIndex
 import threading
 
 
 class NetworkEventTriggerFired(TriggerEvent):
     event_data: dict
+    priority: int = 1  # Security events go ahead of everything else
 
 
 class NetworkEventTriggerDispatcher(PollingTriggerDispatcher):
     ip_addresses: List[str]
     ports: List[int]
+    trigger_index_factory = ConditionIndex
 
     def _poll_and_handle_events(self):
         # Implement network event monitoring logic here
         pass
 
     def handle_event(self, event_data: dict):
-        trigger_event = NetworkEventTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = NetworkEventTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
 
@@ -37,3 +45,9 @@ class NetworkEventTrigger(Trigger):
             if event_data.get(key) != value:
                 return False
         return True
+
+    def equality_conditions(self) -> Optional[Dict[str, Any]]:
+        if self.conditions.get("protocol", self.protocol) != self.protocol:
+            # Contradictory conditions; let check_conditions reject every event.
+            return None
+        return {**self.conditions, "protocol": self.protocol}
@@ -5,6 +5,11 @@ from command_centre_python.utils.triggers import (
     Trigger,
     TriggerEvent,
 )
+from command_centre_python.utils.keyword_matcher import (
+    KeywordCondition,
+    KeywordIndex,
+    keyword_in,
+)
 
 
 class SocialMediaTriggerFired(TriggerEvent):
@@ -15,13 +20,19 @@ class SocialMediaTriggerDispatcher(PollingTriggerDispatcher):
     platform: str  # e.g., 'Twitter', 'Facebook'
     credentials: Dict[str, str]
     keywords: List[str]
+    trigger_index_factory = KeywordIndex
 
     def _poll_and_handle_events(self):
         # Implement social media monitoring logic here
         pass
 
     def handle_event(self, event_data: dict):
-        trigger_event = SocialMediaTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = SocialMediaTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
 
@@ -29,10 +40,28 @@ class SocialMediaMentionTrigger(Trigger):
     dispatcher: SocialMediaTriggerDispatcher
     keyword: str
     user_handle: Optional[str]
+    case_sensitive: bool = False
+    whole_word: bool = False
 
     def check_conditions(self, event_data: Dict[str, Any]) -> bool:
-        if self.keyword.lower() in event_data.get("content", "").lower():
-            if self.user_handle and event_data.get("user") != self.user_handle:
-                return False
-            return True
+        if keyword_in(
+            event_data.get("content", ""),
+            self.keyword,
+            self.case_sensitive,
+            self.whole_word,
+        ):
+            return self.check_residual_conditions(event_data)
         return False
+
+    def keyword_conditions(self) -> Optional[List[KeywordCondition]]:
+        return [
+            KeywordCondition(
+                field="content",
+                keyword=self.keyword,
+                case_sensitive=self.case_sensitive,
+                whole_word=self.whole_word,
+            )
+        ]
+
+    def check_residual_conditions(self, event_data: Dict[str, Any]) -> bool:
+        return not self.user_handle or event_data.get("user") == self.user_handle
@@ -1,10 +1,15 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 from command_centre_python.utils.triggers import (
     TriggerDispatcherBase,
     Trigger,
     TriggerEvent,
 )
+from command_centre_python.utils.keyword_matcher import (
+    KeywordCondition,
+    KeywordIndex,
+    keyword_in,
+)
 import threading
 import speech_recognition as sr  # For voice recognition
 import logging
@@ -18,6 +23,7 @@ class VoiceCommandTriggerFired(TriggerEvent):
 
 class VoiceCommandTriggerDispatcher(TriggerDispatcherBase):
     keywords: List[str]
+    trigger_index_factory = KeywordIndex
     _stop_event: threading.Event = threading.Event()
 
     def start(self):
@@ -47,14 +53,35 @@ class VoiceCommandTriggerDispatcher(TriggerDispatcherBase):
         logger.info("VoiceCommandTriggerDispatcher stopped")
 
     def handle_event(self, event_data: dict):
-        trigger_event = VoiceCommandTriggerFired(event_data=event_data)
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is None:
+            return
+        trigger_event = VoiceCommandTriggerFired(
+            event_data=event_data, trigger_ids=trigger_ids
+        )
         self.dispatch(trigger_event)
 
 
 class VoiceCommandTrigger(Trigger):
     dispatcher: VoiceCommandTriggerDispatcher
     command: str
+    case_sensitive: bool = False
+    whole_word: bool = False
 
     def check_conditions(self, event_data: Dict[str, Any]) -> bool:
-        recognized_command = event_data.get("command", "").lower()
-        return self.command.lower() in recognized_command
+        return keyword_in(
+            event_data.get("command", ""),
+            self.command,
+            self.case_sensitive,
+            self.whole_word,
+        )
+
+    def keyword_conditions(self) -> Optional[List[KeywordCondition]]:
+        return [
+            KeywordCondition(
+                field="command",
+                keyword=self.command,
+                case_sensitive=self.case_sensitive,
+                whole_word=self.whole_word,
+            )
+        ]
@@ -0,0 +1,380 @@
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .llm_cache import LLMResultCache, content_key
+
+logger = logging.getLogger(__name__)
+
+# Bump when the grammar or predicate semantics change; cached compilations
+# from other versions are ignored.
+COMPILER_VERSION = 2
+
+Operator = Literal["eq", "gt", "ge", "lt", "le", "contains", "regex"]
+
+_NUMERIC_OPERATORS = {
+    "above": "gt",
+    "over": "gt",
+    "greater than": "gt",
+    "more than": "gt",
+    "higher than": "gt",
+    "exceeds": "gt",
+    ">": "gt",
+    "at least": "ge",
+    ">=": "ge",
+    "below": "lt",
+    "under": "lt",
+    "less than": "lt",
+    "lower than": "lt",
+    "<": "lt",
+    "at most": "le",
+    "<=": "le",
+    "equal to": "eq",
+    "equals": "eq",
+    "=": "eq",
+}
+_OPERATOR_PATTERN = "|".join(
+    re.escape(operator)
+    for operator in sorted(_NUMERIC_OPERATORS, key=len, reverse=True)
+)
+_LEADING = re.compile(
+    r"^(?:(?:alert|notify|tell|ping) me\s+)?(?:when(?:ever)?|if|once|as soon as)\s+",
+    re.IGNORECASE,
+)
+_NUMERIC = re.compile(
+    r"^(?P<field>[a-z][\w .-]*?)\s+(?:is\s+|goes\s+|rises\s+|falls\s+|drops\s+)?"
+    rf"(?P<op>{_OPERATOR_PATTERN})\s*(?P<number>-?\d+(?:\.\d+)?)\s*"
+    r"(?:%|percent|[a-z]+)?$",
+    re.IGNORECASE,
+)
+_CONTAINS = re.compile(
+    r"^(?:(?P<field>[a-z][\w .-]*?)\s+)?(?:contains|mentions|includes)\s+"
+    r"(?P<quote>['\"])(?P<text>.+?)(?P=quote)$",
+    re.IGNORECASE,
+)
+_EQUALS = re.compile(
+    r"^(?P<field>[a-z][\w .-]*?)\s+(?:is|equals|=)\s+"
+    r"(?P<quote>['\"])(?P<text>.+?)(?P=quote)$",
+    re.IGNORECASE,
+)
+_REGEX = re.compile(
+    r"^(?P<field>[a-z][\w .-]*?)\s+matches\s+/(?P<pattern>.+)/$", re.IGNORECASE
+)
+_FROM = re.compile(
+    r"^(?:an?\s+|the\s+)?(?:new\s+)?(?:(?:email|e-mail|mail|message|text)\s+)?"
+    r"(?:is\s+)?(?:from|sent by)\s+(?P<sender>.+?)"
+    r"(?:\s+(?:arrives|comes in|is received|shows up))?$",
+    re.IGNORECASE,
+)
+_ADDRESS = re.compile(r"^['\"]?(?P<address>[\w.+-]*@[\w.-]+)['\"]?$")
+_QUOTED = re.compile(r"^(?P<quote>['\"])(?P<text>.+)(?P=quote)$")
+# Other keys an entry may keep the sender under.
+_SENDER_ALIASES = ["from", "from_address", "sender_email"]
+# Words naming the entry itself rather than one of its fields.
+_WHOLE_ENTRY = {"email", "e-mail", "mail", "message", "text", "entry", "data", "event"}
+_ARTICLES = {"the", "a", "an", "my", "our", "its", "their"}
+_KEY_TOKEN = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+
+def _key_tokens(key: str) -> List[str]:
+    return [token.lower() for token in _KEY_TOKEN.findall(key)]
+
+
+def _flatten(data: Any, prefix: str = "") -> Dict[str, Any]:
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            path = f"{prefix}.{key}" if prefix else str(key)
+            flat[path] = value
+            flat.update(_flatten(value, path))
+    return flat
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip().rstrip("%").strip())
+        except ValueError:
+            return None
+    return None
+
+
+class FieldTest(BaseModel):
+    """``op`` applied to the field named by ``field``; None means any field.
+
+    ``aliases`` name the same field under other keys, such as ``from`` for
+    ``sender``.
+    """
+
+    field: Optional[str] = None
+    aliases: List[str] = []
+    op: Operator
+    value: Any
+
+    def resolve(self, data: Dict[str, Any]) -> List[Any]:
+        """Values of the fields the test may mean.
+
+        Exact dotted paths of ``field`` or an alias win; otherwise every
+        field whose name contains all the words of one of them (``cpu``
+        finds ``cpu_percent``, ``battery level`` does not find
+        ``signal_level``).
+        """
+        flat = _flatten(data)
+        names = [self.field] + self.aliases
+        exact = [flat[name] for name in names if name in flat]
+        if exact:
+            return exact
+        wanted = [set(_key_tokens(name)) for name in names]
+        return [
+            value
+            for path, value in flat.items()
+            if any(
+                words and words <= set(_key_tokens(path.rsplit(".", 1)[-1]))
+                for words in wanted
+            )
+        ]
+
+    def evaluate(self, data: Dict[str, Any]) -> Optional[bool]:
+        """The test's outcome, or None if the entry cannot decide it.
+
+        When several fields qualify they must all agree.
+        """
+        if self.field is None:
+            values = [value for value in _flatten(data).values() if value is not None]
+            if self.op != "contains":
+                return None
+            needle = str(self.value).casefold()
+            return any(
+                needle in str(value).casefold()
+                for value in values
+                if not isinstance(value, (dict, list))
+            )
+        outcomes = {self._test(value) for value in self.resolve(data)}
+        return outcomes.pop() if len(outcomes) == 1 else None
+
+    def _test(self, value: Any) -> Optional[bool]:
+        if value is None:
+            return None
+        if self.op in ("gt", "ge", "lt", "le") or (
+            self.op == "eq" and _number(self.value) is not None
+        ):
+            number, limit = _number(value), _number(self.value)
+            if number is None or limit is None:
+                return None
+            return {
+                "gt": number > limit,
+                "ge": number >= limit,
+                "lt": number < limit,
+                "le": number <= limit,
+                "eq": number == limit,
+            }[self.op]
+        text = str(value)
+        if self.op == "eq":
+            return text.casefold() == str(self.value).casefold()
+        if self.op == "contains":
+            return str(self.value).casefold() in text.casefold()
+        return re.search(self.value, text) is not None
+
+
+class CompiledCondition(BaseModel):
+    """A natural-language condition compiled into field tests."""
+
+    condition: str
+    version: int = COMPILER_VERSION
+    tests: List[FieldTest]
+    match: Literal["all", "any"] = "all"
+    confidence: float
+
+    def evaluate(self, data: Dict[str, Any]) -> Optional[bool]:
+        """Whether ``data`` meets the condition, or None if undecidable."""
+        outcomes = [test.evaluate(data) for test in self.tests]
+        if self.match == "all":
+            if False in outcomes:
+                return False
+            return None if None in outcomes else True
+        if True in outcomes:
+            return True
+        return None if None in outcomes else False
+
+
+def _field_name(words: str) -> Optional[str]:
+    tokens = [token for token in words.lower().split() if token not in _ARTICLES]
+    if not tokens or all(token in _WHOLE_ENTRY for token in tokens):
+        return None
+    return "_".join(tokens)
+
+
+def _split_outside_quotes(text: str, word: str) -> List[str]:
+    parts, quote, start = [], None, 0
+    separator = f" {word} "
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif text[index : index + len(separator)].lower() == separator:
+            parts.append(text[start:index])
+            index += len(separator)
+            start = index
+            continue
+        index += 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts]
+
+
+def _compile_clause(clause: str) -> Optional[Tuple[FieldTest, float]]:
+    match = _REGEX.match(clause)
+    if match:
+        try:
+            re.compile(match["pattern"])
+        except re.error:
+            return None
+        field = _field_name(match["field"])
+        return FieldTest(field=field, op="regex", value=match["pattern"]), 0.95
+    match = _CONTAINS.match(clause)
+    if match:
+        field = _field_name(match["field"] or "")
+        return (
+            FieldTest(field=field, op="contains", value=match["text"]),
+            0.95 if field else 0.85,
+        )
+    match = _EQUALS.match(clause)
+    if match:
+        field = _field_name(match["field"])
+        if field:
+            return FieldTest(field=field, op="eq", value=match["text"]), 0.9
+    match = _NUMERIC.match(clause)
+    if match:
+        field = _field_name(match["field"])
+        if field:
+            operator = _NUMERIC_OPERATORS[match["op"].lower()]
+            return (
+                FieldTest(field=field, op=operator, value=float(match["number"])),
+                0.9,
+            )
+    match = _FROM.match(clause)
+    if match:
+        sender = match["sender"].strip()
+        address = _ADDRESS.match(sender)
+        quoted = _QUOTED.match(sender)
+        if address:
+            return (
+                FieldTest(
+                    field="sender",
+                    aliases=_SENDER_ALIASES,
+                    op="contains",
+                    value=address["address"],
+                ),
+                0.9,
+            )
+        if quoted:
+            return (
+                FieldTest(
+                    field="sender",
+                    aliases=_SENDER_ALIASES,
+                    op="contains",
+                    value=quoted["text"],
+                ),
+                0.85,
+            )
+        # "my boss" names a person, not something found in the sender field.
+        return (
+            FieldTest(
+                field="sender", aliases=_SENDER_ALIASES, op="contains", value=sender
+            ),
+            0.3,
+        )
+    return None
+
+
+def compile_condition(condition: str) -> Optional[CompiledCondition]:
+    """Compile ``condition`` with the rule grammar, or None if it does not fit.
+
+    Clauses joined by "and" (or by "or", but not both) each become one
+    ``FieldTest``: numeric comparisons ("CPU is above 90%"), quoted
+    equality and containment ("subject contains 'invoice'"), regexes
+    ("subject matches /^RE:/") and senders ("an email from a@b.com").
+    """
+    text = _LEADING.sub("", condition.strip().rstrip(".!?")).strip()
+    if not text:
+        return None
+    conjunctions = _split_outside_quotes(text, "and")
+    disjunctions = _split_outside_quotes(text, "or")
+    if len(conjunctions) > 1 and len(disjunctions) > 1:
+        return None
+    clauses, combine = (
+        (disjunctions, "any") if len(disjunctions) > 1 else (conjunctions, "all")
+    )
+    tests, confidence = [], 1.0
+    for clause in clauses:
+        compiled = _compile_clause(clause)
+        if compiled is None:
+            return None
+        tests.append(compiled[0])
+        confidence = min(confidence, compiled[1])
+    return CompiledCondition(
+        condition=condition, tests=tests, match=combine, confidence=confidence
+    )
+
+
+class ConditionCompiler:
+    """Compiles each condition once and caches the result by version.
+
+    Compilations are kept in an ``LLMResultCache`` (give it a store to keep
+    them across restarts) keyed by ``COMPILER_VERSION`` and the condition
+    text. ``predicate`` only returns compilations with at least
+    ``min_confidence``; the rest are left to the LLM.
+    """
+
+    def __init__(
+        self, min_confidence: float = 0.8, cache: Optional[LLMResultCache] = None
+    ):
+        self.min_confidence = min_confidence
+        self.cache = cache or LLMResultCache(ttl=30 * 24 * 3600.0)
+        self._lock = threading.Lock()
+        self.decided = 0
+        self.undecided = 0
+
+    def compile(self, condition: str) -> Optional[CompiledCondition]:
+        key = content_key("condition_compiler", COMPILER_VERSION, condition)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return CompiledCondition(**cached) if cached else None
+        compiled = compile_condition(condition)
+        self.cache.set(key, compiled.model_dump() if compiled else {})
+        if compiled:
+            logger.info(
+                f"Compiled condition '{condition}' into {len(compiled.tests)} "
+                f"field tests (confidence {compiled.confidence})"
+            )
+        return compiled
+
+    def predicate(self, condition: str) -> Optional[CompiledCondition]:
+        compiled = self.compile(condition)
+        if compiled is None or compiled.confidence < self.min_confidence:
+            return None
+        return compiled
+
+    def evaluate(self, condition: str, data: Dict[str, Any]) -> Optional[bool]:
+        """The compiled verdict, or None if the LLM has to decide."""
+        compiled = self.predicate(condition)
+        verdict = compiled.evaluate(data) if compiled else None
+        with self._lock:
+            if verdict is None:
+                self.undecided += 1
+            else:
+                self.decided += 1
+        return verdict
+
+    def stats(self) -> Dict[str, Any]:
+        return {"decided": self.decided, "undecided": self.undecided}
@@ -0,0 +1,135 @@
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .triggers import Trigger, TriggerIndex
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class _IndexedTrigger:
+    def __init__(
+        self,
+        sequence: int,
+        trigger: Trigger,
+        anchor: Optional[Tuple[str, Any]],
+        checks: List[Tuple[str, Any]],
+        verify: bool,
+    ):
+        self.sequence = sequence
+        self.trigger = trigger
+        # The (field, value) key the trigger is filed under.
+        self.anchor = anchor
+        # Remaining equalities, compared directly once the anchor is hit.
+        self.checks = checks
+        # Conditions the index could not take over; run check_conditions.
+        self.verify = verify
+
+    def accepts(self, event_data: Dict[str, Any]) -> bool:
+        for field, value in self.checks:
+            if event_data.get(field) != value:
+                return False
+        if self.verify:
+            return self.trigger.check_conditions(event_data)
+        return self.trigger.check_residual_conditions(event_data)
+
+
+class ConditionIndex(TriggerIndex):
+    """Hash index over triggers' ``field == value`` conditions.
+
+    Each trigger is filed under one of its ``(field, value)`` conditions, the
+    one whose posting list is shortest when the trigger is added, so keys
+    stay selective. An event looks up one key per indexed field it carries
+    and only the triggers filed under a hit key have their other equalities
+    compared; the cost follows the number of candidates rather than the
+    number of registered triggers. Conditions on ``None`` or unhashable
+    values, and triggers without ``equality_conditions``, fall back to
+    ``check_conditions``. Registration and removal update the index in place
+    under a lock, since dispatchers match from their own threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[int, _IndexedTrigger] = {}
+        self._postings: Dict[Tuple[str, Any], Dict[int, _IndexedTrigger]] = {}
+        self._field_counts: Dict[str, int] = defaultdict(int)
+        # Triggers without an anchor are candidates for every event.
+        self._unconditional: Dict[int, _IndexedTrigger] = {}
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, trigger: Trigger):
+        conditions = trigger.equality_conditions()
+        with self._lock:
+            if id(trigger) not in self._entries:
+                self._add_locked(trigger, conditions)
+
+    def _add_locked(self, trigger: Trigger, conditions: Optional[Dict[str, Any]]):
+        keys = []
+        verify = conditions is None
+        for field, value in (conditions or {}).items():
+            if value is None or not _hashable(value):
+                verify = True
+            else:
+                keys.append((field, value))
+        anchor = None
+        if keys:
+            anchor = min(keys, key=lambda key: len(self._postings.get(key, ())))
+            keys.remove(anchor)
+        trigger_id = id(trigger)
+        self._sequence += 1
+        entry = _IndexedTrigger(self._sequence, trigger, anchor, keys, verify)
+        self._entries[trigger_id] = entry
+        if anchor is None:
+            self._unconditional[trigger_id] = entry
+        else:
+            self._postings.setdefault(anchor, {})[trigger_id] = entry
+            self._field_counts[anchor[0]] += 1
+
+    def remove(self, trigger: Trigger):
+        with self._lock:
+            self._remove_locked(id(trigger))
+
+    def _remove_locked(self, trigger_id: int):
+        entry = self._entries.pop(trigger_id, None)
+        if entry is None:
+            return
+        if entry.anchor is None:
+            del self._unconditional[trigger_id]
+            return
+        postings = self._postings[entry.anchor]
+        del postings[trigger_id]
+        if not postings:
+            del self._postings[entry.anchor]
+        field = entry.anchor[0]
+        self._field_counts[field] -= 1
+        if not self._field_counts[field]:
+            del self._field_counts[field]
+
+    def candidates(self, event_data: Dict[str, Any]) -> List[_IndexedTrigger]:
+        with self._lock:
+            entries = list(self._unconditional.values())
+            for field in self._field_counts:
+                value = event_data.get(field)
+                if value is None or not _hashable(value):
+                    continue
+                postings = self._postings.get((field, value))
+                if postings:
+                    entries.extend(postings.values())
+        entries.sort(key=lambda entry: entry.sequence)
+        return entries
+
+    def match(self, event_data: Dict[str, Any]) -> List[Trigger]:
+        return [
+            entry.trigger
+            for entry in self.candidates(event_data)
+            if entry.accepts(event_data)
+        ]
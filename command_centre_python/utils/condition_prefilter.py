@@ -0,0 +1,198 @@
+import random
+import re
+import threading
+import zlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Set
+
+import numpy as np
+from pydantic import BaseModel
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and any are as at be been being but by did do does for from has have "
+    "if in into is it its me my of on or our so some than that the their them "
+    "then there these this those to us was we were what when whenever where "
+    "which while who will with you your i".split()
+)
+# A condition about something being absent cannot be ruled out by the entry
+# lacking its words, so it skips the cheap stages.
+NEGATIONS = frozenset("no not without never none absent missing nobody nothing".split())
+
+EMBEDDING_DIMENSIONS = 512
+
+
+def _stem(token: str) -> str:
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def tokens(text: str) -> Set[str]:
+    return {_stem(token) for token in _TOKEN.findall(text.lower())}
+
+
+def condition_terms(condition: str) -> Set[str]:
+    """Content words of a condition, stemmed."""
+    return {token for token in tokens(condition) if token not in STOPWORDS}
+
+
+def keyword_overlap(terms: Set[str], entry_tokens: Set[str]) -> int:
+    """Condition terms found in the entry; a term of three or more letters
+    also matches its abbreviations and extensions (``temp``, ``temperature``)."""
+    overlap = 0
+    for term in terms:
+        if term in entry_tokens:
+            overlap += 1
+        elif len(term) >= 3 and any(
+            len(token) >= 3 and (term.startswith(token) or token.startswith(term))
+            for token in entry_tokens
+        ):
+            overlap += 1
+    return overlap
+
+
+def entry_text(data: Any) -> str:
+    """Field names and values of an entry, flattened to text."""
+    if isinstance(data, dict):
+        return " ".join(f"{key} {entry_text(value)}" for key, value in data.items())
+    if isinstance(data, (list, tuple, set)):
+        return " ".join(entry_text(value) for value in data)
+    return "" if data is None else str(data)
+
+
+@lru_cache(maxsize=4096)
+def hashed_embedding(text: str) -> np.ndarray:
+    """Local embedding: hashed word and character-trigram counts, L2-normalized."""
+    vector = np.zeros(EMBEDDING_DIMENSIONS, dtype=np.float32)
+    for word in _TOKEN.findall(text.lower()):
+        vector[zlib.crc32(word.encode()) % EMBEDDING_DIMENSIONS] += 1.0
+        padded = f" {word} "
+        for start in range(len(padded) - 2):
+            trigram = padded[start : start + 3]
+            vector[zlib.crc32(trigram.encode()) % EMBEDDING_DIMENSIONS] += 0.5
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class PrefilterResult(BaseModel):
+    passed: bool
+    stage: str  # "keyword", "similarity", "bypass" or "rejected"
+    keyword_overlap: int = 0
+    similarity: Optional[float] = None
+    # Rejected, but sent to the LLM anyway to estimate recall.
+    audit: bool = False
+
+
+class ConditionPrefilter:
+    """Cheap stages that rule out entries unrelated to a condition.
+
+    1. Keyword: the entry's field names and values share at least
+       ``min_keyword_overlap`` content words with the condition.
+    2. Similarity: otherwise, the cosine similarity of the two embeddings
+       (``embed``, by default a local hashed n-gram embedding) reaches
+       ``similarity_threshold``.
+
+    Entries passing neither stage are rejected without an LLM call. Negated
+    conditions and conditions without content words always pass. A random
+    ``audit_rate`` share of rejections is still evaluated by the LLM so that
+    ``stats()`` can estimate recall alongside precision.
+    """
+
+    def __init__(
+        self,
+        min_keyword_overlap: int = 1,
+        similarity_threshold: float = 0.1,
+        audit_rate: float = 0.02,
+        embed: Optional[Callable[[str], np.ndarray]] = None,
+    ):
+        self.min_keyword_overlap = min_keyword_overlap
+        self.similarity_threshold = similarity_threshold
+        self.audit_rate = audit_rate
+        self.embed = embed or hashed_embedding
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "keyword": 0,
+            "similarity": 0,
+            "bypass": 0,
+            "rejected": 0,
+            "audited": 0,
+            "audit_met": 0,
+            "passed_met": 0,
+            "passed_not_met": 0,
+        }
+
+    def check(self, condition: str, data: Dict[str, Any]) -> PrefilterResult:
+        terms = condition_terms(condition)
+        if not terms or terms & NEGATIONS:
+            result = PrefilterResult(passed=True, stage="bypass")
+        else:
+            text = entry_text(data)
+            overlap = keyword_overlap(terms, tokens(text))
+            if overlap >= self.min_keyword_overlap:
+                result = PrefilterResult(
+                    passed=True, stage="keyword", keyword_overlap=overlap
+                )
+            else:
+                similarity = float(
+                    np.dot(self.embed(condition.lower()), self.embed(text.lower()))
+                )
+                passed = similarity >= self.similarity_threshold
+                result = PrefilterResult(
+                    passed=passed,
+                    stage="similarity" if passed else "rejected",
+                    keyword_overlap=overlap,
+                    similarity=similarity,
+                )
+                if not result.passed and random.random() < self.audit_rate:
+                    result.audit = True
+        with self._lock:
+            self._counters[result.stage] += 1
+            if result.audit:
+                self._counters["audited"] += 1
+        return result
+
+    def record(self, result: PrefilterResult, met: Optional[bool]):
+        """Record the LLM's verdict on an entry that passed or was audited."""
+        if met is None:
+            return
+        with self._lock:
+            if result.audit:
+                self._counters["audit_met"] += int(met)
+            elif result.passed:
+                self._counters["passed_met" if met else "passed_not_met"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        passed_verdicts = counters["passed_met"] + counters["passed_not_met"]
+        # Scale the audited misses up to all rejections.
+        missed = (
+            counters["audit_met"] * counters["rejected"] / counters["audited"]
+            if counters["audited"]
+            else 0.0
+        )
+        return {
+            **counters,
+            "precision": (
+                counters["passed_met"] / passed_verdicts if passed_verdicts else None
+            ),
+            "recall": (
+                counters["passed_met"] / (counters["passed_met"] + missed)
+                if counters["passed_met"] + missed
+                else None
+            ),
+            "rejection_rate": (
+                counters["rejected"]
+                / (
+                    counters["rejected"]
+                    + counters["keyword"]
+                    + counters["similarity"]
+                    + counters["bypass"]
+                )
+                if counters["rejected"]
+                else 0.0
+            ),
+        }
@@ -0,0 +1,262 @@
+import math
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Annotated, Any, Dict, List, Literal, Optional, Set, Tuple, Union
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from .triggers import Trigger, TriggerIndex
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+# Finest grid level: 360 / 2**24 degrees, a little over 2 m.
+MAX_GRID_LEVEL = 24
+
+BoundingBox = Tuple[float, float, float, float]  # min lat, min lon, max lat, max lon
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class CircleArea(BaseModel):
+    kind: Literal["circle"] = "circle"
+    latitude: float
+    longitude: float
+    radius_m: float = Field(gt=0)
+
+    def bounds(self) -> BoundingBox:
+        d_lat = self.radius_m / METERS_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(self.latitude)), 1e-6)
+        d_lon = min(d_lat / cos_lat, 180.0)
+        return (
+            max(self.latitude - d_lat, -90.0),
+            self.longitude - d_lon,
+            min(self.latitude + d_lat, 90.0),
+            self.longitude + d_lon,
+        )
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        return (
+            haversine_m(self.latitude, self.longitude, latitude, longitude)
+            <= self.radius_m
+        )
+
+
+class PolygonArea(BaseModel):
+    """A polygon of ``(latitude, longitude)`` vertices, treated as planar."""
+
+    kind: Literal["polygon"] = "polygon"
+    points: List[Tuple[float, float]] = Field(min_length=3)
+
+    def bounds(self) -> BoundingBox:
+        lats = [lat for lat, _ in self.points]
+        lons = [lon for _, lon in self.points]
+        return min(lats), min(lons), max(lats), max(lons)
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        inside = False
+        points = self.points
+        previous_lat, previous_lon = points[-1]
+        for lat, lon in points:
+            if (lat > latitude) != (previous_lat > latitude):
+                crossing = (latitude - lat) * (previous_lon - lon) / (
+                    previous_lat - lat
+                ) + lon
+                if longitude < crossing:
+                    inside = not inside
+            previous_lat, previous_lon = lat, lon
+        return inside
+
+
+GeoArea = Annotated[Union[CircleArea, PolygonArea], Field(discriminator="kind")]
+_geo_area_adapter = TypeAdapter(GeoArea)
+
+
+def parse_geo_area(area: Union[Dict[str, Any], CircleArea, PolygonArea]) -> GeoArea:
+    if isinstance(area, (CircleArea, PolygonArea)):
+        return area
+    return _geo_area_adapter.validate_python(area)
+
+
+def _grid_level(bounds: BoundingBox) -> int:
+    """Finest level whose cells are at least as large as the box."""
+    span = max(bounds[2] - bounds[0], bounds[3] - bounds[1], 1e-12)
+    level = int(math.floor(math.log2(360.0 / span)))
+    return max(0, min(level, MAX_GRID_LEVEL))
+
+
+def _cell(level: int, latitude: float, longitude: float) -> Tuple[int, int, int]:
+    columns = 1 << level
+    size = 360.0 / columns
+    return level, math.floor(latitude / size), math.floor(longitude / size) % columns
+
+
+class _FenceEntry:
+    def __init__(self, sequence: int, trigger: Trigger, area: GeoArea):
+        self.sequence = sequence
+        self.trigger = trigger
+        self.area = area
+        self.enter_exit = getattr(trigger, "enter_exit", "enter")
+        self.cells: List[Tuple[int, int, int]] = []
+
+
+class _DeviceState:
+    def __init__(self, inside: Set[int], seen_up_to: int):
+        self.inside = inside
+        # Fences registered after this sequence have no baseline for the device.
+        self.seen_up_to = seen_up_to
+
+
+class GeoFenceIndex(TriggerIndex):
+    """Multi-level grid index over circle and polygon geofences.
+
+    Each fence is stored in the grid level whose cells are just larger than
+    its bounding box, so it covers at most a 2x2 block of cells. A position
+    is looked up with one cell per populated level and only fences in those
+    cells get the exact containment test.
+
+    ``match`` is stateful: it tracks which fences each device is inside and
+    returns the triggers whose ``enter_exit`` transition the position caused.
+    A device's first position, and the first position after a fence was
+    added, only record a baseline. State is kept for the ``max_devices``
+    most recently seen devices; a device evicted from it, or dropped with
+    ``forget``, starts again from a baseline.
+    """
+
+    def __init__(
+        self,
+        device_field: str = "device_id",
+        latitude_field: str = "latitude",
+        longitude_field: str = "longitude",
+        max_devices: int = 100_000,
+    ):
+        self.device_field = device_field
+        self.latitude_field = latitude_field
+        self.longitude_field = longitude_field
+        self.max_devices = max_devices
+        self._lock = threading.Lock()
+        self._entries: Dict[int, _FenceEntry] = {}
+        self._by_sequence: Dict[int, _FenceEntry] = {}
+        self._cells: Dict[Tuple[int, int, int], Dict[int, _FenceEntry]] = {}
+        self._level_counts: Dict[int, int] = defaultdict(int)
+        self._devices: OrderedDict[Any, _DeviceState] = OrderedDict()
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, trigger: Trigger):
+        area = trigger.geofence()
+        with self._lock:
+            if id(trigger) in self._entries:
+                return
+            self._sequence += 1
+            entry = _FenceEntry(self._sequence, trigger, area)
+            bounds = area.bounds()
+            level = _grid_level(bounds)
+            columns = 1 << level
+            size = 360.0 / columns
+            min_row, max_row = math.floor(bounds[0] / size), math.floor(
+                bounds[2] / size
+            )
+            min_col, max_col = math.floor(bounds[1] / size), math.floor(
+                bounds[3] / size
+            )
+            # A box crossing the antimeridian wraps onto the columns past it.
+            cells = {
+                (level, row, col % columns)
+                for row in range(min_row, max_row + 1)
+                for col in range(min_col, max_col + 1)
+            }
+            for cell in sorted(cells):
+                entry.cells.append(cell)
+                self._cells.setdefault(cell, {})[entry.sequence] = entry
+            self._level_counts[level] += 1
+            self._entries[id(trigger)] = entry
+            self._by_sequence[entry.sequence] = entry
+
+    def remove(self, trigger: Trigger):
+        with self._lock:
+            entry = self._entries.pop(id(trigger), None)
+            if entry is None:
+                return
+            del self._by_sequence[entry.sequence]
+            for cell in entry.cells:
+                fences = self._cells[cell]
+                del fences[entry.sequence]
+                if not fences:
+                    del self._cells[cell]
+            level = entry.cells[0][0]
+            self._level_counts[level] -= 1
+            if not self._level_counts[level]:
+                del self._level_counts[level]
+
+    def fences_containing(self, latitude: float, longitude: float) -> List[Trigger]:
+        with self._lock:
+            return [
+                entry.trigger
+                for entry in self._containing(latitude, longitude).values()
+            ]
+
+    def _containing(self, latitude: float, longitude: float) -> Dict[int, _FenceEntry]:
+        inside = {}
+        for level in self._level_counts:
+            for sequence, entry in self._cells.get(
+                _cell(level, latitude, longitude), {}
+            ).items():
+                if entry.area.contains(latitude, longitude):
+                    inside[sequence] = entry
+        return inside
+
+    def _position(self, event_data: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        try:
+            latitude = float(event_data[self.latitude_field])
+            longitude = float(event_data[self.longitude_field])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if math.isnan(latitude) or math.isnan(longitude):
+            return None
+        return latitude, longitude
+
+    def match(self, event_data: Dict[str, Any]) -> List[Trigger]:
+        position = self._position(event_data)
+        if position is None:
+            return []
+        device = event_data.get(self.device_field)
+        with self._lock:
+            inside = self._containing(*position)
+            # Re-inserting keeps the devices ordered by when they were last seen.
+            state = self._devices.pop(device, None)
+            self._devices[device] = _DeviceState(set(inside), self._sequence)
+            if len(self._devices) > self.max_devices:
+                self._devices.popitem(last=False)
+            if state is None:
+                return []
+            transitions = []
+            for sequence in inside.keys() - state.inside:
+                if sequence <= state.seen_up_to:
+                    transitions.append((self._by_sequence[sequence], "enter"))
+            for sequence in state.inside - inside.keys():
+                entry = self._by_sequence.get(sequence)
+                if entry is not None:
+                    transitions.append((entry, "exit"))
+        transitions.sort(key=lambda item: item[0].sequence)
+        return [
+            entry.trigger
+            for entry, transition in transitions
+            if entry.enter_exit == transition
+            and entry.trigger.check_residual_conditions(event_data)
+        ]
+
+    def forget(self, device: Any):
+        """Drop a device's inside/outside state."""
+        with self._lock:
+            self._devices.pop(device, None)
@@ -0,0 +1,242 @@
+import threading
+from collections import defaultdict, deque
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, ConfigDict
+
+from .triggers import Trigger, TriggerIndex
+
+
+class KeywordCondition(BaseModel):
+    """``keyword`` occurs in the text of ``event_data[field]``."""
+
+    model_config = ConfigDict(frozen=True)
+
+    field: str
+    keyword: str
+    case_sensitive: bool = False
+    whole_word: bool = False
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _at_word_boundary(text: str, start: int, end: int) -> bool:
+    if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+        return False
+    if end < len(text) and _is_word_char(text[end - 1]) and _is_word_char(text[end]):
+        return False
+    return True
+
+
+def keyword_in(
+    text: str, keyword: str, case_sensitive: bool = False, whole_word: bool = False
+) -> bool:
+    """Single-keyword test with the same semantics as ``KeywordMatcher``."""
+    if not case_sensitive:
+        text, keyword = text.casefold(), keyword.casefold()
+    if not whole_word:
+        return keyword in text
+    start = text.find(keyword)
+    while start != -1:
+        if _at_word_boundary(text, start, start + len(keyword)):
+            return True
+        start = text.find(keyword, start + 1)
+    return False
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton: finds every keyword in one pass over a text."""
+
+    def __init__(self, keywords: Iterable[Tuple[Hashable, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[Hashable, int]]] = [[]]
+        for key, keyword in keywords:
+            self._insert(key, keyword)
+        self._link()
+
+    def _insert(self, key: Hashable, keyword: str):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._out[state].append((key, len(keyword)))
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._out[self._fail[next_state]]:
+                    self._out[next_state] = (
+                        self._out[next_state] + self._out[self._fail[next_state]]
+                    )
+
+    def scan(self, text: str) -> Iterator[Tuple[Hashable, int, int]]:
+        """Yield ``(key, start, end)`` for every keyword occurrence."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for key, length in out[state]:
+                yield key, index + 1 - length, index + 1
+
+
+class KeywordMatcher:
+    """Finds which of a set of ``KeywordCondition`` occur in a text.
+
+    Case-insensitive keywords share one automaton run over the case-folded
+    text and case-sensitive ones another over the raw text, so each text is
+    scanned at most twice however many keywords are registered.
+    """
+
+    def __init__(self, conditions: Iterable[KeywordCondition]):
+        folded, exact = [], []
+        for condition in conditions:
+            if condition.case_sensitive:
+                exact.append((condition, condition.keyword))
+            else:
+                folded.append((condition, condition.keyword.casefold()))
+        self._folded = KeywordAutomaton(folded) if folded else None
+        self._exact = KeywordAutomaton(exact) if exact else None
+
+    def find(self, text: str) -> Set[KeywordCondition]:
+        found: Set[KeywordCondition] = set()
+        for automaton, scanned in (
+            (self._folded, text.casefold() if self._folded else text),
+            (self._exact, text),
+        ):
+            if automaton is None:
+                continue
+            for condition, start, end in automaton.scan(scanned):
+                if condition in found:
+                    continue
+                if condition.whole_word and not _at_word_boundary(scanned, start, end):
+                    continue
+                found.add(condition)
+        return found
+
+
+class _KeywordEntry:
+    def __init__(
+        self,
+        sequence: int,
+        trigger: Trigger,
+        conditions: Optional[Set[KeywordCondition]],
+    ):
+        self.sequence = sequence
+        self.trigger = trigger
+        self.conditions = conditions
+
+
+class KeywordIndex(TriggerIndex):
+    """Matches keyword triggers with one automaton scan per text field.
+
+    Triggers describe themselves with ``keyword_conditions()``; a trigger is
+    a candidate once all of its keywords were found, and is then confirmed
+    with ``check_residual_conditions``. Triggers that return ``None`` fall
+    back to ``check_conditions``. A field's matcher is rebuilt on the first
+    match after its keywords changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[int, _KeywordEntry] = {}
+        self._postings: Dict[KeywordCondition, Dict[int, _KeywordEntry]] = {}
+        # Triggers without keywords are candidates for every event.
+        self._unconditional: Dict[int, _KeywordEntry] = {}
+        self._matchers: Dict[str, KeywordMatcher] = {}
+        self._dirty_fields: Set[str] = set()
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, trigger: Trigger):
+        conditions = trigger.keyword_conditions()
+        if conditions is not None:
+            conditions = {condition for condition in conditions if condition.keyword}
+        with self._lock:
+            if id(trigger) in self._entries:
+                return
+            self._sequence += 1
+            entry = _KeywordEntry(self._sequence, trigger, conditions)
+            self._entries[id(trigger)] = entry
+            if not conditions:
+                self._unconditional[id(trigger)] = entry
+                return
+            for condition in conditions:
+                postings = self._postings.setdefault(condition, {})
+                if not postings:
+                    self._dirty_fields.add(condition.field)
+                postings[id(trigger)] = entry
+
+    def remove(self, trigger: Trigger):
+        with self._lock:
+            entry = self._entries.pop(id(trigger), None)
+            if entry is None:
+                return
+            if self._unconditional.pop(id(trigger), None) is not None:
+                return
+            for condition in entry.conditions:
+                postings = self._postings[condition]
+                del postings[id(trigger)]
+                if not postings:
+                    del self._postings[condition]
+                    self._dirty_fields.add(condition.field)
+
+    def _rebuild_dirty(self):
+        by_field: Dict[str, List[KeywordCondition]] = defaultdict(list)
+        for condition in self._postings:
+            if condition.field in self._dirty_fields:
+                by_field[condition.field].append(condition)
+        for field in self._dirty_fields:
+            if by_field[field]:
+                self._matchers[field] = KeywordMatcher(by_field[field])
+            else:
+                self._matchers.pop(field, None)
+        self._dirty_fields.clear()
+
+    def _candidates(self, event_data: Dict[str, Any]) -> List[_KeywordEntry]:
+        if self._dirty_fields:
+            self._rebuild_dirty()
+        hits: Dict[int, int] = defaultdict(int)
+        entries: Dict[int, _KeywordEntry] = dict(self._unconditional)
+        for field, matcher in self._matchers.items():
+            text = event_data.get(field)
+            if not isinstance(text, str) or not text:
+                continue
+            for condition in matcher.find(text):
+                for trigger_id, entry in self._postings[condition].items():
+                    hits[trigger_id] += 1
+                    if hits[trigger_id] == len(entry.conditions):
+                        entries[trigger_id] = entry
+        return sorted(entries.values(), key=lambda entry: entry.sequence)
+
+    def match(self, event_data: Dict[str, Any]) -> List[Trigger]:
+        with self._lock:
+            candidates = self._candidates(event_data)
+        matched = []
+        for entry in candidates:
+            if entry.conditions is None:
+                if not entry.trigger.check_conditions(event_data):
+                    continue
+            elif not entry.trigger.check_residual_conditions(event_data):
+                continue
+            matched.append(entry.trigger)
+        return matched
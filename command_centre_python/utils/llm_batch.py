@@ -0,0 +1,144 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BATCH_INSTRUCTIONS = (
+    "Evaluate every numbered item independently. Reply with only a JSON array "
+    "of {count} booleans, one per item in order: true if the condition is met, "
+    "false otherwise."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, about four characters per token."""
+    return len(text) // 4 + 1
+
+
+def parse_boolean_array(response: str, count: int) -> Optional[List[bool]]:
+    """The JSON array of ``count`` booleans in ``response``, or None."""
+    start, end = response.find("["), response.rfind("]")
+    if start == -1 or end < start:
+        return None
+    try:
+        values = json.loads(response[start : end + 1])
+    except ValueError:
+        return None
+    if not isinstance(values, list) or len(values) != count:
+        return None
+    results = []
+    for value in values:
+        if isinstance(value, str):
+            value = {"true": True, "false": False}.get(value.strip().lower())
+        if not isinstance(value, bool):
+            return None
+        results.append(value)
+    return results
+
+
+class BatchConditionEvaluator:
+    """Evaluates many (condition, data) pairs in few LLM round-trips.
+
+    Pairs are packed greedily into batches of at most ``max_batch_size``
+    items whose prompt stays under ``max_prompt_tokens``, and the batches
+    are sent concurrently through ``complete(prompt, count)``. A batch whose reply is not a
+    JSON array of the right length falls back to one ``evaluate_one`` call
+    per item, which may return None for an answer it could not read.
+    """
+
+    def __init__(
+        self,
+        complete: Callable[[str, int], Awaitable[str]],
+        evaluate_one: Callable[[str, Dict[str, Any]], Awaitable[Optional[bool]]],
+        max_prompt_tokens: int = 6000,
+        max_batch_size: int = 50,
+    ):
+        self.complete = complete
+        self.evaluate_one = evaluate_one
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.fallbacks = 0
+
+    async def evaluate_conditions(
+        self, conditions: List[str], data: Dict[str, Any]
+    ) -> List[Optional[bool]]:
+        """Evaluate several conditions against one entry's data."""
+        header = f"Data: {json.dumps(data, default=str)}\n"
+        items = [f"Condition: {condition}" for condition in conditions]
+        pairs = [(condition, data) for condition in conditions]
+        return await self._evaluate(header, items, pairs)
+
+    async def evaluate_entries(
+        self, condition: str, entries_data: List[Dict[str, Any]]
+    ) -> List[Optional[bool]]:
+        """Evaluate one condition against several entries' data."""
+        header = f"Condition: {condition}\n"
+        items = [f"Data: {json.dumps(data, default=str)}" for data in entries_data]
+        pairs = [(condition, data) for data in entries_data]
+        return await self._evaluate(header, items, pairs)
+
+    async def _evaluate(
+        self,
+        header: str,
+        items: List[str],
+        pairs: List[Tuple[str, Dict[str, Any]]],
+    ) -> List[Optional[bool]]:
+        if not items:
+            return []
+        batches = self._pack(header, items)
+        results = await asyncio.gather(
+            *(
+                self._evaluate_batch(header, items[start:end], pairs[start:end])
+                for start, end in batches
+            )
+        )
+        return [value for batch in results for value in batch]
+
+    def _pack(self, header: str, items: List[str]) -> List[Tuple[int, int]]:
+        budget = self.max_prompt_tokens - estimate_tokens(header + BATCH_INSTRUCTIONS)
+        batches = []
+        start, used = 0, 0
+        for index, item in enumerate(items):
+            cost = estimate_tokens(item) + 2
+            if index > start and (
+                used + cost > budget or index - start >= self.max_batch_size
+            ):
+                batches.append((start, index))
+                start, used = index, 0
+            used += cost
+        batches.append((start, len(items)))
+        return batches
+
+    async def _evaluate_batch(
+        self,
+        header: str,
+        items: List[str],
+        pairs: List[Tuple[str, Dict[str, Any]]],
+    ) -> List[Optional[bool]]:
+        if len(items) == 1:
+            return [await self.evaluate_one(*pairs[0])]
+        prompt = (
+            header
+            + "\n".join(f"{number}. {item}" for number, item in enumerate(items, 1))
+            + "\n"
+            + BATCH_INSTRUCTIONS.format(count=len(items))
+        )
+        self.batches += 1
+        try:
+            results = parse_boolean_array(
+                await self.complete(prompt, len(items)), len(items)
+            )
+        except Exception as e:
+            logger.error(f"Batched condition evaluation failed: {e}")
+            results = None
+        if results is not None:
+            return results
+        self.fallbacks += 1
+        logger.warning(
+            f"Could not parse batched answer for {len(items)} items, "
+            "evaluating them one by one"
+        )
+        return list(await asyncio.gather(*(self.evaluate_one(*pair) for pair in pairs)))
@@ -0,0 +1,99 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from .llm_cache import LLMResultCache, content_key
+from .llm_providers import LLMProvider, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCascade:
+    """Asks the cheapest model first and escalates only when needed.
+
+    ``models`` run from smallest to largest. A response escalates to the
+    next model when it is policy-flagged, when ``validate`` rejects it as
+    malformed, or when its confidence is below ``min_confidence``. The last
+    model's response is returned whatever its quality.
+
+    With a ``key`` (for example the condition text) the model that finally
+    answered is remembered in ``decisions`` for ``decision_ttl`` seconds, so
+    later requests for the same key start there instead of paying for the
+    smaller models again.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        models: List[str],
+        min_confidence: float = 0.8,
+        decision_ttl: float = 24 * 3600.0,
+    ):
+        self.provider = provider
+        self.models = models
+        self.min_confidence = min_confidence
+        self.decisions = LLMResultCache(ttl=decision_ttl)
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.escalations: Dict[str, int] = defaultdict(int)
+        self.skipped = 0
+
+    def escalation_reason(
+        self,
+        response: LLMResponse,
+        validate: Optional[Callable[[str], bool]],
+        min_confidence: float,
+    ) -> Optional[str]:
+        if response.flagged:
+            return "flagged"
+        if validate is not None and not validate(response.text):
+            return "malformed"
+        if response.confidence is not None and response.confidence < min_confidence:
+            return "low_confidence"
+        return None
+
+    async def complete(
+        self,
+        system: str,
+        prompt: str,
+        key: Optional[str] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+        min_confidence: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+    ) -> LLMResponse:
+        if min_confidence is None:
+            min_confidence = self.min_confidence
+        decision_key = content_key("model_cascade", self.models, key) if key else None
+        start = 0
+        if decision_key:
+            remembered = self.decisions.get(decision_key)
+            if remembered in self.models:
+                start = self.models.index(remembered)
+                with self._lock:
+                    self.skipped += start
+        for index in range(start, len(self.models)):
+            model = self.models[index]
+            with self._lock:
+                self.calls[model] += 1
+            response = await self.provider.complete(
+                model, system, prompt, max_tokens=max_tokens, json_mode=json_mode
+            )
+            reason = self.escalation_reason(response, validate, min_confidence)
+            if reason is None or index == len(self.models) - 1:
+                break
+            with self._lock:
+                self.escalations[reason] += 1
+            logger.info(f"Escalating from {model}: {reason}")
+        if decision_key and index > 0:
+            self.decisions.set(decision_key, model)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "escalations": dict(self.escalations),
+                "skipped": self.skipped,
+            }
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import random
+import time
+import weakref
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from .llm_batch import estimate_tokens
+from .llm_cache import content_key
+from .llm_providers import LLMProvider, LLMResponse
+from .llm_router import default_router
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTokenBucket:
+    """Token bucket refilled at ``rate`` per second, holding ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Wait for ``amount`` tokens and return how long that took."""
+        amount = min(amount, self.capacity)
+        started = time.monotonic()
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return now - started
+            await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class RateLimit:
+    """A model's provider quota in requests and tokens per minute."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self.requests = (
+            AsyncTokenBucket(requests_per_minute / 60, requests_per_minute)
+            if requests_per_minute
+            else None
+        )
+        self.tokens = (
+            AsyncTokenBucket(tokens_per_minute / 60, tokens_per_minute)
+            if tokens_per_minute
+            else None
+        )
+
+    async def acquire(self, tokens: int):
+        if self.requests:
+            await self.requests.acquire()
+        if self.tokens:
+            await self.tokens.acquire(tokens)
+
+
+class _ModelStats:
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.queue_times: Deque[float] = deque(maxlen=1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        queue_times = sorted(self.queue_times)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not queue_times:
+                return None
+            return queue_times[
+                min(len(queue_times) - 1, int(fraction * len(queue_times)))
+            ]
+
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "queue_time_p50": percentile(0.5),
+            "queue_time_p99": percentile(0.99),
+            "queue_time_max": queue_times[-1] if queue_times else None,
+        }
+
+
+class _LoopState:
+    """The gateway's asyncio objects for one event loop."""
+
+    def __init__(self):
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+
+class LLMGateway(LLMProvider):
+    """Shared front door for every LLM call, itself an ``LLMProvider``.
+
+    - Identical in-flight requests (same model, prompts and options) are
+      coalesced: followers await the leader's call instead of sending their own.
+    - At most ``max_concurrency`` calls per model run at once, or that
+      model's entry in ``model_limits``; the rest queue on a semaphore.
+    - ``rate_limits`` holds a ``RateLimit`` per model, and calls wait for its
+      request and token buckets before they are sent.
+    - A call the provider rejects with HTTP 429 is retried up to
+      ``max_retries`` times with jittered exponential back-off.
+
+    ``stats()`` reports per-model counts and queue-time percentiles, the time
+    between a request arriving and its call being sent.
+
+    Semaphores and in-flight calls are kept per event loop, so a shared
+    gateway works from several loops; concurrency caps and coalescing apply
+    within each loop. The rate-limit buckets only sleep and stay shared.
+    """
+
+    name = "gateway"
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        max_concurrency: int = 8,
+        model_limits: Optional[Dict[str, int]] = None,
+        rate_limits: Optional[Dict[str, RateLimit]] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+    ):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.model_limits = dict(model_limits or {})
+        self.rate_limits = dict(rate_limits or {})
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        # Keyed weakly by event loop, so a closed loop's state goes with it.
+        self._loops: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._stats: Dict[str, _ModelStats] = defaultdict(_ModelStats)
+
+    def _loop_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopState()
+        return state
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        semaphores = self._loop_state().semaphores
+        semaphore = semaphores.get(model)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(
+                self.model_limits.get(model, self.max_concurrency)
+            )
+            semaphores[model] = semaphore
+        return semaphore
+
+    async def complete(
+        self,
+        model: str,
+        system: str,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> LLMResponse:
+        key = content_key(model, system, prompt, max_tokens, json_mode, tools)
+        stats = self._stats[model]
+        stats.requests += 1
+        in_flight = self._loop_state().in_flight
+        call = in_flight.get(key)
+        if call is not None:
+            stats.coalesced += 1
+        else:
+            call = asyncio.ensure_future(
+                self._call(model, system, prompt, max_tokens, json_mode, tools)
+            )
+            in_flight[key] = call
+            call.add_done_callback(lambda _: in_flight.pop(key, None))
+        # A cancelled caller must not cancel the call others are waiting on.
+        return await asyncio.shield(call)
+
+    async def _call(
+        self,
+        model: str,
+        system: str,
+        prompt: str,
+        max_tokens: Optional[int],
+        json_mode: bool,
+        tools: Optional[List[Dict[str, Any]]],
+    ) -> LLMResponse:
+        stats = self._stats[model]
+        rate_limit = self.rate_limits.get(model)
+        semaphore = self._semaphore(model)
+        tokens = estimate_tokens(system + prompt) + (max_tokens or 0)
+        attempt = 0
+        while True:
+            arrived = time.monotonic()
+            stats.waiting += 1
+            try:
+                if rate_limit:
+                    await rate_limit.acquire(tokens)
+                await semaphore.acquire()
+            finally:
+                stats.waiting -= 1
+            stats.queue_times.append(time.monotonic() - arrived)
+            stats.in_flight += 1
+            try:
+                return await self.provider.complete(
+                    model,
+                    system,
+                    prompt,
+                    max_tokens=max_tokens,
+                    json_mode=json_mode,
+                    tools=tools,
+                )
+            except Exception as e:
+                rate_limited = getattr(e, "status_code", None) == 429
+                if rate_limited:
+                    stats.rate_limited += 1
+                if not rate_limited or attempt == self.max_retries:
+                    stats.errors += 1
+                    raise
+            finally:
+                stats.in_flight -= 1
+                semaphore.release()
+            attempt += 1
+            stats.retries += 1
+            delay = self.retry_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            logger.warning(
+                f"{model} rate limited, retrying in {delay:.1f}s "
+                f"(attempt {attempt} of {self.max_retries})"
+            )
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {model: stats.snapshot() for model, stats in self._stats.items()}
+
+
+# Every LLM call in the application goes through this gateway.
+default_gateway = LLMGateway(default_router)
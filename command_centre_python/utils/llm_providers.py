@@ -0,0 +1,254 @@
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponse(BaseModel):
+    text: str
+    model: str
+    provider: str
+    latency: float = 0.0
+    # Probability of the first answer token, when the provider reports it.
+    confidence: Optional[float] = None
+    # The provider stopped or filtered the answer on policy grounds.
+    flagged: bool = False
+    # Function calls requested by the model, as {"name": ..., "arguments": {...}}.
+    tool_calls: List[Dict[str, Any]] = []
+
+
+class LLMProviderError(Exception):
+    """A failed provider call; ``status_code`` mirrors the HTTP status."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMProvider(ABC):
+    """One LLM vendor behind a single ``complete`` call.
+
+    ``tools`` are JSON-schema function descriptions (name, description,
+    parameters) the model may call instead of answering in text.
+    """
+
+    name: str = "provider"
+
+    @abstractmethod
+    async def complete(
+        self,
+        model: str,
+        system: str,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> LLMResponse:
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, client=None):
+        # Created on first use so importing does not require an API key.
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import openai
+
+            self._client = openai.AsyncOpenAI()
+        return self._client
+
+    async def complete(
+        self,
+        model: str,
+        system: str,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> LLMResponse:
+        started = time.monotonic()
+        kwargs = {}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        if tools:
+            kwargs["tools"] = [{"type": "function", "function": tool} for tool in tools]
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        completion = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            logprobs=True,
+            **kwargs,
+        )
+        choice = completion.choices[0]
+        confidence = None
+        if choice.logprobs and choice.logprobs.content:
+            confidence = math.exp(choice.logprobs.content[0].logprob)
+        return LLMResponse(
+            text=choice.message.content or "",
+            model=model,
+            provider=self.name,
+            latency=time.monotonic() - started,
+            confidence=confidence,
+            flagged=choice.finish_reason == "content_filter",
+            tool_calls=[
+                {
+                    "name": call.function.name,
+                    "arguments": json.loads(call.function.arguments or "{}"),
+                }
+                for call in choice.message.tool_calls or []
+            ],
+        )
+
+
+class AnthropicProvider(LLMProvider):
+    name = "anthropic"
+
+    def __init__(self, client=None, default_max_tokens: int = 1024):
+        # Created on first use so importing does not require an API key.
+        self._client = client
+        self.default_max_tokens = default_max_tokens
+
+    @property
+    def client(self):
+        if self._client is None:
+            import anthropic
+
+            self._client = anthropic.AsyncAnthropic()
+        return self._client
+
+    async def complete(
+        self,
+        model: str,
+        system: str,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> LLMResponse:
+        started = time.monotonic()
+        kwargs = {}
+        if system:
+            kwargs["system"] = system
+        if json_mode:
+            # No JSON mode; prefill the answer so it starts as an object.
+            messages = [
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": "{"},
+            ]
+        else:
+            messages = [{"role": "user", "content": prompt}]
+        if tools:
+            kwargs["tools"] = [
+                {
+                    "name": tool["name"],
+                    "description": tool.get("description", ""),
+                    "input_schema": tool.get("parameters", {"type": "object"}),
+                }
+                for tool in tools
+            ]
+        message = await self.client.messages.create(
+            model=model,
+            max_tokens=max_tokens or self.default_max_tokens,
+            messages=messages,
+            **kwargs,
+        )
+        text = "".join(block.text for block in message.content if block.type == "text")
+        return LLMResponse(
+            text="{" + text if json_mode else text,
+            model=model,
+            provider=self.name,
+            latency=time.monotonic() - started,
+            flagged=message.stop_reason == "refusal",
+            tool_calls=[
+                {"name": block.name, "arguments": block.input}
+                for block in message.content
+                if block.type == "tool_use"
+            ],
+        )
+
+
+class FakeLLMProvider(LLMProvider):
+    """Deterministic in-process provider for tests.
+
+    ``respond(model, system, prompt)`` returns the answer text or a full
+    ``LLMResponse``; every call is recorded in ``calls``. ``latency`` is a
+    number of seconds or a callable returning one per call, and a seeded
+    ``error_rate`` share of calls raise ``LLMProviderError``.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        respond: Optional[Callable[[str, str, str], Union[str, LLMResponse]]] = None,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        name: Optional[str] = None,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.respond = respond or (lambda model, system, prompt: "True")
+        self.latency = latency
+        if name:
+            self.name = name
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls: List[Tuple[str, str]] = []
+
+    async def complete(
+        self,
+        model: str,
+        system: str,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> LLMResponse:
+        self.calls.append((model, prompt))
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            await asyncio.sleep(latency)
+        if self.error_rate and self.random.random() < self.error_rate:
+            raise LLMProviderError(f"{self.name} stub failure", status_code=500)
+        result = self.respond(model, system, prompt)
+        if isinstance(result, LLMResponse):
+            return result
+        return LLMResponse(
+            text=result,
+            model=model,
+            provider=self.name,
+            latency=latency,
+            confidence=1.0,
+        )
+
+
+class OpenAIStubProvider(FakeLLMProvider):
+    """Local stand-in for ``OpenAIProvider``."""
+
+    name = "openai"
+
+
+class AnthropicStubProvider(FakeLLMProvider):
+    """Local stand-in for ``AnthropicProvider``."""
+
+    name = "anthropic"
+
+
+openai_provider = OpenAIProvider()
+anthropic_provider = AnthropicProvider()
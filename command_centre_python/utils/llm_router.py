@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from .llm_providers import (
+    LLMProvider,
+    LLMProviderError,
+    LLMResponse,
+    anthropic_provider,
+    openai_provider,
+)
+
+logger = logging.getLogger(__name__)
+
+# A provider and the name of its model serving a requested model.
+Target = Tuple[LLMProvider, str]
+
+
+class _TargetStats:
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+
+    def record(self, latency: Optional[float], ok: bool):
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+
+    def record_censored(self, elapsed: float):
+        """Count a call cancelled after ``elapsed`` seconds.
+
+        Its latency is at least ``elapsed``. That only tells us something
+        when it is above the median, so shorter ones are ignored, and longer
+        ones are kept as samples so a target that slows down stops looking
+        fast even when its calls keep losing hedges.
+        """
+        median = self.percentile(0.5)
+        if median is not None and elapsed > median:
+            self.latencies.append(elapsed)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class LatencyRouter(LLMProvider):
+    """Routes each request to the fastest healthy provider, with hedging.
+
+    ``routes`` maps a requested model to the ``(provider, model)`` targets
+    able to serve it; other models go to ``fallback`` unchanged. Rolling
+    latency and error statistics over the last ``window`` calls are kept per
+    target. Targets whose error rate exceeds ``max_error_rate`` (once they
+    have ``min_samples`` calls) are tried last; the rest are ordered by
+    median latency, unmeasured targets first.
+
+    With ``hedge`` on, a request still running after the first target's
+    ``hedge_percentile`` latency (``initial_hedge_delay`` until it has
+    ``min_samples`` latencies) is also sent to the next target, and the
+    first valid response wins; the other call is cancelled. A failed call
+    moves on to the next target straight away. A cancelled call's running
+    time is kept as a lower bound on its target's latency.
+    """
+
+    name = "router"
+
+    def __init__(
+        self,
+        routes: Dict[str, Sequence[Target]],
+        fallback: Optional[LLMProvider] = None,
+        hedge: bool = True,
+        hedge_percentile: float = 0.95,
+        initial_hedge_delay: float = 2.0,
+        window: int = 200,
+        min_samples: int = 10,
+        max_error_rate: float = 0.5,
+    ):
+        self.routes = {model: list(targets) for model, targets in routes.items()}
+        self.fallback = fallback
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.window = window
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self._stats: Dict[Tuple[str, str], _TargetStats] = {}
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def _target_stats(self, target: Target) -> _TargetStats:
+        key = (target[0].name, target[1])
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _TargetStats(self.window)
+        return stats
+
+    def _healthy(self, stats: _TargetStats) -> bool:
+        return (
+            len(stats.outcomes) < self.min_samples
+            or stats.error_rate() <= self.max_error_rate
+        )
+
+    def candidates(self, model: str) -> List[Target]:
+        targets = self.routes.get(model)
+        if not targets:
+            if self.fallback is None:
+                raise ValueError(f"No route for model '{model}'")
+            return [(self.fallback, model)]
+
+        def rank(item: Tuple[int, Target]):
+            position, target = item
+            stats = self._target_stats(target)
+            if not self._healthy(stats):
+                return (1, stats.error_rate(), position)
+            return (0, stats.percentile(0.5) or 0.0, position)
+
+        return [target for _, target in sorted(enumerate(targets), key=rank)]
+
+    def hedge_delay(self, target: Target) -> float:
+        stats = self._target_stats(target)
+        if len(stats.latencies) < self.min_samples:
+            return self.initial_hedge_delay
+        return stats.percentile(self.hedge_percentile)
+
+    async def _attempt(
+        self, target: Target, system: str, prompt: str, options: Dict[str, Any]
+    ) -> LLMResponse:
+        provider, model = target
+        stats = self._target_stats(target)
+        started = time.monotonic()
+        try:
+            response = await provider.complete(model, system, prompt, **options)
+        except asyncio.CancelledError:
+            stats.record_censored(time.monotonic() - started)
+            raise
+        except Exception:
+            stats.record(None, False)
+            raise
+        if not response.text and not response.tool_calls:
+            stats.record(None, False)
+            raise LLMProviderError(f"{provider.name} returned an empty response")
+        stats.record(time.monotonic() - started, True)
+        return response
+
+    async def complete(
+        self,
+        model: str,
+        system: str,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> LLMResponse:
+        targets = self.candidates(model)
+        options = {"max_tokens": max_tokens, "json_mode": json_mode, "tools": tools}
+        pending: Set[asyncio.Future] = set()
+        launched: List[asyncio.Future] = []
+        last_error: Optional[BaseException] = None
+        hedged = False
+
+        def launch():
+            task = asyncio.ensure_future(
+                self._attempt(targets[len(launched)], system, prompt, options)
+            )
+            launched.append(task)
+            pending.add(task)
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if self.hedge and len(pending) == 1 and len(launched) < len(targets):
+                    timeout = self.hedge_delay(targets[len(launched) - 1])
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self.hedges += 1
+                    hedged = True
+                    launch()
+                    continue
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        if hedged and task is not launched[0]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"LLM call for {model} failed: {last_error}")
+                if not pending and len(launched) < len(targets):
+                    self.failovers += 1
+                    launch()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "targets": {
+                f"{provider}:{model}": {
+                    "calls": len(stats.outcomes),
+                    "error_rate": stats.error_rate(),
+                    "latency_p50": stats.percentile(0.5),
+                    "latency_p95": stats.percentile(0.95),
+                }
+                for (provider, model), stats in self._stats.items()
+            },
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+        }
+
+
+# Equivalent models per tier; requests for other models go to OpenAI as named.
+default_router = LatencyRouter(
+    {
+        "gpt-4o-mini": [
+            (openai_provider, "gpt-4o-mini"),
+            (anthropic_provider, "claude-3-haiku-20240307"),
+        ],
+        "gpt-4": [
+            (openai_provider, "gpt-4"),
+            (anthropic_provider, "claude-3-5-sonnet-20240620"),
+        ],
+    },
+    fallback=openai_provider,
+)
@@ -0,0 +1,274 @@
+import heapq
+import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveInterval:
+    """A poll interval that backs off while a source is quiet.
+
+    Every poll that returns nothing multiplies the interval by ``backoff``,
+    and every productive poll multiplies it by ``speedup``, always within
+    ``[min_interval, max_interval]``.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        min_interval: float,
+        max_interval: float,
+        backoff: float = 2.0,
+        speedup: float = 0.5,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.speedup = speedup
+        self.current = min(max(initial, min_interval), max_interval)
+
+    def update(self, events: int) -> float:
+        """Record how many events a poll produced and return the next interval."""
+        factor = self.speedup if events else self.backoff
+        self.current = min(
+            max(self.current * factor, self.min_interval), self.max_interval
+        )
+        return self.current
+
+
+class RateBudget:
+    """Token bucket allowing ``calls`` polls per ``period`` seconds."""
+
+    def __init__(self, calls: int, period: float):
+        self.capacity = calls
+        self.rate = calls / period
+        self._tokens = float(calls)
+        self._updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token, or return how many seconds until one is available."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class _PollJob:
+    def __init__(
+        self, dispatcher: Any, provider: str, adaptive: Optional[AdaptiveInterval]
+    ):
+        self.dispatcher = dispatcher
+        self.provider = provider
+        self.adaptive = adaptive
+        self.cancelled = False
+        self.polls = 0
+        self.failures = 0
+        self.overruns = 0
+        self.deferred = 0
+        self.throttled = 0
+        self.last_duration: Optional[float] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "polls": self.polls,
+            "failures": self.failures,
+            "overruns": self.overruns,
+            "deferred": self.deferred,
+            "throttled": self.throttled,
+            "last_duration": self.last_duration,
+            "interval": self.adaptive.current if self.adaptive else None,
+        }
+
+
+class PollingScheduler:
+    """Runs every polling dispatcher's ``_poll_and_handle_events`` on a shared pool.
+
+    One timer thread keeps the next poll of each dispatcher in a heap and
+    hands due polls to a bounded thread pool. A dispatcher is never polled
+    concurrently with itself; the next poll is due ``update_interval``
+    seconds after the previous one started, spread by +/- ``jitter`` so
+    dispatchers sharing an interval do not poll in lockstep. At most
+    ``max_concurrent_per_provider`` polls (or the ``provider_limits`` entry)
+    run at once for one provider; extra due polls wait for a slot. A poll
+    that takes longer than its interval is logged and counted as an overrun.
+
+    Dispatchers with ``adaptive_polling`` get an ``AdaptiveInterval`` between
+    their ``min_interval`` and ``max_interval``, driven by the number of
+    events each poll returned (or, if it returns nothing, dispatched). A
+    ``RateBudget`` in ``provider_budgets`` delays polls once a provider's
+    call budget is spent, however short the intervals have become.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        jitter: float = 0.1,
+        max_concurrent_per_provider: int = 2,
+        provider_limits: Optional[Dict[str, int]] = None,
+        provider_budgets: Optional[Dict[str, RateBudget]] = None,
+    ):
+        self.max_workers = max_workers
+        self.jitter = jitter
+        self.max_concurrent_per_provider = max_concurrent_per_provider
+        self.provider_limits = dict(provider_limits or {})
+        self.provider_budgets = dict(provider_budgets or {})
+        self._jobs: Dict[int, _PollJob] = {}
+        self._heap: List[Tuple[float, int, _PollJob]] = []
+        self._sequence = 0
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._waiting: Dict[str, Deque[_PollJob]] = defaultdict(deque)
+        self._wakeup = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def add(self, dispatcher: Any, provider: Optional[str] = None):
+        provider = provider or type(dispatcher).__name__
+        job = _PollJob(dispatcher, provider, self._adaptive_interval(dispatcher))
+        with self._wakeup:
+            previous = self._jobs.pop(id(dispatcher), None)
+            if previous is not None:
+                previous.cancelled = True
+            self._jobs[id(dispatcher)] = job
+            # Spread first polls over a fraction of the interval.
+            self._push(
+                job,
+                time.monotonic() + random.uniform(0, self.jitter * self.interval(job)),
+            )
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="poll"
+                )
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+
+    def remove(self, dispatcher: Any):
+        with self._wakeup:
+            job = self._jobs.pop(id(dispatcher), None)
+            if job is not None:
+                job.cancelled = True
+
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self, dispatcher: Any) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(id(dispatcher))
+        return job.stats() if job else None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def interval(self, job: _PollJob) -> float:
+        if job.adaptive:
+            return job.adaptive.current
+        return float(job.dispatcher.update_interval)
+
+    @staticmethod
+    def _adaptive_interval(dispatcher: Any) -> Optional[AdaptiveInterval]:
+        if not getattr(dispatcher, "adaptive_polling", False):
+            return None
+        interval = float(dispatcher.update_interval)
+        return AdaptiveInterval(
+            interval,
+            getattr(dispatcher, "min_interval", None) or interval / 4,
+            getattr(dispatcher, "max_interval", None) or interval * 8,
+        )
+
+    def _jittered(self, job: _PollJob) -> float:
+        return self.interval(job) * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _limit(self, provider: str) -> int:
+        return self.provider_limits.get(provider, self.max_concurrent_per_provider)
+
+    def _push(self, job: _PollJob, due: float):
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, job))
+
+    def _run(self):
+        with self._wakeup:
+            while not self._stopped:
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, job = heapq.heappop(self._heap)
+                    if job.cancelled:
+                        continue
+                    budget = self.provider_budgets.get(job.provider)
+                    wait = budget.reserve() if budget else 0.0
+                    if wait > 0:
+                        job.throttled += 1
+                        self._push(job, now + wait)
+                        continue
+                    if self._in_flight[job.provider] >= self._limit(job.provider):
+                        job.deferred += 1
+                        self._waiting[job.provider].append(job)
+                    else:
+                        self._submit(job)
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._wakeup.wait(timeout)
+
+    def _submit(self, job: _PollJob):
+        self._in_flight[job.provider] += 1
+        self._executor.submit(self._poll, job)
+
+    def _poll(self, job: _PollJob):
+        dispatched_before = getattr(job.dispatcher, "dispatched_count", 0)
+        started = time.monotonic()
+        events = 0
+        try:
+            result = job.dispatcher._poll_and_handle_events()
+            if isinstance(result, int):
+                events = result
+            else:
+                events = (
+                    getattr(job.dispatcher, "dispatched_count", 0) - dispatched_before
+                )
+        except Exception as e:
+            job.failures += 1
+            logger.error(f"Error polling {job.dispatcher}: {e}")
+        finished = time.monotonic()
+        duration = finished - started
+        interval = self.interval(job)
+        with self._wakeup:
+            job.polls += 1
+            job.last_duration = duration
+            if duration > interval:
+                job.overruns += 1
+                logger.warning(
+                    f"Poll of {job.dispatcher} took {duration:.2f}s, "
+                    f"longer than its {interval}s interval"
+                )
+            if job.adaptive:
+                job.adaptive.update(events)
+            self._in_flight[job.provider] -= 1
+            waiting = self._waiting[job.provider]
+            while waiting and waiting[0].cancelled:
+                waiting.popleft()
+            if waiting and not self._stopped:
+                self._submit(waiting.popleft())
+            if not job.cancelled:
+                self._push(job, max(started + self._jittered(job), finished))
+                self._wakeup.notify()
+
+
+default_scheduler = PollingScheduler()
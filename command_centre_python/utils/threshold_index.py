@@ -0,0 +1,310 @@
+import math
+import threading
+from numbers import Real
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from .triggers import Trigger, TriggerIndex
+
+Comparison = Literal["above", "below", "equal"]
+
+
+class ThresholdCondition(BaseModel):
+    """``event_data[field]`` is above, below or equal to ``value``.
+
+    The condition only applies to events whose ``where`` fields equal the
+    given values, e.g. ``{"stock_symbol": "ACME"}``.
+    """
+
+    field: str
+    comparison: Comparison
+    value: float
+    where: Dict[str, Any] = Field(default_factory=dict)
+
+
+def _reading(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, Real):
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class _ThresholdGroup:
+    """Thresholds of one (where, field, comparison), sorted for binary search."""
+
+    def __init__(self, field: str, comparison: Comparison):
+        self.field = field
+        self.comparison = comparison
+        self.members: Dict[int, float] = {}
+        self.thresholds = np.empty(0, dtype=np.float64)
+        self.condition_ids = np.empty(0, dtype=np.int64)
+        self.dirty = False
+
+    def rebuild(self):
+        ordered = sorted(self.members.items(), key=lambda item: item[1])
+        self.thresholds = np.fromiter(
+            (value for _, value in ordered), dtype=np.float64, count=len(ordered)
+        )
+        self.condition_ids = np.fromiter(
+            (condition_id for condition_id, _ in ordered),
+            dtype=np.int64,
+            count=len(ordered),
+        )
+        self.dirty = False
+
+    def satisfied(self, readings: np.ndarray) -> List[np.ndarray]:
+        """Condition ids satisfied by each reading, found by binary search."""
+        if self.comparison == "above":
+            ends = np.searchsorted(self.thresholds, readings, side="left")
+            return [self.condition_ids[:end] for end in ends]
+        if self.comparison == "below":
+            starts = np.searchsorted(self.thresholds, readings, side="right")
+            return [self.condition_ids[start:] for start in starts]
+        starts = np.searchsorted(self.thresholds, readings, side="left")
+        ends = np.searchsorted(self.thresholds, readings, side="right")
+        return [self.condition_ids[s:e] for s, e in zip(starts, ends)]
+
+
+class _ThresholdEntry:
+    def __init__(
+        self,
+        sequence: int,
+        trigger: Trigger,
+        conditions: Optional[List[ThresholdCondition]],
+    ):
+        self.sequence = sequence
+        self.trigger = trigger
+        self.conditions = conditions
+        self.match_any = getattr(trigger, "threshold_match", "all") == "any"
+        self.has_residual = (
+            type(trigger).check_residual_conditions
+            is not Trigger.check_residual_conditions
+        )
+        self.condition_ids: List[int] = []
+
+
+def _grown(array: np.ndarray, size: int) -> np.ndarray:
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+class ThresholdIndex(TriggerIndex):
+    """Matches numeric threshold triggers with sorted NumPy arrays.
+
+    Triggers describe themselves with ``threshold_conditions()``. Thresholds
+    are grouped by ``(where, field, comparison)`` and kept sorted, so one
+    ``searchsorted`` call per group finds every condition a reading
+    satisfies, and ``match_many`` evaluates a whole batch of readings with one
+    vectorized search per group. Satisfied conditions are then counted per
+    trigger with array operations: a trigger matches when all of its
+    conditions hold, or any of them if it sets ``threshold_match = "any"``.
+    Triggers that return ``None`` fall back to ``check_conditions``. Groups
+    are re-sorted lazily on the first match after triggers were added or
+    removed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[int, _ThresholdEntry] = {}
+        self._by_sequence: Dict[int, _ThresholdEntry] = {}
+        self._unindexed: Dict[int, _ThresholdEntry] = {}
+        # where fields -> where values -> (field, comparison) -> group
+        self._groups: Dict[
+            Tuple[str, ...],
+            Dict[Tuple[Any, ...], Dict[Tuple[str, str], _ThresholdGroup]],
+        ] = {}
+        # Indexed by condition id: owning trigger's sequence, position in its list.
+        self._condition_sequence = np.zeros(64, dtype=np.int64)
+        self._condition_position = np.zeros(64, dtype=np.int64)
+        # Indexed by trigger sequence: satisfied conditions needed to match.
+        self._required = np.zeros(64, dtype=np.int64)
+        self._sequence = 0
+        self._next_condition_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _group_key(
+        condition: ThresholdCondition,
+    ) -> Optional[Tuple[Tuple[str, ...], Tuple[Any, ...]]]:
+        fields = tuple(sorted(condition.where))
+        values = tuple(condition.where[field] for field in fields)
+        try:
+            hash(values)
+        except TypeError:
+            return None
+        return fields, values
+
+    def add(self, trigger: Trigger):
+        conditions = trigger.threshold_conditions()
+        with self._lock:
+            if id(trigger) in self._entries:
+                return
+            self._sequence += 1
+            if conditions is not None and any(
+                self._group_key(condition) is None for condition in conditions
+            ):
+                conditions = None
+            entry = _ThresholdEntry(self._sequence, trigger, conditions)
+            self._entries[id(trigger)] = entry
+            if not conditions:
+                self._unindexed[id(trigger)] = entry
+                return
+            self._by_sequence[entry.sequence] = entry
+            self._required = _grown(self._required, entry.sequence + 1)
+            self._required[entry.sequence] = 1 if entry.match_any else len(conditions)
+            for position, condition in enumerate(conditions):
+                condition_id = self._next_condition_id
+                self._next_condition_id += 1
+                entry.condition_ids.append(condition_id)
+                self._condition_sequence = _grown(
+                    self._condition_sequence, condition_id + 1
+                )
+                self._condition_position = _grown(
+                    self._condition_position, condition_id + 1
+                )
+                self._condition_sequence[condition_id] = entry.sequence
+                self._condition_position[condition_id] = position
+                fields, values = self._group_key(condition)
+                groups = self._groups.setdefault(fields, {}).setdefault(values, {})
+                group = groups.get((condition.field, condition.comparison))
+                if group is None:
+                    group = _ThresholdGroup(condition.field, condition.comparison)
+                    groups[(condition.field, condition.comparison)] = group
+                group.members[condition_id] = condition.value
+                group.dirty = True
+
+    def remove(self, trigger: Trigger):
+        with self._lock:
+            entry = self._entries.pop(id(trigger), None)
+            if entry is None:
+                return
+            if self._unindexed.pop(id(trigger), None) is not None:
+                return
+            del self._by_sequence[entry.sequence]
+            for condition_id, condition in zip(entry.condition_ids, entry.conditions):
+                fields, values = self._group_key(condition)
+                groups = self._groups[fields][values]
+                group_key = (condition.field, condition.comparison)
+                group = groups[group_key]
+                del group.members[condition_id]
+                group.dirty = True
+                if not group.members:
+                    del groups[group_key]
+                if not groups:
+                    del self._groups[fields][values]
+                if not self._groups[fields]:
+                    del self._groups[fields]
+
+    def _groups_for(self, event_data: Dict[str, Any]) -> List[_ThresholdGroup]:
+        groups = []
+        for fields, by_values in self._groups.items():
+            values = tuple(event_data.get(field) for field in fields)
+            try:
+                matching = by_values.get(values)
+            except TypeError:
+                continue
+            if matching:
+                groups.extend(matching.values())
+        return groups
+
+    def _evaluate(
+        self, events_data: List[Dict[str, Any]], with_positions: bool
+    ) -> Tuple[List[List[Tuple[_ThresholdEntry, List[int]]]], List[_ThresholdEntry]]:
+        satisfied: List[List[np.ndarray]] = [[] for _ in events_data]
+        pending: Dict[int, Tuple[_ThresholdGroup, List[int], List[float]]] = {}
+        for index, event_data in enumerate(events_data):
+            for group in self._groups_for(event_data):
+                reading = _reading(event_data.get(group.field))
+                if reading is None:
+                    continue
+                batch = pending.setdefault(id(group), (group, [], []))
+                batch[1].append(index)
+                batch[2].append(reading)
+        for group, indexes, readings in pending.values():
+            if group.dirty:
+                group.rebuild()
+            hits = group.satisfied(np.asarray(readings, dtype=np.float64))
+            for index, condition_ids in zip(indexes, hits):
+                if len(condition_ids):
+                    satisfied[index].append(condition_ids)
+        results = []
+        for parts in satisfied:
+            if not parts:
+                results.append([])
+                continue
+            condition_ids = np.concatenate(parts)
+            sequences = self._condition_sequence[condition_ids]
+            if with_positions:
+                order = np.argsort(sequences, kind="stable")
+                sequences = sequences[order]
+                positions = self._condition_position[condition_ids[order]].tolist()
+            else:
+                sequences = np.sort(sequences)
+            matched_sequences, starts, counts = np.unique(
+                sequences, return_index=True, return_counts=True
+            )
+            met = counts >= self._required[matched_sequences]
+            by_sequence = self._by_sequence
+            if not with_positions:
+                results.append(
+                    [(by_sequence[s], []) for s in matched_sequences[met].tolist()]
+                )
+                continue
+            results.append(
+                [
+                    (by_sequence[sequence], sorted(positions[start : start + count]))
+                    for sequence, start, count in zip(
+                        matched_sequences[met].tolist(),
+                        starts[met].tolist(),
+                        counts[met].tolist(),
+                    )
+                ]
+            )
+        return results, list(self._unindexed.values())
+
+    def match_many_details(
+        self, events_data: List[Dict[str, Any]], with_positions: bool = True
+    ) -> List[List[Tuple[Trigger, List[int]]]]:
+        """Matching triggers with the positions of their satisfied conditions."""
+        with self._lock:
+            candidates, unindexed = self._evaluate(events_data, with_positions)
+        results = []
+        for event_data, matched in zip(events_data, candidates):
+            accepted = [
+                (entry, positions)
+                for entry, positions in matched
+                if not entry.has_residual
+                or entry.trigger.check_residual_conditions(event_data)
+            ]
+            if unindexed:
+                accepted.extend(
+                    (entry, [])
+                    for entry in unindexed
+                    if entry.trigger.check_conditions(event_data)
+                )
+                accepted.sort(key=lambda item: item[0].sequence)
+            results.append(
+                [(entry.trigger, positions) for entry, positions in accepted]
+            )
+        return results
+
+    def match_details(
+        self, event_data: Dict[str, Any]
+    ) -> List[Tuple[Trigger, List[int]]]:
+        return self.match_many_details([event_data])[0]
+
+    def match(self, event_data: Dict[str, Any]) -> List[Trigger]:
+        return self.match_many([event_data])[0]
+
+    def match_many(self, events_data: List[Dict[str, Any]]) -> List[List[Trigger]]:
+        return [
+            [trigger for trigger, _ in details]
+            for details in self.match_many_details(events_data, with_positions=False)
+        ]
@@ -1,13 +1,30 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, TYPE_CHECKING, Callable, List
-from pydantic import BaseModel
+from collections import defaultdict
+from typing import Dict, Any, TYPE_CHECKING, Callable, List, Optional
+from pydantic import BaseModel, Field
 import asyncio
-
-from .entities import DataEntry, DataSource
-from .event_manager import EventManager
+import logging
+import os
+import uuid
+
+from ..core.db import DATA_DIR
+from ..core.entities import DataEntry
+from ..core.event_manager import EventManager
+from .polling_scheduler import PollingScheduler, default_scheduler
+from .watermark_store import Watermark, WatermarkStore
+from .llm_cache import LLMResultCache, content_key
+from .llm_batch import BatchConditionEvaluator, parse_boolean_array
+from .llm_gateway import default_gateway
+from .llm_cascade import ModelCascade
+from .condition_prefilter import ConditionPrefilter
+from .condition_compiler import ConditionCompiler
 
 if TYPE_CHECKING:
     from ..core.event_manager import EventManager
+    from .keyword_matcher import KeywordCondition
+    from .threshold_index import ThresholdCondition
+
+logger = logging.getLogger(__name__)
 
 
 class Event(BaseModel):
@@ -19,11 +36,58 @@ class Event(BaseModel):
 class TriggerEvent(Event):
     """Base class for all trigger events."""
 
-    pass
+    priority: int = Field(default=3, ge=1, le=5)  # 1 (high) to 5 (low)
+    # id() of each registered trigger the event matched, so listeners need not
+    # re-check conditions; empty when the dispatcher has no triggers.
+    trigger_ids: List[int] = Field(default_factory=list)
+
+
+class TriggerIndex(ABC):
+    """Finds the registered triggers whose conditions an event satisfies."""
+
+    @abstractmethod
+    def add(self, trigger: "Trigger"):
+        pass
+
+    @abstractmethod
+    def remove(self, trigger: "Trigger"):
+        pass
+
+    @abstractmethod
+    def match(self, event_data: Dict[str, Any]) -> List["Trigger"]:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def match_many(self, events_data: List[Dict[str, Any]]) -> List[List["Trigger"]]:
+        return [self.match(event_data) for event_data in events_data]
+
+
+class LinearTriggerIndex(TriggerIndex):
+    """Checks every trigger in registration order."""
+
+    def __init__(self):
+        self._triggers: tuple = ()
+
+    def add(self, trigger: "Trigger"):
+        self._triggers = self._triggers + (trigger,)
+
+    def remove(self, trigger: "Trigger"):
+        self._triggers = tuple(t for t in self._triggers if t is not trigger)
+
+    def match(self, event_data: Dict[str, Any]) -> List["Trigger"]:
+        return [t for t in self._triggers if t.check_conditions(event_data)]
+
+    def __len__(self) -> int:
+        return len(self._triggers)
 
 
 class TriggerDispatcherBase(ABC):
     event_manager: "EventManager" = None
+    dispatched_count: int = 0
+    trigger_index_factory: Callable[[], TriggerIndex] = LinearTriggerIndex
 
     @abstractmethod
     def start(self):
@@ -34,12 +98,75 @@ class TriggerDispatcherBase(ABC):
         pass
 
     def dispatch(self, event: "TriggerEvent"):
-        """Dispatch event via the EventManager."""
+        """Dispatch event via the EventManager.
+
+        Dispatchers call this from their own threads, so the event is handed
+        to the EventManager's loop instead of being awaited here.
+        """
+        if self.event_manager:
+            self.event_manager.dispatch_threadsafe(event)
+            self.dispatched_count += 1
+        else:
+            raise Exception("EventManager not set for dispatcher")
+
+    def dispatch_many(self, events: List["TriggerEvent"]):
+        """Dispatch a burst of events via the EventManager in one hand-off."""
+        if not events:
+            return
         if self.event_manager:
-            self.event_manager.dispatch(event)
+            self.event_manager.dispatch_many_threadsafe(events)
+            self.dispatched_count += len(events)
         else:
             raise Exception("EventManager not set for dispatcher")
 
+    @property
+    def trigger_index(self) -> TriggerIndex:
+        index = self.__dict__.get("_trigger_index")
+        if index is None:
+            index = self.trigger_index_factory()
+            self.__dict__["_trigger_index"] = index
+        return index
+
+    def add_trigger(self, trigger: "Trigger"):
+        self.trigger_index.add(trigger)
+
+    def remove_trigger(self, trigger: "Trigger"):
+        self.trigger_index.remove(trigger)
+
+    def matching_triggers(self, event_data: Dict[str, Any]) -> List["Trigger"]:
+        return self.trigger_index.match(event_data)
+
+    def matched_trigger_ids(self, event_data: Dict[str, Any]) -> Optional[List[int]]:
+        """Ids of the triggers an event matches, or None if it is not wanted.
+
+        Dispatchers without registered triggers forward everything with no
+        ids; otherwise at least one trigger's conditions must hold.
+        """
+        index = self.trigger_index
+        if not len(index):
+            return []
+        return [id(trigger) for trigger in index.match(event_data)] or None
+
+    def matched_trigger_ids_many(
+        self, events_data: List[Dict[str, Any]]
+    ) -> List[Optional[List[int]]]:
+        """``matched_trigger_ids`` for a batch, matched in one call to the index."""
+        index = self.trigger_index
+        if not len(index):
+            return [[] for _ in events_data]
+        return [
+            [id(trigger) for trigger in matches] or None
+            for matches in index.match_many(events_data)
+        ]
+
+    def wants_event(self, event_data: Dict[str, Any]) -> bool:
+        """Whether an event should be dispatched."""
+        return self.matched_trigger_ids(event_data) is not None
+
+    def wants_events(self, events_data: List[Dict[str, Any]]) -> List[bool]:
+        """``wants_event`` for a batch, matched in one call to the index."""
+        return [ids is not None for ids in self.matched_trigger_ids_many(events_data)]
+
 
 class Trigger(ABC):
     dispatcher: TriggerDispatcherBase
@@ -47,39 +174,214 @@ class Trigger(ABC):
     def check_conditions(self, event_data: Dict[str, Any]) -> bool:
         raise NotImplementedError
 
+    def equality_conditions(self) -> Optional[Dict[str, Any]]:
+        """``field == value`` conditions an index may match on this trigger's behalf.
+
+        ``None`` means the trigger cannot be indexed and ``check_conditions``
+        is run instead. Anything the returned dict does not cover must be
+        checked by ``check_residual_conditions``.
+        """
+        return None
+
+    def threshold_conditions(self) -> Optional[List["ThresholdCondition"]]:
+        """Numeric thresholds ``ThresholdIndex`` may match; ``None`` if not indexable."""
+        return None
+
+    def keyword_conditions(self) -> Optional[List["KeywordCondition"]]:
+        """Keywords ``KeywordIndex`` may match; ``None`` if not indexable."""
+        return None
+
+    def check_residual_conditions(self, event_data: Dict[str, Any]) -> bool:
+        return True
+
 
 class PollingTriggerDispatcher(TriggerDispatcherBase):
     update_interval: int = 60  # Default interval in seconds
+    poll_provider: Optional[str] = None  # Shares a concurrency cap; class name if unset
+    poll_scheduler: PollingScheduler = default_scheduler
+    # Opt in to back off while polls come back empty and speed up while they
+    # are productive; this trades trigger latency on quiet sources for fewer calls.
+    adaptive_polling: bool = False
+    min_interval: Optional[float] = None  # Defaults to update_interval / 4
+    max_interval: Optional[float] = None  # Defaults to update_interval * 8
 
     @abstractmethod
-    def _poll_and_handle_events(self):
+    def _poll_and_handle_events(self) -> Optional[int]:
+        """Poll the source once and handle what it returned.
+
+        May return how many items the poll produced; otherwise the number of
+        events it dispatched drives the adaptive interval.
+        """
         pass
 
     def start(self):
-        # Implement a mechanism to periodically call _poll_and_handle_events
-        pass
+        self.poll_scheduler.add(self, self.poll_provider)
 
     def stop(self):
-        # Implement stopping mechanism
-        pass
+        self.poll_scheduler.remove(self)
 
 
 class SemanticTrigger:
-    def __init__(self, condition: str, action: Callable):
+    def __init__(
+        self,
+        condition: str,
+        action: Callable,
+        name: Optional[str] = None,
+        trigger_id: Optional[str] = None,
+    ):
         self.condition = condition
         self.action = action
+        self.name = name or condition
+        # Keys the trigger's watermark. A new trigger gets a fresh id, so it is
+        # backfilled even if an earlier trigger had the same condition; pass
+        # the saved id when restoring a trigger after a restart.
+        self.trigger_id = trigger_id or uuid.uuid4().hex
 
     async def evaluate(self, data_entry: DataEntry, metadata: Dict[str, Any] = None):
-        response = await llm_evaluate_condition(self.condition, data_entry)
-        result = response.strip().lower()
-        if result == "true":
+        if await evaluate_condition(self.condition, data_entry):
             await self.action(data_entry, metadata)
 
 
-@ell.simple(model="gpt-4")
-async def llm_evaluate_condition(condition: str, data_entry: DataEntry) -> bool:
-    """You are an assistant that evaluates conditions based on data entries."""
-    return f"Condition: {condition}\nData: {data_entry.data}\nIs the condition met? Reply with 'True' or 'False'."
+EVALUATE_SYSTEM = (
+    "You are an assistant that evaluates conditions based on data entries."
+)
+
+# Easy yes/no checks are answered by the small model; unsure or malformed
+# answers escalate to the large one.
+condition_cascade = ModelCascade(default_gateway, ["gpt-4o-mini", "gpt-4"])
+
+
+def _is_boolean_answer(text: str) -> bool:
+    return text.strip().lower() in ("true", "false")
+
+
+async def llm_evaluate_condition(condition: str, data_entry: DataEntry) -> str:
+    response = await condition_cascade.complete(
+        EVALUATE_SYSTEM,
+        f"Condition: {condition}\nData: {data_entry.data}\nIs the condition met? Reply with 'True' or 'False'.",
+        key=condition,
+        validate=_is_boolean_answer,
+    )
+    return response.text
+
+
+async def llm_evaluate_batch(prompt: str, count: int) -> str:
+    response = await condition_cascade.complete(
+        EVALUATE_SYSTEM,
+        prompt,
+        validate=lambda text: parse_boolean_array(text, count) is not None,
+    )
+    return response.text
+
+
+# Shared by every semantic trigger; give it a SQLiteCacheStore to persist results.
+condition_cache = LLMResultCache()
+# Screens cache misses before they reach the LLM; see stats() to tune it. Off
+# by default: a rejection is final, since the entry's watermark moves past it,
+# so a paraphrase the prefilter misses is never sent to the LLM. Assign a
+# ConditionPrefilter() to opt in.
+condition_prefilter: Optional[ConditionPrefilter] = None
+condition_compiler = ConditionCompiler()
+
+
+def _condition_key(condition: str, data: Dict[str, Any]) -> str:
+    return content_key(
+        "llm_evaluate_condition", condition_cascade.models, condition, data
+    )
+
+
+async def _ask_condition(condition: str, data_entry: DataEntry) -> Optional[bool]:
+    """The LLM's answer, or None if it was neither 'True' nor 'False'."""
+    response = await llm_evaluate_condition(condition, data_entry)
+    return {"true": True, "false": False}.get(response.strip().lower())
+
+
+batch_evaluator = BatchConditionEvaluator(
+    llm_evaluate_batch,
+    lambda condition, data: _ask_condition(condition, DataEntry(data=data)),
+)
+
+
+async def _cached_evaluations(
+    pairs: List[tuple], evaluate_missing: Callable
+) -> List[Optional[bool]]:
+    """Results for ``(condition, data)`` pairs; None where no answer was read."""
+    keys = [_condition_key(condition, data) for condition, data in pairs]
+    # Conditions compiled into field tests are decided without the LLM.
+    results = [
+        condition_compiler.evaluate(condition, data) for condition, data in pairs
+    ]
+    for index, result in enumerate(results):
+        if result is None:
+            results[index] = condition_cache.get(keys[index])
+    prefilter = condition_prefilter
+    candidates = [index for index, result in enumerate(results) if result is None]
+    screened = {}
+    if prefilter is not None:
+        # Cache misses the prefilter rules out are answered False without the LLM.
+        screened = {index: prefilter.check(*pairs[index]) for index in candidates}
+        candidates = []
+        for index, screening in screened.items():
+            if screening.passed or screening.audit:
+                candidates.append(index)
+            else:
+                results[index] = False
+    if candidates:
+        answers = await evaluate_missing(candidates)
+        for index, answer in zip(candidates, answers):
+            if index in screened:
+                prefilter.record(screened[index], answer)
+            results[index] = answer
+            # Malformed answers are not cached so the next evaluation asks again.
+            if answer is not None:
+                condition_cache.set(keys[index], answer)
+    return results
+
+
+async def evaluate_condition(condition: str, data_entry: DataEntry) -> Optional[bool]:
+    """Whether ``data_entry`` meets ``condition``, asking the LLM only on a cache miss.
+
+    None means the answer could not be read.
+    """
+
+    async def evaluate_missing(missing):
+        return [await _ask_condition(condition, data_entry) for _ in missing]
+
+    results = await _cached_evaluations(
+        [(condition, data_entry.data)], evaluate_missing
+    )
+    return results[0]
+
+
+async def evaluate_conditions(
+    conditions: List[str], data_entry: DataEntry
+) -> List[Optional[bool]]:
+    """Evaluate several conditions on one entry in as few LLM calls as possible."""
+
+    async def evaluate_missing(missing):
+        return await batch_evaluator.evaluate_conditions(
+            [conditions[index] for index in missing], data_entry.data
+        )
+
+    return await _cached_evaluations(
+        [(condition, data_entry.data) for condition in conditions], evaluate_missing
+    )
+
+
+async def evaluate_entries(
+    condition: str, data_entries: List[DataEntry]
+) -> List[Optional[bool]]:
+    """Evaluate one condition on several entries in as few LLM calls as possible."""
+
+    async def evaluate_missing(missing):
+        return await batch_evaluator.evaluate_entries(
+            condition, [data_entries[index].data for index in missing]
+        )
+
+    return await _cached_evaluations(
+        [(condition, data_entry.data) for data_entry in data_entries],
+        evaluate_missing,
+    )
 
 
 async def invoke_trigger_by_name(
@@ -101,19 +403,144 @@ def get_trigger_by_name(name: str):
 
 
 class SemanticTriggerDispatcher:
-    def __init__(self, event_manager: EventManager):
+    """Evaluates semantic triggers against new and modified data entries.
+
+    Every trigger keeps a watermark, the ``(updated_at, id)`` of the last
+    entry it has judged, in a ``WatermarkStore`` keyed by ``trigger_id``. A
+    pass fetches the entries changed since the oldest watermark and
+    evaluates each trigger only on the entries past its own, so unchanged
+    entries are never re-evaluated and a newly registered trigger is
+    backfilled over the existing entries. A trigger's watermark stops before
+    the first entry whose evaluation failed or came back undecided, so that
+    entry is evaluated again on the next pass.
+
+    An entry's pending conditions are evaluated in one batched request, and
+    so are the remaining entries pending for a single trigger.
+    """
+
+    def __init__(
+        self,
+        event_manager: EventManager,
+        watermark_store: Optional[WatermarkStore] = None,
+    ):
         self.event_manager = event_manager
         self.triggers: List[SemanticTrigger] = []
+        self.watermark_store = watermark_store or WatermarkStore(
+            os.path.join(DATA_DIR, "semantic_watermarks.json")
+        )
+        self._pass_lock = asyncio.Lock()
 
     def register_trigger(self, trigger: SemanticTrigger):
+        # Compile once up front so the first pass does not pay for it.
+        condition_compiler.compile(trigger.condition)
         self.triggers.append(trigger)
 
+    def unregister_trigger(self, trigger: SemanticTrigger):
+        self.triggers.remove(trigger)
+        if all(other.trigger_id != trigger.trigger_id for other in self.triggers):
+            self.watermark_store.discard(trigger.trigger_id)
+
     async def monitor_data_sources(self):
-        # This method should be called periodically or when data sources are updated
-        for data_source in DataSource.get_all():
-            for data_entry in data_source.data_entries:
-                for trigger in self.triggers:
-                    await trigger.evaluate(data_entry)
+        # Called periodically and whenever a data entry is saved
+        async with self._pass_lock:
+            triggers = list(self.triggers)
+            if not triggers:
+                return
+            watermarks = {
+                trigger.trigger_id: self.watermark_store.get(trigger.trigger_id)
+                for trigger in triggers
+            }
+            known = [watermark for watermark in watermarks.values() if watermark]
+            since = None
+            if len(known) == len(watermarks):
+                since = min(known)[0]
+            entries = await DataEntry.changed_since(since)
+            pending = {
+                id(trigger): [
+                    data_entry
+                    for data_entry in entries
+                    if watermarks[trigger.trigger_id] is None
+                    or (data_entry.updated_at, data_entry.id)
+                    > watermarks[trigger.trigger_id]
+                ]
+                for trigger in triggers
+            }
+            results = await self._evaluate_pending(triggers, entries, pending)
+            advanced: Dict[str, Watermark] = {}
+            for trigger in triggers:
+                for data_entry in pending[id(trigger)]:
+                    met = results[id(trigger), id(data_entry)]
+                    try:
+                        if isinstance(met, Exception):
+                            raise met
+                        if met is None:
+                            logger.warning(
+                                f"Could not decide '{trigger.name}' on entry "
+                                f"{data_entry.id}; retrying on the next pass"
+                            )
+                            break
+                        if met:
+                            await trigger.action(data_entry, None)
+                    except Exception as e:
+                        logger.error(
+                            f"Error evaluating '{trigger.name}' on entry "
+                            f"{data_entry.id}: {e}"
+                        )
+                        break
+                    advanced[trigger.trigger_id] = (
+                        data_entry.updated_at,
+                        data_entry.id,
+                    )
+            if advanced:
+                self.watermark_store.commit(advanced)
+
+    async def _evaluate_pending(
+        self,
+        triggers: List[SemanticTrigger],
+        entries: List[DataEntry],
+        pending: Dict[int, List[DataEntry]],
+    ) -> Dict[tuple, Any]:
+        """Batch an entry's pending triggers together, and a trigger's leftover
+        entries together, so each group costs one round-trip."""
+        by_entry: Dict[int, List[SemanticTrigger]] = defaultdict(list)
+        for trigger in triggers:
+            for data_entry in pending[id(trigger)]:
+                by_entry[id(data_entry)].append(trigger)
+        groups = []
+        by_trigger: Dict[int, List[DataEntry]] = defaultdict(list)
+        for data_entry in entries:
+            entry_triggers = by_entry.get(id(data_entry), [])
+            if len(entry_triggers) > 1:
+                groups.append(
+                    (
+                        [(trigger, data_entry) for trigger in entry_triggers],
+                        evaluate_conditions(
+                            [trigger.condition for trigger in entry_triggers],
+                            data_entry,
+                        ),
+                    )
+                )
+            elif entry_triggers:
+                by_trigger[id(entry_triggers[0])].append(data_entry)
+        for trigger in triggers:
+            trigger_entries = by_trigger.get(id(trigger))
+            if trigger_entries:
+                groups.append(
+                    (
+                        [(trigger, data_entry) for data_entry in trigger_entries],
+                        evaluate_entries(trigger.condition, trigger_entries),
+                    )
+                )
+        outcomes = await asyncio.gather(
+            *(evaluation for _, evaluation in groups), return_exceptions=True
+        )
+        results = {}
+        for (pairs, _), outcome in zip(groups, outcomes):
+            for index, (trigger, data_entry) in enumerate(pairs):
+                results[id(trigger), id(data_entry)] = (
+                    outcome if isinstance(outcome, Exception) else outcome[index]
+                )
+        return results
 
     async def start(self):
         while True:
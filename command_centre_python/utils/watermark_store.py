@@ -0,0 +1,73 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Position in a change feed: modification time, then id to order ties.
+Watermark = Tuple[datetime, int]
+
+
+class WatermarkStore:
+    """Per-consumer change-feed positions, persisted to a JSON file.
+
+    Each commit rewrites the file through a temporary file and ``os.replace``
+    so a crash leaves either the old or the new watermarks on disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._watermarks: Dict[str, Watermark] = self._load()
+
+    def get(self, consumer: str) -> Optional[Watermark]:
+        return self._watermarks.get(consumer)
+
+    def commit(self, watermarks: Dict[str, Watermark]):
+        """Advance several consumers at once and persist them."""
+        with self._lock:
+            self._watermarks = {**self._watermarks, **watermarks}
+            self._save()
+
+    def discard(self, consumer: str):
+        with self._lock:
+            if consumer in self._watermarks:
+                self._watermarks = {
+                    key: value
+                    for key, value in self._watermarks.items()
+                    if key != consumer
+                }
+                self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(
+                {
+                    consumer: [updated_at.isoformat(), entry_id]
+                    for consumer, (updated_at, entry_id) in self._watermarks.items()
+                },
+                f,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.path + ".tmp", self.path)
+
+    def _load(self) -> Dict[str, Watermark]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read watermarks from {self.path}: {e}")
+            return {}
+        return {
+            consumer: (datetime.fromisoformat(updated_at), entry_id)
+            for consumer, (updated_at, entry_id) in raw.items()
+        }
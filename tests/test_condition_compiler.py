@@ -0,0 +1,64 @@
+import pytest
+
+from command_centre_python.utils.condition_compiler import (
+    ConditionCompiler,
+    compile_condition,
+)
+
+
+@pytest.mark.parametrize(
+    "condition, data",
+    [
+        ("when battery level is below 20", {"signal_level": 5}),
+        ("when CPU temperature is above 80", {"cpu_percent": 95}),
+        ("when the order count is above 10", {"order_total": 250}),
+    ],
+)
+def test_a_field_sharing_only_some_words_is_not_resolved(condition, data):
+    compiled = compile_condition(condition)
+    assert compiled is not None
+    assert compiled.evaluate(data) is None
+
+
+def test_sender_conflicting_with_from_is_undecided():
+    data = {"sender": "Bob", "from": "Jane"}
+    assert compile_condition('an email from "Jane"').evaluate(data) is None
+
+
+def test_sender_falls_back_to_the_from_field():
+    assert compile_condition('an email from "Jane"').evaluate({"from": "Jane"})
+    compiled = compile_condition("an email from boss@corp.com")
+    assert compiled.evaluate({"from": "Boss@corp.com"}) is True
+    assert compiled.evaluate({"from": "someone@corp.com"}) is False
+
+
+def test_fields_containing_every_word_are_resolved():
+    compiled = compile_condition("when CPU is above 90%")
+    assert compiled.evaluate({"cpu_percent": 95}) is True
+    assert compiled.evaluate({"cpu_percent": 50}) is False
+    assert compile_condition("when battery level is below 20").evaluate(
+        {"device": {"batteryLevel": 12}}
+    )
+
+
+def test_an_exact_path_wins_over_partial_names():
+    compiled = compile_condition("when CPU is above 90")
+    assert compiled.evaluate({"cpu": 50, "cpu_percent": 95}) is False
+
+
+def test_matching_fields_must_agree():
+    compiled = compile_condition("when CPU is above 90")
+    assert compiled.evaluate({"cpu_percent": 95, "cpu_load": 20}) is None
+    assert compiled.evaluate({"cpu_percent": 95, "cpu_load": 99}) is True
+
+
+def test_compiler_leaves_unresolved_fields_to_the_llm():
+    compiler = ConditionCompiler()
+    assert (
+        compiler.evaluate("when CPU temperature is above 80", {"cpu_percent": 95})
+        is None
+    )
+    assert compiler.evaluate(
+        "when CPU temperature is above 80", {"cpu_temperature": 85}
+    )
+    assert compiler.stats() == {"decided": 1, "undecided": 1}
@@ -0,0 +1,123 @@
+from typing import Any, Dict, Optional
+
+from command_centre_python.core.event_manager import EventManager
+from command_centre_python.utils.condition_index import ConditionIndex
+from command_centre_python.utils.triggers import (
+    Trigger,
+    TriggerDispatcherBase,
+    TriggerEvent,
+)
+
+
+class Dispatcher(TriggerDispatcherBase):
+    trigger_index_factory = ConditionIndex
+
+    def __init__(self):
+        self.started = 0
+        self.stopped = 0
+
+    def start(self):
+        self.started += 1
+
+    def stop(self):
+        self.stopped += 1
+
+    def handle_event(self, event_data: Dict[str, Any]):
+        trigger_ids = self.matched_trigger_ids(event_data)
+        if trigger_ids is not None:
+            self.dispatch(Fired(event_data=event_data, trigger_ids=trigger_ids))
+
+
+class Fired(TriggerEvent):
+    event_data: dict
+
+
+class EqualsTrigger(Trigger):
+    def __init__(self, dispatcher, conditions, prefix: Optional[str] = None):
+        self.dispatcher = dispatcher
+        self.conditions = conditions
+        self.prefix = prefix
+        self.checked = 0
+
+    def check_conditions(self, event_data):
+        self.checked += 1
+        return all(event_data.get(k) == v for k, v in self.conditions.items()) and (
+            self.check_residual_conditions(event_data)
+        )
+
+    def equality_conditions(self):
+        return self.conditions
+
+    def check_residual_conditions(self, event_data):
+        return self.prefix is None or event_data["subject"].startswith(self.prefix)
+
+
+def test_triggers_are_anchored_on_their_most_selective_key():
+    index = ConditionIndex()
+    dispatcher = Dispatcher()
+    crowd = [EqualsTrigger(dispatcher, {"folder": "inbox"}) for _ in range(3)]
+    for trigger in crowd:
+        index.add(trigger)
+    rare = EqualsTrigger(dispatcher, {"folder": "inbox", "sender": "boss"})
+    index.add(rare)
+    assert index._entries[id(rare)].anchor == ("sender", "boss")
+    assert index._entries[id(rare)].checks == [("folder", "inbox")]
+    # Only triggers filed under a hit key are candidates.
+    candidates = index.candidates({"folder": "spam", "sender": "boss"})
+    assert [entry.trigger for entry in candidates] == [rare]
+    assert index.match({"folder": "spam", "sender": "boss"}) == []
+    assert index.match({"folder": "inbox", "sender": "boss"}) == crowd + [rare]
+
+
+def test_residual_conditions_run_after_the_equalities():
+    index = ConditionIndex()
+    trigger = EqualsTrigger(Dispatcher(), {"sender": "boss"}, prefix="URGENT")
+    index.add(trigger)
+    assert index.match({"sender": "boss", "subject": "URGENT: call"}) == [trigger]
+    assert index.match({"sender": "boss", "subject": "lunch?"}) == []
+    assert trigger.checked == 0
+
+
+def test_unindexable_values_fall_back_to_check_conditions():
+    index = ConditionIndex()
+    dispatcher = Dispatcher()
+    unhashable = EqualsTrigger(dispatcher, {"tags": ["a"]})
+    missing = EqualsTrigger(dispatcher, {"sender": None})
+    index.add(unhashable)
+    index.add(missing)
+    assert index.match({"tags": ["a"]}) == [unhashable, missing]
+    assert unhashable.checked == 1
+    index.remove(unhashable)
+    index.remove(missing)
+    assert len(index) == 0
+    assert index.match({"tags": ["a"]}) == []
+
+
+def test_dispatcher_runs_while_any_of_its_triggers_is_registered():
+    manager = EventManager()
+    dispatcher = Dispatcher()
+    first = EqualsTrigger(dispatcher, {"sender": "a"})
+    second = EqualsTrigger(dispatcher, {"sender": "b"})
+    manager.register_trigger(first)
+    manager.register_trigger(second)
+    assert (dispatcher.started, dispatcher.stopped) == (1, 0)
+    manager.unregister_trigger(first)
+    assert dispatcher.stopped == 0
+    manager.unregister_trigger(second)
+    assert (dispatcher.started, dispatcher.stopped) == (1, 1)
+
+
+def test_events_carry_the_ids_of_the_triggers_they_matched():
+    manager = EventManager()
+    dispatcher = Dispatcher()
+    boss = EqualsTrigger(dispatcher, {"sender": "boss"})
+    other = EqualsTrigger(dispatcher, {"sender": "other"})
+    manager.register_trigger(boss)
+    manager.register_trigger(other)
+    received = []
+    manager.add_listener(Fired, lambda event: received.append(event))
+    dispatcher.handle_event({"sender": "boss"})
+    dispatcher.handle_event({"sender": "nobody"})
+    assert len(received) == 1
+    assert received[0].trigger_ids == [id(boss)]
+    assert manager.triggers_for(received[0]) == [boss]
@@ -0,0 +1,92 @@
+import asyncio
+
+import numpy as np
+
+from command_centre_python.utils import triggers
+from command_centre_python.utils.condition_prefilter import (
+    ConditionPrefilter,
+    condition_terms,
+    keyword_overlap,
+    tokens,
+)
+
+
+def test_keyword_overlap_matches_stems_and_abbreviations():
+    terms = condition_terms("when the temperature is rising")
+    assert terms == {"temperature", "ris"}
+    assert keyword_overlap(terms, tokens("temp 41")) == 1
+    assert keyword_overlap(terms, tokens("humidity 80")) == 0
+
+
+def test_keyword_stage_passes_entries_sharing_content_words():
+    prefilter = ConditionPrefilter(similarity_threshold=1.0)
+    result = prefilter.check("an order over 100", {"order_total": 250})
+    assert (result.passed, result.stage, result.keyword_overlap) == (
+        True,
+        "keyword",
+        1,
+    )
+
+
+def test_similarity_threshold_decides_entries_without_shared_words():
+    def embed(text):
+        return np.array([1.0, 0.0]) if "angry" in text else np.array([0.6, 0.8])
+
+    condition, data = "boss is angry", {"message": "I'm furious"}
+    strict = ConditionPrefilter(similarity_threshold=0.7, audit_rate=0.0, embed=embed)
+    loose = ConditionPrefilter(similarity_threshold=0.5, audit_rate=0.0, embed=embed)
+    rejected, passed = strict.check(condition, data), loose.check(condition, data)
+    assert (rejected.passed, rejected.stage) == (False, "rejected")
+    assert rejected.similarity == passed.similarity
+    assert (passed.passed, passed.stage) == (True, "similarity")
+
+
+def test_negated_conditions_bypass_the_screen():
+    prefilter = ConditionPrefilter(similarity_threshold=1.0)
+    assert prefilter.check("no orders were placed", {"x": 1}).stage == "bypass"
+
+
+def test_recall_is_estimated_from_audited_rejections():
+    prefilter = ConditionPrefilter(similarity_threshold=1.0, audit_rate=1.0)
+    for _ in range(3):
+        prefilter.record(prefilter.check("an order over 100", {"order": 1}), True)
+    prefilter.record(prefilter.check("an order over 100", {"order": 2}), False)
+    audited = prefilter.check("an order over 100", {"weather": "rain"})
+    assert audited.audit and not audited.passed
+    prefilter.record(audited, True)
+    stats = prefilter.stats()
+    assert stats["precision"] == 0.75
+    # One audited rejection out of one was met, so one match was missed.
+    assert stats["recall"] == 0.75
+
+
+def _ask(answers):
+    async def ask(condition, data_entry):
+        answers.append(data_entry.data)
+        return True
+
+    return ask
+
+
+def test_prefilter_is_off_by_default(monkeypatch):
+    asked = []
+    monkeypatch.setattr(triggers, "_ask_condition", _ask(asked))
+    assert triggers.condition_prefilter is None
+    entry = triggers.DataEntry(data={"message": "I'm furious, call me"})
+    assert asyncio.run(triggers.evaluate_condition("the boss is angry", entry))
+    assert asked == [entry.data]
+
+
+def test_opted_in_prefilter_answers_rejections_false(monkeypatch):
+    asked = []
+    monkeypatch.setattr(triggers, "_ask_condition", _ask(asked))
+    monkeypatch.setattr(
+        triggers,
+        "condition_prefilter",
+        ConditionPrefilter(similarity_threshold=1.0, audit_rate=0.0),
+    )
+    entry = triggers.DataEntry(data={"message": "lunch at noon?"})
+    assert (
+        asyncio.run(triggers.evaluate_condition("the server is down", entry)) is False
+    )
+    assert asked == []
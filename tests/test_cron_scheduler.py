@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+
+from command_centre_python.modules.scheduling.cron_scheduler import CronScheduler
+
+
+class Recorder:
+    def __init__(self):
+        self.fired = []
+
+    def handle_events(self, events_data):
+        self.fired.append(events_data)
+
+
+def _scheduler(**kwargs):
+    """A scheduler holding one every-minute schedule, with its thread stopped."""
+    scheduler = CronScheduler(**kwargs)
+    dispatcher = Recorder()
+    scheduler.add(dispatcher, "* * * * *")
+    scheduler.stop()
+    first = scheduler._entries[id(dispatcher)].next_fire
+    return scheduler, dispatcher, first
+
+
+def _utc(slot: datetime) -> str:
+    return slot.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def test_missed_slots_fire_in_order_with_their_scheduled_times():
+    scheduler, dispatcher, first = _scheduler()
+    now = first + timedelta(minutes=4, seconds=30)
+    fires = scheduler._collect_due(now.timestamp())
+    assert len(fires) == 1
+    fired_dispatcher, events = fires[0]
+    assert fired_dispatcher is dispatcher
+    assert [event["timestamp"] for event in events] == [
+        _utc(first + timedelta(minutes=minute)) for minute in range(5)
+    ]
+    assert [event["catch_up"] for event in events] == [True] * 4 + [False]
+    entry = scheduler._entries[id(dispatcher)]
+    assert entry.next_fire == first + timedelta(minutes=5)
+
+
+def test_catch_up_disabled_fires_only_the_latest_slot():
+    scheduler, _, first = _scheduler(catch_up=False)
+    now = first + timedelta(minutes=4, seconds=30)
+    ((_, events),) = scheduler._collect_due(now.timestamp())
+    assert events == [
+        {"timestamp": _utc(first + timedelta(minutes=4)), "catch_up": False}
+    ]
+
+
+def test_catch_up_is_capped_and_skips_the_rest():
+    scheduler, dispatcher, first = _scheduler(max_catch_up=3)
+    now = first + timedelta(minutes=10, seconds=30)
+    ((_, events),) = scheduler._collect_due(now.timestamp())
+    assert len(events) == 3
+    assert scheduler.skipped == 1
+    assert scheduler._entries[id(dispatcher)].next_fire == first + timedelta(minutes=11)
+
+
+def test_nothing_fires_before_the_first_slot():
+    scheduler, _, first = _scheduler()
+    assert scheduler._collect_due((first - timedelta(seconds=1)).timestamp()) == []
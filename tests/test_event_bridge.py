@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+from command_centre_python.core.event_bridge import ThreadSafeEventBridge
+
+
+def test_burst_from_many_threads_costs_one_wakeup():
+    async def run():
+        batches = []
+
+        async def deliver_many(events):
+            batches.append(list(events))
+
+        bridge = ThreadSafeEventBridge(asyncio.get_running_loop(), deliver_many)
+        threads = [
+            threading.Thread(
+                target=lambda t=t: [bridge.submit((t, i)) for i in range(100)]
+            )
+            for t in range(8)
+        ]
+        # The loop is blocked while the producers run, so nothing drains yet.
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return bridge, batches
+
+    bridge, batches = asyncio.run(run())
+    assert bridge.wakeups == 1
+    assert len(batches) == 1
+    assert sorted(batches[0]) == [(t, i) for t in range(8) for i in range(100)]
+
+
+def test_events_after_a_drain_schedule_a_new_wakeup():
+    async def run():
+        batches = []
+
+        async def deliver_many(events):
+            batches.append(events)
+
+        bridge = ThreadSafeEventBridge(asyncio.get_running_loop(), deliver_many)
+        bridge.submit_many([1, 2])
+        await asyncio.sleep(0.01)
+        bridge.submit(3)
+        await asyncio.sleep(0.01)
+        return bridge, batches
+
+    bridge, batches = asyncio.run(run())
+    assert batches == [[1, 2], [3]]
+    assert bridge.wakeups == 2
+
+
+def test_overflow_drops_the_oldest_pending_events():
+    async def run():
+        batches = []
+
+        async def deliver_many(events):
+            batches.append(events)
+
+        bridge = ThreadSafeEventBridge(
+            asyncio.get_running_loop(), deliver_many, max_pending=3
+        )
+        bridge.submit_many(list(range(5)))
+        await asyncio.sleep(0.01)
+        return bridge, batches
+
+    bridge, batches = asyncio.run(run())
+    assert batches == [[2, 3, 4]]
+    assert bridge.dropped == 2
@@ -0,0 +1,106 @@
+import asyncio
+import os
+
+from pydantic import BaseModel
+
+from command_centre_python.core.event_log import SEGMENT_SUFFIX, EventLog
+from command_centre_python.core.event_manager import EventManager
+
+
+class Ping(BaseModel):
+    n: int
+
+
+def _segments(directory) -> int:
+    return sum(name.endswith(SEGMENT_SUFFIX) for name in os.listdir(directory))
+
+
+def test_read_replays_across_segments(tmp_path):
+    log = EventLog(str(tmp_path), segment_size=256)
+    try:
+        offsets = log.append_many([Ping(n=n) for n in range(40)])
+        assert offsets == list(range(40))
+        assert _segments(tmp_path) > 3
+        replayed = list(log.read(17))
+    finally:
+        log.close()
+    assert [offset for offset, _ in replayed] == list(range(17, 40))
+    assert [event.n for _, event in replayed] == list(range(17, 40))
+
+
+def test_reopened_log_recovers_its_end_and_keeps_appending(tmp_path):
+    log = EventLog(str(tmp_path), segment_size=256)
+    log.append_many([Ping(n=n) for n in range(25)])
+    log.close()
+
+    log = EventLog(str(tmp_path), segment_size=256)
+    try:
+        assert log.next_offset == 25
+        assert log.append(Ping(n=25)) == 25
+        assert [event.n for _, event in log.read(0)] == list(range(26))
+    finally:
+        log.close()
+
+
+def test_manager_replay_resumes_from_the_committed_consumer_offset(tmp_path):
+    log = EventLog(str(tmp_path), segment_size=256)
+    manager = EventManager(journal=log)
+    received = []
+    manager.add_listener(Ping, lambda event: received.append(event.n))
+
+    async def run():
+        await manager.dispatch_many([Ping(n=n) for n in range(30)])
+        received.clear()
+        first = await manager.replay(consumer="audit", batch_size=7)
+        await manager.dispatch_many([Ping(n=n) for n in range(30, 35)])
+        received.clear()
+        second = await manager.replay(consumer="audit")
+        return first, second
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        log.close()
+    assert first == 30
+    assert second == 35
+    assert received == list(range(30, 35))
+    assert log.consumer_offset("audit") == 35
+
+
+def test_truncate_before_removes_only_segments_wholly_below_the_offset(tmp_path):
+    log = EventLog(str(tmp_path), segment_size=256)
+    try:
+        log.append_many([Ping(n=n) for n in range(40)])
+        log.flush()
+        bases = sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(tmp_path)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+        cut = bases[2] + 1
+        log.truncate_before(cut)
+        # The segment holding ``cut`` stays, and so does everything after it.
+        assert _segments(tmp_path) == len(bases) - 2
+        replayed = [offset for offset, _ in log.read(0)]
+        log.truncate_before(10_000)
+        remaining = _segments(tmp_path)
+    finally:
+        log.close()
+    assert replayed == list(range(bases[2], 40))
+    assert remaining == 1
+
+
+def test_rollovers_during_background_flushes_lose_nothing(tmp_path):
+    log = EventLog(
+        str(tmp_path), segment_size=256, flush_interval=0.0, group_commit_size=1
+    )
+    try:
+        for n in range(300):
+            log.append(Ping(n=n))
+    finally:
+        log.close()
+    log = EventLog(str(tmp_path), segment_size=256)
+    try:
+        assert [event.n for _, event in log.read(0)] == list(range(300))
+    finally:
+        log.close()
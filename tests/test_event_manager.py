@@ -0,0 +1,361 @@
+import asyncio
+import threading
+
+import pytest
+
+from command_centre_python.core.event_manager import (
+    Event,
+    EventManager,
+    EventQueueFull,
+    listener_key_matches,
+)
+
+
+class Base(Event):
+    def __init__(self, n: int = 0):
+        self.n = n
+
+
+class Child(Base):
+    pass
+
+
+class Grandchild(Child):
+    pass
+
+
+class Other(Event):
+    pass
+
+
+def test_listener_key_matches_class_name_wildcard_and_module():
+    assert listener_key_matches(Base, Grandchild)
+    assert not listener_key_matches(Child, Base)
+    assert listener_key_matches("Child", Grandchild)
+    assert not listener_key_matches("Grandchild", Child)
+    assert listener_key_matches("*", Other)
+    assert listener_key_matches(f"{__name__}.*", Other)
+    assert not listener_key_matches("command_centre_python.modules.*", Other)
+
+
+def test_dispatch_routes_through_the_mro():
+    manager = EventManager()
+    received = []
+    manager.add_listener(Base, lambda e: received.append(("base", type(e))))
+    manager.add_listener("Child", lambda e: received.append(("child", type(e))))
+    manager.add_listener("*", lambda e: received.append(("any", type(e))))
+
+    async def run():
+        await manager.dispatch(Grandchild())
+        await manager.dispatch(Base())
+        await manager.dispatch(Other())
+
+    asyncio.run(run())
+    assert received == [
+        ("child", Grandchild),
+        ("base", Grandchild),
+        ("any", Grandchild),
+        ("base", Base),
+        ("any", Base),
+        ("any", Other),
+    ]
+
+
+def test_listener_under_several_keys_is_called_once():
+    manager = EventManager()
+    calls = []
+    listener = calls.append
+    manager.add_listener(Base, listener)
+    manager.add_listener("Child", listener)
+    asyncio.run(manager.dispatch(Child()))
+    assert len(calls) == 1
+
+
+def test_adding_a_listener_invalidates_cached_routes():
+    manager = EventManager()
+    received = []
+    manager.add_listener(Base, lambda e: received.append("base"))
+    asyncio.run(manager.dispatch(Child()))
+    manager.add_listener(Child, lambda e: received.append("child"))
+    asyncio.run(manager.dispatch(Child()))
+    manager.remove_listener(Child, manager.listeners[Child][0])
+    asyncio.run(manager.dispatch(Child()))
+    assert received == ["base", "child", "base", "base"]
+
+
+async def _fill_queue(manager: EventManager, received: list, release: asyncio.Event):
+    """Park the consumer on the first event and fill the one-slot queue."""
+    started = asyncio.Event()
+
+    async def listener(event):
+        started.set()
+        await release.wait()
+        received.append(event.n)
+
+    manager.add_listener(Base, listener)
+    await manager.dispatch(Base(1))
+    await started.wait()
+    await manager.dispatch(Base(2))
+
+
+def test_writers_publish_new_registries_instead_of_mutating_them():
+    manager = EventManager()
+    first = lambda event: None
+    second = lambda event: None
+    manager.add_listener(Base, first)
+    listeners, policies = manager.listeners, manager.listener_policies
+    manager.add_listener(Base, second)
+    manager.remove_listener(Base, first)
+    assert listeners == {Base: (first,)}
+    assert list(policies) == [first]
+    assert manager.listeners == {Base: (second,)}
+
+
+def test_a_listener_added_during_dispatch_sees_the_next_event():
+    async def run():
+        manager = EventManager()
+        late = []
+
+        def subscribe(event):
+            if event.n == 1:
+                manager.add_listener(Base, lambda event: late.append(event.n))
+
+        manager.add_listener(Base, subscribe)
+        await manager.dispatch(Base(1))
+        await manager.dispatch(Base(2))
+        return late
+
+    assert asyncio.run(run()) == [2]
+
+
+def test_dispatch_is_consistent_while_other_threads_subscribe():
+    manager = EventManager()
+    received = []
+    manager.add_listener(Base, lambda event: received.append(event.n))
+    stop = threading.Event()
+    errors = []
+
+    def churn():
+        callbacks = [lambda event: None for _ in range(20)]
+        try:
+            while not stop.is_set():
+                for callback in callbacks:
+                    manager.add_listener(Child, callback)
+                    manager.add_listener("*", callback)
+                for callback in callbacks:
+                    manager.remove_listener(Child, callback)
+                    manager.remove_listener("*", callback)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    async def run():
+        for n in range(2000):
+            await manager.dispatch(Grandchild(n))
+
+    threads = [threading.Thread(target=churn) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    try:
+        asyncio.run(run())
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert not errors
+    assert received == list(range(2000))
+    # Once the writers are done the cached route matches the registry again.
+    assert manager._route(Grandchild) == (manager.listeners[Base][0],)
+
+
+def test_dispatch_many_hands_batch_listeners_each_class_once():
+    async def run():
+        manager = EventManager()
+        batches, singles = [], []
+        manager.add_listener(
+            Base, lambda events: batches.append([e.n for e in events]), batch=True
+        )
+        manager.add_listener(Base, lambda event: singles.append(event.n))
+        await manager.dispatch_many([Base(1), Child(2), Base(3), Child(4), Other()])
+        await manager.dispatch(Base(5))
+        return batches, singles
+
+    batches, singles = asyncio.run(run())
+    # One call per event class in the burst, and a one-event list for dispatch.
+    assert batches == [[1, 3], [2, 4], [5]]
+    assert singles == [1, 3, 2, 4, 5]
+
+
+def test_queue_consumers_drain_bursts_in_batches():
+    async def run():
+        manager = EventManager(queued=True, max_batch_size=3)
+        batches = []
+        manager.add_listener(
+            Base, lambda events: batches.append([e.n for e in events]), batch=True
+        )
+        # Nothing is consumed until the dispatching coroutine yields.
+        await manager.dispatch_many([Base(n) for n in range(7)])
+        await manager.close()
+        return batches
+
+    assert asyncio.run(run()) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_a_failing_batch_listener_is_counted_once_per_batch():
+    async def run():
+        manager = EventManager()
+
+        def fail(events):
+            raise ValueError("bad batch")
+
+        manager.add_listener(Base, fail, batch=True)
+        await manager.dispatch_many([Base(n) for n in range(4)])
+        return manager.listener_policies[fail].stats()
+
+    stats = asyncio.run(run())
+    assert (stats["calls"], stats["failures"]) == (1, 1)
+
+
+def test_block_backpressure_waits_for_room():
+    async def run():
+        manager = EventManager(queued=True, max_queue_size=1, backpressure="block")
+        received, release = [], asyncio.Event()
+        await _fill_queue(manager, received, release)
+        blocked = asyncio.ensure_future(manager.dispatch(Base(3)))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        release.set()
+        await blocked
+        await manager.close()
+        return received
+
+    assert asyncio.run(run()) == [1, 2, 3]
+
+
+def test_drop_oldest_backpressure_discards_the_oldest_queued_event():
+    async def run():
+        manager = EventManager(
+            queued=True, max_queue_size=1, backpressure="drop_oldest"
+        )
+        received, release = [], asyncio.Event()
+        await _fill_queue(manager, received, release)
+        await manager.dispatch(Base(3))
+        release.set()
+        await manager.close()
+        return received, manager.dropped_events
+
+    received, dropped = asyncio.run(run())
+    assert received == [1, 3]
+    assert dropped == {"Base": 1}
+
+
+def test_reject_backpressure_raises_when_full():
+    async def run():
+        manager = EventManager(queued=True, max_queue_size=1, backpressure="reject")
+        received, release = [], asyncio.Event()
+        await _fill_queue(manager, received, release)
+        with pytest.raises(EventQueueFull):
+            await manager.dispatch(Base(3))
+        release.set()
+        await manager.close()
+        return received
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_a_slow_listener_times_out_without_holding_up_the_others():
+    async def run():
+        manager = EventManager(fan_out=True, listener_timeout=1.0)
+        received = []
+
+        async def slow(event):
+            await asyncio.sleep(5)
+
+        async def quick(event):
+            received.append(event.n)
+
+        manager.add_listener(Base, slow, timeout=0.01)
+        manager.add_listener(Base, quick)
+        await asyncio.wait_for(manager.dispatch(Base(1)), 1.0)
+        return received, manager.listener_policies[slow].stats()
+
+    received, stats = asyncio.run(run())
+    assert received == [1]
+    assert (stats["calls"], stats["timeouts"], stats["in_flight"]) == (1, 1, 0)
+
+
+def _bulkhead_run(bulkhead):
+    async def run():
+        manager = EventManager()
+        running, peak, received = [0], [0], []
+
+        async def listener(event):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            received.append(event.n)
+
+        manager.add_listener(Base, listener, max_concurrency=2, bulkhead=bulkhead)
+        await asyncio.gather(*(manager.dispatch(Base(n)) for n in range(5)))
+        return sorted(received), peak[0], manager.listener_policies[listener]
+
+    return asyncio.run(run())
+
+
+def test_bulkhead_queues_calls_beyond_max_concurrency():
+    received, peak, policy = _bulkhead_run("wait")
+    assert received == [0, 1, 2, 3, 4]
+    assert peak == 2
+    assert policy.stats()["rejected"] == 0
+
+
+def test_reject_bulkhead_skips_and_counts_calls_beyond_max_concurrency():
+    received, peak, policy = _bulkhead_run("reject")
+    assert received == [0, 1]
+    assert peak == 2
+    assert policy.stats()["rejected"] == 3
+
+
+def _dispatch_from_thread(manager: EventManager, event: Event):
+    errors = []
+
+    def run():
+        try:
+            manager.dispatch_threadsafe(event)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return errors
+
+
+def test_started_manager_delivers_thread_dispatches_on_its_loop():
+    async def run():
+        manager = EventManager()
+        received = []
+        manager.add_listener(Base, lambda e: received.append(threading.get_ident()))
+        await manager.start()
+        assert _dispatch_from_thread(manager, Base()) == []
+        await asyncio.sleep(0.01)
+        await manager.close()
+        return received
+
+    assert asyncio.run(run()) == [threading.get_ident()]
+
+
+def test_unbound_manager_delivers_on_the_dispatching_thread():
+    manager = EventManager()
+    received = []
+    manager.add_listener(Base, lambda e: received.append(threading.get_ident()))
+    assert _dispatch_from_thread(manager, Base()) == []
+    assert len(received) == 1
+    assert received[0] != threading.get_ident()
+
+
+def test_unbound_queued_manager_refuses_thread_dispatches():
+    manager = EventManager(queued=True)
+    errors = _dispatch_from_thread(manager, Base())
+    assert len(errors) == 1
+    assert "start()" in str(errors[0])
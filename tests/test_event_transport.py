@@ -0,0 +1,212 @@
+import asyncio
+import json
+
+from pydantic import BaseModel
+
+from command_centre_python.core.event_manager import EventManager
+from command_centre_python.core.event_transport import (
+    BrokerServer,
+    BrokerTransport,
+    InMemoryBroker,
+    RemoteBroker,
+)
+
+
+class Reading(BaseModel):
+    n: int
+
+
+def _records(*values: int):
+    return [(str(value), str(value).encode()) for value in values]
+
+
+def test_produce_before_create_topic_creates_it():
+    async def run():
+        broker = InMemoryBroker(default_partitions=2)
+        await broker.produce("events", _records(1, 2, 3))
+        await broker.create_topic("events", partitions=4)
+        return await broker.fetch("group", "events", "a", max_wait=0)
+
+    records = asyncio.run(run())
+    assert sorted(value for _, _, value in records) == [b"1", b"2", b"3"]
+    assert {partition for partition, _, _ in records} <= {0, 1}
+
+
+def test_group_members_split_partitions_and_redeliver_until_commit():
+    async def run():
+        broker = InMemoryBroker()
+        await broker.create_topic("events", partitions=4)
+        assert await broker.join("group", "events", "a") == [0, 1, 2, 3]
+        assert await broker.join("group", "events", "b") == [1, 3]
+        await broker.produce("events", _records(*range(20)))
+        a = await broker.fetch("group", "events", "a", max_wait=0)
+        b = await broker.fetch("group", "events", "b", max_wait=0)
+        again = await broker.fetch("group", "events", "a", max_wait=0)
+        offsets = {}
+        for partition, offset, _ in a:
+            offsets[partition] = offset + 1
+        assert await broker.commit("group", "events", "a", offsets)
+        # "b" owns partitions 1 and 3, so "a" may not commit them.
+        assert not await broker.commit("group", "events", "a", {1: 1})
+        after = await broker.fetch("group", "events", "a", max_wait=0)
+        return a, b, again, after
+
+    a, b, again, after = asyncio.run(run())
+    assert {partition for partition, _, _ in a} <= {0, 2}
+    assert {partition for partition, _, _ in b} <= {1, 3}
+    assert len(a) + len(b) == 20
+    assert again == a
+    assert after == []
+
+
+def test_records_every_group_committed_are_trimmed():
+    async def run():
+        broker = InMemoryBroker()
+        await broker.create_topic("events", partitions=1)
+        await broker.join("fast", "events", "a")
+        await broker.join("slow", "events", "b")
+        await broker.produce("events", _records(*range(10)))
+        await broker.commit("fast", "events", "a", {0: 10})
+        retained = len(broker._topics["events"][0].records)
+        await broker.commit("slow", "events", "b", {0: 4})
+        trimmed = broker._topics["events"][0]
+        slow = await broker.fetch("slow", "events", "b", max_wait=0)
+        return retained, trimmed, slow
+
+    retained, partition, slow = asyncio.run(run())
+    assert retained == 10
+    assert partition.base_offset == 4
+    assert [offset for _, offset, _ in slow] == list(range(4, 10))
+
+
+def test_retention_limit_drops_the_oldest_records():
+    async def run():
+        broker = InMemoryBroker(max_records_per_partition=5)
+        await broker.create_topic("events", partitions=1)
+        await broker.produce("events", _records(*range(12)))
+        return broker, await broker.fetch("group", "events", "a", max_wait=0)
+
+    broker, records = asyncio.run(run())
+    assert broker.expired == 7
+    assert [(offset, value) for _, offset, value in records] == [
+        (offset, str(offset).encode()) for offset in range(7, 12)
+    ]
+
+
+def test_event_manager_delivers_through_a_broker_transport():
+    async def run():
+        broker = InMemoryBroker()
+        manager = EventManager(transport=BrokerTransport(broker, partitions=2))
+        received = []
+        manager.add_listener(Reading, lambda event: received.append(event.n))
+        await manager.start()
+        await manager.dispatch_many([Reading(n=n) for n in range(5)])
+        for _ in range(100):
+            if len(received) == 5:
+                break
+            await asyncio.sleep(0.01)
+        await manager.close()
+        return received, broker
+
+    received, broker = asyncio.run(run())
+    assert sorted(received) == list(range(5))
+    # Everything was committed by the only group, so nothing is retained.
+    assert all(not partition.records for partition in broker._topics["events"])
+
+
+def test_a_failed_commit_is_logged_and_consumption_goes_on():
+    class FlakyBroker(InMemoryBroker):
+        failures = 1
+
+        async def commit(self, group, topic, member, offsets):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("broker went away")
+            return await super().commit(group, topic, member, offsets)
+
+    async def run():
+        broker = FlakyBroker()
+        transport = BrokerTransport(broker, partitions=1)
+        received = []
+
+        async def deliver(events):
+            received.extend(event.n for event in events)
+
+        await transport.start(deliver)
+        await transport.publish([Reading(n=1)])
+        for _ in range(300):
+            if len(received) == 2:
+                break
+            await asyncio.sleep(0.01)
+        # The uncommitted batch came back once and was then committed.
+        await transport.publish([Reading(n=2)])
+        for _ in range(100):
+            if len(received) == 3:
+                break
+            await asyncio.sleep(0.01)
+        alive = not transport._task.done()
+        await transport.close()
+        return received, alive
+
+    received, alive = asyncio.run(run())
+    assert received == [1, 1, 2]
+    assert alive
+
+
+def test_the_server_answers_a_malformed_request_and_keeps_serving():
+    async def run():
+        server = BrokerServer()
+        await server.start()
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(b"not json\n")
+        writer.write(
+            json.dumps(
+                {
+                    "id": 1,
+                    "op": "join",
+                    "args": {"group": "g", "topic": "t", "member": "a"},
+                }
+            ).encode()
+            + b"\n"
+        )
+        await writer.drain()
+        responses = [
+            json.loads(await asyncio.wait_for(reader.readline(), 1.0)) for _ in range(2)
+        ]
+        writer.close()
+        await server.stop()
+        return sorted(responses, key=lambda response: response["id"] or 0)
+
+    malformed, joined = asyncio.run(run())
+    assert malformed["id"] is None and "error" in malformed
+    assert joined["id"] == 1 and len(joined["result"]) == 8
+
+
+def test_calls_waiting_on_a_lost_connection_fail_and_the_next_reconnects():
+    async def run():
+        async def hang_up(reader, writer):
+            await reader.readline()
+            writer.write(b"garbage\n")
+            await writer.drain()
+            writer.close()
+
+        rogue = await asyncio.start_server(hang_up, "127.0.0.1", 0)
+        server = BrokerServer()
+        await server.start()
+        remote = RemoteBroker(port=rogue.sockets[0].getsockname()[1])
+        try:
+            await asyncio.wait_for(remote.join("g", "t", "a"), 1.0)
+        except ConnectionError:
+            lost = True
+        else:
+            lost = False
+        rogue.close()
+        remote.port = server.port
+        partitions = await asyncio.wait_for(remote.join("g", "t", "a"), 1.0)
+        await remote.close()
+        await server.stop()
+        return lost, partitions
+
+    lost, partitions = asyncio.run(run())
+    assert lost
+    assert partitions == list(range(8))
@@ -0,0 +1,103 @@
+from command_centre_python.utils.geofence_index import (
+    CircleArea,
+    GeoFenceIndex,
+    PolygonArea,
+)
+from command_centre_python.utils.triggers import Trigger
+
+
+class FenceTrigger(Trigger):
+    def __init__(self, area, enter_exit: str = "enter"):
+        self.area = area
+        self.enter_exit = enter_exit
+
+    def geofence(self):
+        return self.area
+
+
+# Roughly 1 km around central London.
+LONDON = CircleArea(latitude=51.5074, longitude=-0.1278, radius_m=1000)
+INSIDE = {"device_id": "phone", "latitude": 51.5074, "longitude": -0.1278}
+OUTSIDE = {"device_id": "phone", "latitude": 51.53, "longitude": -0.1278}
+
+
+def test_enter_and_exit_fire_on_transitions_only():
+    enter = FenceTrigger(LONDON, "enter")
+    leave = FenceTrigger(LONDON, "exit")
+    index = GeoFenceIndex()
+    index.add(enter)
+    index.add(leave)
+    assert index.match(OUTSIDE) == []  # first position is only a baseline
+    assert index.match(INSIDE) == [enter]
+    assert index.match(INSIDE) == []
+    assert index.match(OUTSIDE) == [leave]
+    assert index.match(OUTSIDE) == []
+
+
+def test_devices_are_tracked_separately():
+    enter = FenceTrigger(LONDON)
+    index = GeoFenceIndex()
+    index.add(enter)
+    index.match(OUTSIDE)
+    index.match({**INSIDE, "device_id": "watch"})
+    assert index.match(INSIDE) == [enter]
+    assert index.match({**OUTSIDE, "device_id": "watch"}) == []
+
+
+def test_fence_added_while_inside_does_not_fire_enter():
+    index = GeoFenceIndex()
+    index.match(INSIDE)
+    enter = FenceTrigger(LONDON)
+    index.add(enter)
+    assert index.match(INSIDE) == []
+    assert index.match(OUTSIDE) == []
+    assert index.match(INSIDE) == [enter]
+
+
+def test_polygon_and_circle_containment():
+    square = PolygonArea(points=[(0, 0), (0, 1), (1, 1), (1, 0)])
+    index = GeoFenceIndex()
+    small = FenceTrigger(square)
+    large = FenceTrigger(CircleArea(latitude=0.5, longitude=0.5, radius_m=200_000))
+    index.add(small)
+    index.add(large)
+    assert set(map(id, index.fences_containing(0.5, 0.5))) == {id(small), id(large)}
+    assert index.fences_containing(1.5, 0.5) == [large]
+    assert index.fences_containing(10, 10) == []
+
+
+def test_removed_fence_and_missing_coordinates():
+    enter = FenceTrigger(LONDON)
+    index = GeoFenceIndex()
+    index.add(enter)
+    index.match(OUTSIDE)
+    index.remove(enter)
+    assert index.match(INSIDE) == []
+    assert index.match({"device_id": "phone"}) == []
+    assert len(index) == 0
+
+
+def test_fence_across_the_antimeridian_is_found_from_both_sides():
+    fiji = FenceTrigger(CircleArea(latitude=-17.0, longitude=179.9, radius_m=50_000))
+    index = GeoFenceIndex()
+    index.add(fiji)
+    assert index.fences_containing(-17.0, 179.95) == [fiji]
+    assert index.fences_containing(-17.0, -179.9) == [fiji]
+    assert index.fences_containing(-17.0, -179.0) == []
+
+    index.match({"device_id": "boat", "latitude": -17.0, "longitude": -178.0})
+    position = {"device_id": "boat", "latitude": -17.0, "longitude": -179.95}
+    assert index.match(position) == [fiji]
+
+
+def test_device_state_is_bounded_to_the_most_recent_devices():
+    enter = FenceTrigger(LONDON)
+    index = GeoFenceIndex(max_devices=2)
+    index.add(enter)
+    for device in ("a", "b"):
+        index.match({**OUTSIDE, "device_id": device})
+    index.match({**OUTSIDE, "device_id": "a"})
+    index.match({**OUTSIDE, "device_id": "c"})  # evicts "b", seen least recently
+    assert len(index._devices) == 2
+    assert index.match({**INSIDE, "device_id": "a"}) == [enter]
+    assert index.match({**INSIDE, "device_id": "b"}) == []  # baseline again
@@ -0,0 +1,54 @@
+from command_centre_python.utils.keyword_matcher import (
+    KeywordAutomaton,
+    KeywordCondition,
+    KeywordMatcher,
+    keyword_in,
+)
+
+
+def test_automaton_finds_overlapping_keywords():
+    automaton = KeywordAutomaton([("he", "he"), ("she", "she"), ("hers", "hers")])
+    found = sorted(automaton.scan("ushers"))
+    assert found == [("he", 2, 4), ("hers", 2, 6), ("she", 1, 4)]
+
+
+def test_whole_word_skips_matches_inside_words():
+    cat = KeywordCondition(field="body", keyword="cat", whole_word=True)
+    matcher = KeywordMatcher([cat])
+    assert matcher.find("concatenate the catalog") == set()
+    assert matcher.find("the cat sat") == {cat}
+    assert matcher.find("cat") == {cat}
+    assert matcher.find("(cat)") == {cat}
+    assert matcher.find("cat_food") == set()
+
+
+def test_whole_word_checks_every_occurrence():
+    cat = KeywordCondition(field="body", keyword="cat", whole_word=True)
+    assert KeywordMatcher([cat]).find("bobcat then cat") == {cat}
+    assert keyword_in("bobcat then cat", "cat", whole_word=True)
+    assert not keyword_in("bobcat", "cat", whole_word=True)
+
+
+def test_case_sensitivity():
+    loose = KeywordCondition(field="body", keyword="Urgent")
+    exact = KeywordCondition(field="body", keyword="URGENT", case_sensitive=True)
+    matcher = KeywordMatcher([loose, exact])
+    assert matcher.find("this is urgent") == {loose}
+    assert matcher.find("URGENT: reply") == {loose, exact}
+
+
+def test_matcher_agrees_with_keyword_in():
+    keywords = ["on", "one", "bone", "on call"]
+    conditions = [
+        KeywordCondition(field="body", keyword=keyword, whole_word=whole_word)
+        for keyword in keywords
+        for whole_word in (False, True)
+    ]
+    matcher = KeywordMatcher(conditions)
+    for text in ["one bone", "on call", "Bones", "someone", "on"]:
+        expected = {
+            condition
+            for condition in conditions
+            if keyword_in(text, condition.keyword, whole_word=condition.whole_word)
+        }
+        assert matcher.find(text) == expected, text
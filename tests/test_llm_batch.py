@@ -0,0 +1,87 @@
+import asyncio
+
+from command_centre_python.utils.llm_batch import (
+    BatchConditionEvaluator,
+    estimate_tokens,
+    parse_boolean_array,
+)
+
+
+def _evaluator(reply, **options):
+    """An evaluator whose batched replies come from ``reply(prompt, count)``."""
+    prompts, singles = [], []
+
+    async def complete(prompt, count):
+        prompts.append(prompt)
+        return reply(prompt, count)
+
+    async def evaluate_one(condition, data):
+        singles.append((condition, data))
+        return data["n"] % 2 == 0
+
+    evaluator = BatchConditionEvaluator(complete, evaluate_one, **options)
+    return evaluator, prompts, singles
+
+
+def test_parse_boolean_array_accepts_only_the_right_count():
+    assert parse_boolean_array('Sure: [true, "False", false]', 3) == [
+        True,
+        False,
+        False,
+    ]
+    assert parse_boolean_array("[true, false]", 3) is None
+    assert parse_boolean_array("[true, 1]", 2) is None
+    assert parse_boolean_array("true", 1) is None
+
+
+def test_one_reply_answers_the_whole_batch():
+    evaluator, prompts, singles = _evaluator(
+        lambda prompt, count: str([n % 3 == 0 for n in range(count)]).lower()
+    )
+    entries = [{"n": n} for n in range(4)]
+    results = asyncio.run(evaluator.evaluate_entries("n is a multiple of 3", entries))
+    assert results == [True, False, False, True]
+    assert len(prompts) == 1
+    assert "4 booleans" in prompts[0]
+    assert singles == []
+
+
+def test_batches_are_capped_by_size_and_token_budget():
+    evaluator, prompts, _ = _evaluator(
+        lambda prompt, count: str([True] * count).lower(), max_batch_size=3
+    )
+    asyncio.run(evaluator.evaluate_entries("c", [{"n": n} for n in range(8)]))
+    assert sorted(prompt.count("Data:") for prompt in prompts) == [2, 3, 3]
+
+    evaluator, prompts, _ = _evaluator(
+        lambda prompt, count: str([True] * count).lower(), max_prompt_tokens=150
+    )
+    entries = [{"n": n, "text": "x" * 120} for n in range(6)]
+    asyncio.run(evaluator.evaluate_entries("c", entries))
+    assert len(prompts) > 1
+    assert all(estimate_tokens(prompt) <= 150 for prompt in prompts)
+    assert sum(prompt.count("Data:") for prompt in prompts) == 6
+
+
+def test_an_unreadable_reply_falls_back_to_one_call_per_item():
+    evaluator, _, singles = _evaluator(lambda prompt, count: "I am not sure")
+    results = asyncio.run(evaluator.evaluate_conditions(["a", "b"], {"n": 2}))
+    assert results == [True, True]
+    assert len(singles) == 2
+    assert (evaluator.batches, evaluator.fallbacks) == (1, 1)
+
+
+def test_a_reply_with_the_wrong_count_falls_back():
+    evaluator, _, singles = _evaluator(lambda prompt, count: "[true]")
+    entries = [{"n": 1}, {"n": 2}, {"n": 3}]
+    results = asyncio.run(evaluator.evaluate_entries("c", entries))
+    assert results == [False, True, False]
+    assert len(singles) == 3
+    assert evaluator.fallbacks == 1
+
+
+def test_a_single_item_skips_the_batch_prompt():
+    evaluator, prompts, singles = _evaluator(lambda prompt, count: "[]")
+    assert asyncio.run(evaluator.evaluate_entries("c", [{"n": 4}])) == [True]
+    assert prompts == []
+    assert len(singles) == 1
@@ -0,0 +1,72 @@
+from command_centre_python.utils import llm_cache
+from command_centre_python.utils.llm_cache import (
+    LLMResultCache,
+    SQLiteCacheStore,
+    content_key,
+)
+
+
+def _clock(monkeypatch, start=1000.0):
+    now = [start]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_content_key_ignores_dict_order_and_surrounding_whitespace():
+    assert content_key("m", " hi ", {"a": 1, "b": 2}) == content_key(
+        "m", "hi", {"b": 2, "a": 1}
+    )
+    assert content_key("m", "hi") != content_key("m", "hello")
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = _clock(monkeypatch)
+    cache = LLMResultCache(ttl=60)
+    cache.set("a", True)
+    cache.set("b", False, ttl=10)
+    now[0] += 30
+    assert cache.get("a") is True
+    assert cache.get("b") is None
+    now[0] += 30
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 2, 2)
+    assert len(cache) == 0
+
+
+def test_the_least_recently_used_entry_is_evicted_first():
+    cache = LLMResultCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_the_store_outlives_the_process_and_refills_memory(tmp_path, monkeypatch):
+    now = _clock(monkeypatch)
+    path = str(tmp_path / "cache.db")
+    store = SQLiteCacheStore(path)
+    cache = LLMResultCache(store=store, ttl=60)
+    cache.set("a", {"met": True})
+    cache.set("short", [1, 2], ttl=5)
+    store.close()
+
+    store = SQLiteCacheStore(path)
+    try:
+        reopened = LLMResultCache(store=store, max_entries=1)
+        assert reopened.get("a") == {"met": True}
+        assert reopened.stats()["store_hits"] == 1
+        # The stored result is now in memory.
+        assert reopened.get("a") == {"met": True}
+        assert reopened.stats()["hits"] == 1
+        now[0] += 10
+        assert reopened.get("short") is None
+        assert store.purge_expired() == 1
+        reopened.invalidate("a")
+        assert store.get("a") is None
+        assert reopened.get("a") is None
+    finally:
+        store.close()
@@ -0,0 +1,79 @@
+import asyncio
+
+from command_centre_python.utils.llm_cascade import ModelCascade
+from command_centre_python.utils.llm_providers import FakeLLMProvider, LLMResponse
+
+
+def _provider(answers):
+    """A fake answering each model with ``answers[model]``."""
+    return FakeLLMProvider(lambda model, system, prompt: answers[model](model))
+
+
+def _response(text, confidence=1.0, flagged=False):
+    return lambda model: LLMResponse(
+        text=text,
+        model=model,
+        provider="fake",
+        confidence=confidence,
+        flagged=flagged,
+    )
+
+
+def test_a_good_small_answer_does_not_escalate():
+    provider = _provider({"small": _response("True"), "large": _response("False")})
+    cascade = ModelCascade(provider, ["small", "large"])
+    response = asyncio.run(cascade.complete("", "q"))
+    assert response.model == "small"
+    assert [model for model, _ in provider.calls] == ["small"]
+    assert cascade.stats()["escalations"] == {}
+
+
+def test_malformed_low_confidence_and_flagged_answers_escalate():
+    provider = _provider(
+        {
+            "small": _response("maybe"),
+            "medium": _response("True", confidence=0.4),
+            "large": _response("True", flagged=True),
+            "huge": _response("False"),
+        }
+    )
+    cascade = ModelCascade(provider, ["small", "medium", "large", "huge"])
+    response = asyncio.run(
+        cascade.complete("", "q", validate=lambda text: text in ("True", "False"))
+    )
+    assert response.model == "huge"
+    assert response.text == "False"
+    assert cascade.stats()["escalations"] == {
+        "malformed": 1,
+        "low_confidence": 1,
+        "flagged": 1,
+    }
+
+
+def test_the_last_model_answers_whatever_its_quality():
+    provider = _provider({"small": _response("?"), "large": _response("??")})
+    cascade = ModelCascade(provider, ["small", "large"])
+    response = asyncio.run(cascade.complete("", "q", validate=lambda text: False))
+    assert response.model == "large"
+    assert cascade.stats()["calls"] == {"small": 1, "large": 1}
+
+
+def test_a_remembered_decision_skips_the_smaller_models():
+    provider = _provider(
+        {"small": _response("True", confidence=0.1), "large": _response("True")}
+    )
+    cascade = ModelCascade(provider, ["small", "large"])
+
+    async def run():
+        await cascade.complete("", "q", key="condition")
+        await cascade.complete("", "q", key="condition")
+        await cascade.complete("", "q", key="other", min_confidence=0.0)
+
+    asyncio.run(run())
+    assert [model for model, _ in provider.calls] == [
+        "small",
+        "large",
+        "large",
+        "small",
+    ]
+    assert cascade.stats()["skipped"] == 1
@@ -0,0 +1,110 @@
+import asyncio
+
+from command_centre_python.utils import llm_gateway
+from command_centre_python.utils.llm_gateway import LLMGateway
+from command_centre_python.utils.llm_providers import (
+    FakeLLMProvider,
+    LLMProviderError,
+)
+
+
+def test_identical_concurrent_requests_share_one_call():
+    provider = FakeLLMProvider(latency=0.01)
+    gateway = LLMGateway(provider)
+
+    async def run():
+        return await asyncio.gather(
+            gateway.complete("m", "s", "q"),
+            gateway.complete("m", "s", "q"),
+            gateway.complete("m", "s", "other"),
+        )
+
+    first, second, _ = asyncio.run(run())
+    assert first is second
+    assert provider.calls == [("m", "q"), ("m", "other")]
+    assert gateway.stats()["m"]["coalesced"] == 1
+
+
+def test_calls_per_model_are_capped():
+    running = [0]
+    peak = [0]
+
+    class Tracking(FakeLLMProvider):
+        async def complete(self, model, system, prompt, **kwargs):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            try:
+                return await super().complete(model, system, prompt, **kwargs)
+            finally:
+                running[0] -= 1
+
+    gateway = LLMGateway(Tracking(latency=0.01), model_limits={"m": 2})
+
+    async def run():
+        await asyncio.gather(*(gateway.complete("m", "", str(i)) for i in range(6)))
+
+    asyncio.run(run())
+    assert peak[0] == 2
+    assert gateway.stats()["m"]["requests"] == 6
+
+
+def test_rate_limited_calls_are_retried_with_backoff(monkeypatch):
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(llm_gateway.asyncio, "sleep", record)
+    failures = [2]
+
+    def respond(model, system, prompt):
+        if failures[0]:
+            failures[0] -= 1
+            raise LLMProviderError("slow down", status_code=429)
+        return "True"
+
+    gateway = LLMGateway(FakeLLMProvider(respond), retry_delay=1.0)
+    response = asyncio.run(gateway.complete("m", "", "q"))
+    assert response.text == "True"
+    # Jitter keeps each delay within half to one and a half of its step.
+    assert len(delays) == 2
+    assert 0.5 <= delays[0] <= 1.5 and 1.0 <= delays[1] <= 3.0
+    stats = gateway.stats()["m"]
+    assert (stats["rate_limited"], stats["retries"], stats["errors"]) == (2, 2, 0)
+
+
+def test_other_errors_and_exhausted_retries_are_raised(monkeypatch):
+    async def no_wait(delay):
+        pass
+
+    monkeypatch.setattr(llm_gateway.asyncio, "sleep", no_wait)
+
+    def respond(model, system, prompt):
+        raise LLMProviderError("nope", status_code=int(prompt))
+
+    provider = FakeLLMProvider(respond)
+    gateway = LLMGateway(provider, max_retries=2)
+    for status, calls in (("500", 1), ("429", 3)):
+        provider.calls.clear()
+        try:
+            asyncio.run(gateway.complete("m", "", status))
+        except LLMProviderError as e:
+            assert e.status_code == int(status)
+        else:
+            raise AssertionError("the error was swallowed")
+        assert len(provider.calls) == calls
+
+
+def test_a_shared_gateway_works_from_a_second_loop():
+    gateway = LLMGateway(FakeLLMProvider(latency=0.01), model_limits={"m": 1})
+
+    async def run():
+        return await asyncio.gather(
+            gateway.complete("m", "", "q"), gateway.complete("m", "", "r")
+        )
+
+    asyncio.run(run())
+    responses = asyncio.run(asyncio.wait_for(run(), 1.0))
+    assert [response.text for response in responses] == ["True", "True"]
@@ -0,0 +1,37 @@
+import asyncio
+
+from command_centre_python.utils.llm_providers import FakeLLMProvider
+from command_centre_python.utils.llm_router import LatencyRouter
+
+
+def test_a_provider_that_slows_down_loses_its_rank():
+    a_latency = [0.005]
+    a = FakeLLMProvider(latency=lambda: a_latency[0], name="a")
+    b = FakeLLMProvider(latency=0.05, name="b")
+    router = LatencyRouter(
+        {"m": [(a, "m"), (b, "m")]}, min_samples=3, initial_hedge_delay=0.2
+    )
+
+    async def run():
+        for _ in range(4):
+            await router.complete("m", "", "q")
+        assert router.candidates("m")[0][0] is a
+        a_latency[0] = 1.0
+        for _ in range(6):
+            await router.complete("m", "", "q")
+            # Let the cancelled hedge loser record its elapsed time.
+            await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert router.candidates("m")[0][0] is b
+    assert router.hedge_wins >= 3
+
+
+def test_a_failed_call_fails_over_without_counting_a_hedge():
+    a = FakeLLMProvider(name="a", error_rate=1.0)
+    b = FakeLLMProvider(name="b")
+    router = LatencyRouter({"m": [(a, "m"), (b, "m")]})
+    response = asyncio.run(router.complete("m", "", "q"))
+    assert response.provider == "b"
+    assert router.failovers == 1
+    assert router.hedges == router.hedge_wins == 0
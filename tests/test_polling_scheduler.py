@@ -0,0 +1,131 @@
+import threading
+import time
+
+from command_centre_python.utils import polling_scheduler
+from command_centre_python.utils.polling_scheduler import (
+    AdaptiveInterval,
+    PollingScheduler,
+    RateBudget,
+    _PollJob,
+)
+from command_centre_python.utils.triggers import PollingTriggerDispatcher
+
+
+class CalendarPoller(PollingTriggerDispatcher):
+    update_interval = 60
+
+    def _poll_and_handle_events(self):
+        return 0
+
+
+class AdaptivePoller(CalendarPoller):
+    adaptive_polling = True
+
+
+def test_adaptive_interval_backs_off_and_speeds_up_within_bounds():
+    interval = AdaptiveInterval(10, min_interval=5, max_interval=40)
+    assert [interval.update(0) for _ in range(3)] == [20, 40, 40]
+    assert [interval.update(3) for _ in range(4)] == [20, 10, 5, 5]
+
+
+def test_pollers_keep_a_fixed_interval_unless_they_opt_in():
+    scheduler = PollingScheduler()
+    assert PollingScheduler._adaptive_interval(CalendarPoller()) is None
+    scheduler.add(CalendarPoller(), "calendar")
+    (job,) = scheduler._jobs.values()
+    scheduler.stop()
+    assert scheduler.interval(job) == 60
+    assert job.stats()["interval"] is None
+
+
+def test_opted_in_pollers_default_to_a_quarter_and_eight_times_the_interval():
+    adaptive = PollingScheduler._adaptive_interval(AdaptivePoller())
+    assert (adaptive.min_interval, adaptive.max_interval) == (15, 480)
+
+    bounded = AdaptivePoller()
+    bounded.max_interval = 120
+    assert PollingScheduler._adaptive_interval(bounded).max_interval == 120
+
+
+def test_rate_budget_reports_the_wait_once_spent():
+    budget = RateBudget(calls=2, period=10)
+    assert budget.reserve() == 0
+    assert budget.reserve() == 0
+    assert 0 < budget.reserve() <= 5
+
+
+class SlowPoller(CalendarPoller):
+    """Polls for ``duration`` seconds, tracking concurrency per provider."""
+
+    running = {}
+    peaks = {}
+    lock = threading.Lock()
+
+    def __init__(self, provider, duration, interval=0.01):
+        self.provider = provider
+        self.duration = duration
+        self.update_interval = interval
+        self.self_overlap = False
+        self.active = False
+
+    def _poll_and_handle_events(self):
+        with self.lock:
+            self.self_overlap |= self.active
+            self.active = True
+            running = self.running[self.provider] = (
+                self.running.get(self.provider, 0) + 1
+            )
+            self.peaks[self.provider] = max(self.peaks.get(self.provider, 0), running)
+        time.sleep(self.duration)
+        with self.lock:
+            self.running[self.provider] -= 1
+            self.active = False
+        return 0
+
+
+def _run_for(scheduler, pollers, seconds):
+    for poller in pollers:
+        scheduler.add(poller, poller.provider)
+    time.sleep(seconds)
+    stats = [scheduler.stats(poller) for poller in pollers]
+    scheduler.stop()
+    return stats
+
+
+def test_polls_per_provider_are_capped_and_extra_due_polls_deferred():
+    SlowPoller.running, SlowPoller.peaks = {}, {}
+    scheduler = PollingScheduler(
+        max_workers=8, max_concurrent_per_provider=2, provider_limits={"solo": 1}
+    )
+    pollers = [SlowPoller("shared", 0.03) for _ in range(4)]
+    pollers += [SlowPoller("solo", 0.03) for _ in range(2)]
+    stats = _run_for(scheduler, pollers, 0.3)
+    assert SlowPoller.peaks == {"shared": 2, "solo": 1}
+    assert all(s["polls"] > 0 for s in stats)
+    assert sum(s["deferred"] for s in stats) > 0
+
+
+def test_jitter_spreads_polls_around_the_interval(monkeypatch):
+    scheduler = PollingScheduler(jitter=0.1)
+    job = _PollJob(CalendarPoller(), "calendar", None)
+    samples = [scheduler._jittered(job) for _ in range(200)]
+    assert all(54 <= sample <= 66 for sample in samples)
+    assert len(set(samples)) > 1
+
+    # First polls are spread over a tenth of the interval.
+    monkeypatch.setattr(polling_scheduler.time, "monotonic", lambda: 1000.0)
+    monkeypatch.setattr(polling_scheduler.random, "uniform", lambda low, high: high)
+    pushed = []
+    scheduler._push = lambda job, due: pushed.append(due)
+    scheduler.add(CalendarPoller(), "calendar")
+    scheduler.stop()
+    assert pushed == [1006.0]
+
+
+def test_an_overrunning_poll_is_counted_and_never_overlaps_itself():
+    poller = SlowPoller("slow", duration=0.05, interval=0.01)
+    (stats,) = _run_for(PollingScheduler(), [poller], 0.3)
+    assert stats["overruns"] >= 2
+    assert stats["overruns"] == stats["polls"]
+    assert stats["last_duration"] >= 0.05
+    assert not poller.self_overlap
@@ -0,0 +1,62 @@
+import asyncio
+
+from command_centre_python.core import priority_scheduler
+from command_centre_python.core.priority_scheduler import PriorityScheduler
+
+
+async def _answer(value):
+    return value
+
+
+def test_runs_most_urgent_work_first():
+    async def run():
+        scheduler = PriorityScheduler(workers=1)
+        order = []
+
+        async def record(priority):
+            order.append(priority)
+
+        # Everything is queued before the single worker first runs.
+        futures = [
+            scheduler.submit(priority, lambda p=priority: record(p))
+            for priority in (3, 5, 1, 4, 2)
+        ]
+        await asyncio.gather(*futures)
+        await scheduler.stop()
+        return order
+
+    assert asyncio.run(run()) == [1, 2, 3, 4, 5]
+
+
+def test_workers_follow_the_running_loop():
+    scheduler = PriorityScheduler(workers=2)
+    assert asyncio.run(scheduler.run(3, lambda: _answer(42))) == 42
+
+    async def second():
+        return await asyncio.wait_for(scheduler.run(3, lambda: _answer(43)), 1.0)
+
+    assert asyncio.run(second()) == 43
+
+
+def test_aging_reaches_work_queued_behind_newer_items(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(priority_scheduler.time, "monotonic", lambda: now[0])
+
+    async def run():
+        scheduler = PriorityScheduler(workers=0, aging_interval=1.0)
+        scheduler.submit(5, lambda: _answer("old"))
+        now[0] = 2.5
+        scheduler.submit(3, lambda: _answer("new"))
+        scheduler._age()
+        # The old item reached level 3 behind the newer one.
+        assert scheduler.queue_depths() == {1: 0, 2: 0, 3: 2, 4: 0, 5: 0}
+        now[0] = 3.0
+        scheduler._age()
+        depths = scheduler.queue_depths()
+        first = scheduler._next()
+        return depths, await first.work(), scheduler.promoted
+
+    depths, first, promoted = asyncio.run(run())
+    assert depths == {1: 0, 2: 1, 3: 1, 4: 0, 5: 0}
+    assert first == "old"
+    assert promoted == 2
@@ -0,0 +1,161 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from command_centre_python.utils import triggers
+from command_centre_python.utils.triggers import (
+    SemanticTrigger,
+    SemanticTriggerDispatcher,
+)
+from command_centre_python.utils.watermark_store import WatermarkStore
+
+START = datetime(2024, 1, 1)
+
+
+def _entry(entry_id: int, cpu: float, minutes: int):
+    return triggers.DataEntry(
+        id=entry_id,
+        name=f"reading {entry_id}",
+        description="",
+        data={"cpu": cpu},
+        updated_at=START + timedelta(minutes=minutes),
+    )
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    """An in-memory change feed standing in for ``DataEntry.changed_since``."""
+    entries = []
+    queries = []
+
+    async def changed_since(since):
+        queries.append(since)
+        return sorted(
+            (entry for entry in entries if since is None or entry.updated_at >= since),
+            key=lambda entry: (entry.updated_at, entry.id),
+        )
+
+    monkeypatch.setattr(triggers.DataEntry, "changed_since", changed_since)
+    return entries, queries
+
+
+def _recording_trigger(condition: str, fired: list, trigger_id=None) -> SemanticTrigger:
+    async def action(data_entry, metadata):
+        fired.append((condition, data_entry.id))
+
+    return SemanticTrigger(condition, action, trigger_id=trigger_id)
+
+
+def test_only_entries_past_the_watermark_are_evaluated(feed, tmp_path):
+    entries, queries = feed
+    dispatcher = SemanticTriggerDispatcher(
+        None, WatermarkStore(str(tmp_path / "watermarks.json"))
+    )
+    fired = []
+    dispatcher.register_trigger(_recording_trigger("cpu is above 90", fired))
+    entries.extend([_entry(1, 95, 1), _entry(2, 50, 2)])
+    asyncio.run(dispatcher.monitor_data_sources())
+    assert fired == [("cpu is above 90", 1)]
+
+    entries.append(_entry(3, 99, 3))
+    asyncio.run(dispatcher.monitor_data_sources())
+    assert fired == [("cpu is above 90", 1), ("cpu is above 90", 3)]
+    assert queries == [None, START + timedelta(minutes=2)]
+
+
+def test_new_trigger_is_backfilled_over_existing_entries(feed, tmp_path):
+    entries, queries = feed
+    dispatcher = SemanticTriggerDispatcher(
+        None, WatermarkStore(str(tmp_path / "watermarks.json"))
+    )
+    fired = []
+    dispatcher.register_trigger(_recording_trigger("cpu is above 90", fired))
+    entries.extend([_entry(1, 95, 1), _entry(2, 10, 2)])
+    asyncio.run(dispatcher.monitor_data_sources())
+
+    dispatcher.register_trigger(_recording_trigger("cpu is below 20", fired))
+    entries.append(_entry(3, 5, 3))
+    asyncio.run(dispatcher.monitor_data_sources())
+    assert sorted(fired) == [
+        ("cpu is above 90", 1),
+        ("cpu is below 20", 2),
+        ("cpu is below 20", 3),
+    ]
+    # The new trigger has no watermark, so the whole feed was read again.
+    assert queries[-1] is None
+
+
+def test_watermarks_survive_a_restart(feed, tmp_path):
+    entries, _ = feed
+    path = str(tmp_path / "watermarks.json")
+    fired = []
+    entries.extend([_entry(1, 95, 1), _entry(2, 96, 2)])
+    dispatcher = SemanticTriggerDispatcher(None, WatermarkStore(path))
+    dispatcher.register_trigger(
+        _recording_trigger("cpu is above 90", fired, trigger_id="hot")
+    )
+    asyncio.run(dispatcher.monitor_data_sources())
+
+    restarted = SemanticTriggerDispatcher(None, WatermarkStore(path))
+    restarted.register_trigger(
+        _recording_trigger("cpu is above 90", fired, trigger_id="hot")
+    )
+    entries.append(_entry(3, 97, 3))
+    asyncio.run(restarted.monitor_data_sources())
+    assert [entry_id for _, entry_id in fired] == [1, 2, 3]
+
+
+def test_new_trigger_with_a_previously_used_condition_is_backfilled(feed, tmp_path):
+    entries, _ = feed
+    dispatcher = SemanticTriggerDispatcher(
+        None, WatermarkStore(str(tmp_path / "watermarks.json"))
+    )
+    fired = []
+    first = _recording_trigger("cpu is above 90", fired)
+    dispatcher.register_trigger(first)
+    entries.extend([_entry(1, 95, 1), _entry(2, 96, 2)])
+    asyncio.run(dispatcher.monitor_data_sources())
+    dispatcher.unregister_trigger(first)
+
+    fired.clear()
+    dispatcher.register_trigger(_recording_trigger("cpu is above 90", fired))
+    asyncio.run(dispatcher.monitor_data_sources())
+    assert [entry_id for _, entry_id in fired] == [1, 2]
+
+
+def test_default_watermark_path_does_not_depend_on_the_working_directory(
+    monkeypatch, tmp_path
+):
+    monkeypatch.chdir(tmp_path)
+    dispatcher = SemanticTriggerDispatcher(None)
+    assert os.path.isabs(dispatcher.watermark_store.path)
+    assert dispatcher.watermark_store.path.startswith(triggers.DATA_DIR)
+
+
+def test_an_undecided_entry_holds_the_watermark(feed, monkeypatch, tmp_path):
+    entries, queries = feed
+    answers = {95: True, 50: None, 99: True}
+
+    async def ask(condition, data_entry):
+        return answers[data_entry.data["cpu"]]
+
+    async def unreadable(prompt, count):
+        return "no idea"
+
+    monkeypatch.setattr(triggers, "_ask_condition", ask)
+    monkeypatch.setattr(triggers.batch_evaluator, "complete", unreadable)
+    dispatcher = SemanticTriggerDispatcher(
+        None, WatermarkStore(str(tmp_path / "watermarks.json"))
+    )
+    fired = []
+    dispatcher.register_trigger(_recording_trigger("cpu looks abnormal", fired))
+    entries.extend([_entry(1, 95, 1), _entry(2, 50, 2), _entry(3, 99, 3)])
+    asyncio.run(dispatcher.monitor_data_sources())
+    assert fired == [("cpu looks abnormal", 1)]
+
+    answers[50] = False
+    asyncio.run(dispatcher.monitor_data_sources())
+    assert fired == [("cpu looks abnormal", 1), ("cpu looks abnormal", 3)]
+    assert queries[-1] == START + timedelta(minutes=1)
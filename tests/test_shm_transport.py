@@ -0,0 +1,125 @@
+import asyncio
+import random
+import sys
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from command_centre_python.core import shm_transport
+from command_centre_python.core.shm_transport import (
+    EventCodec,
+    RingEventSink,
+    ShmRingBuffer,
+)
+
+
+class Reading(BaseModel):
+    sensor: str
+    value: float
+
+
+class Unregistered(BaseModel):
+    n: int
+
+
+@pytest.fixture
+def ring():
+    ring = ShmRingBuffer(capacity=64)
+    yield ring
+    ring.close()
+
+
+def test_a_frame_that_would_straddle_the_end_wraps_to_the_start(ring):
+    assert ring.try_write(1, b"a" * 34)  # 40 bytes at 0..40
+    assert ring.read_batch() == [(1, b"a" * 34)]
+    # 32 bytes do not fit in the last 24; they go to the start behind a marker.
+    assert ring.try_write(2, b"b" * 26)
+    assert ring.read_batch() == [(2, b"b" * 26)]
+    assert ring._position(shm_transport.TAIL_OFFSET) == 96
+    assert ring._position(shm_transport.HEAD_OFFSET) == 96
+
+
+def test_a_frame_is_refused_until_the_consumer_frees_room(ring):
+    assert ring.try_write(1, b"a" * 34)
+    assert not ring.try_write(2, b"b" * 26)  # padding plus frame exceed the room
+    assert ring.read_batch(max_frames=1) == [(1, b"a" * 34)]
+    assert ring.try_write(2, b"b" * 26)
+    with pytest.raises(ValueError):
+        ring.try_write(3, b"c" * 64)
+
+
+def test_frames_survive_many_wraparounds_in_order(ring):
+    generator = random.Random(7)
+    sent, received = [], []
+    for n in range(500):
+        payload = bytes([n % 256]) * generator.randrange(0, 27)
+        while not ring.try_write(n % 7, payload):
+            received.extend(ring.read_batch(max_frames=generator.randrange(1, 4)))
+        sent.append((n % 7, payload))
+    received.extend(ring.read_batch())
+    assert received == sent
+
+
+def test_codec_round_trips_events_by_type_id():
+    codec = EventCodec.for_classes([Unregistered, Reading])
+    type_id, body = codec.encode(Reading(sensor="t1", value=21.5))
+    assert type_id == 1
+    assert codec.decode(type_id, body) == Reading(sensor="t1", value=21.5)
+    # The other process rebuilds the codec from the same ordered names.
+    assert EventCodec(codec.event_types).decode(type_id, body).sensor == "t1"
+    with pytest.raises(ValueError):
+        EventCodec.for_classes([Reading]).encode(Unregistered(n=1))
+
+
+def test_a_full_ring_does_not_block_the_event_loop():
+    ring = ShmRingBuffer(capacity=256)
+    codec = EventCodec.for_classes([Reading])
+    sink = RingEventSink(ring, codec, full_timeout=5.0)
+    events = [Reading(sensor=str(n), value=n) for n in range(20)]
+
+    async def run():
+        started = time.monotonic()
+        sink.dispatch_many_threadsafe(events[:10])
+        sink.dispatch_threadsafe(events[10])
+        sink.dispatch_many_threadsafe(events[11:])
+        return time.monotonic() - started
+
+    try:
+        elapsed = asyncio.run(run())
+        received = []
+        deadline = time.monotonic() + 5
+        while len(received) < len(events) and time.monotonic() < deadline:
+            received.extend(codec.decode(*frame) for frame in ring.read_batch())
+            time.sleep(0.001)
+        sink.close()
+    finally:
+        ring.close()
+    assert elapsed < 0.5
+    assert received == events
+    assert sink.dropped == 0
+
+
+def test_attaching_leaves_the_segment_to_its_creator(monkeypatch):
+    owner = ShmRingBuffer(capacity=64)
+    unregistered = []
+    try:
+        with monkeypatch.context() as patch:
+            patch.setattr(
+                shm_transport.resource_tracker,
+                "unregister",
+                lambda name, rtype: unregistered.append((name, rtype)),
+            )
+            # The creating process keeps its own registration.
+            ShmRingBuffer(name=owner.name).close()
+            assert unregistered == []
+            # A process outside the creator's tree must not let its tracker
+            # unlink the segment when it exits.
+            patch.setattr(shm_transport, "_created", set())
+            ShmRingBuffer(name=owner.name).close()
+    finally:
+        owner.close()
+    if sys.version_info < (3, 13):
+        assert unregistered == [("/" + owner.name, "shared_memory")]
+    else:
+        assert unregistered == []
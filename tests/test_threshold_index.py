@@ -0,0 +1,101 @@
+from command_centre_python.utils.threshold_index import (
+    ThresholdCondition,
+    ThresholdIndex,
+)
+from command_centre_python.utils.triggers import Trigger
+
+
+class ThresholdTrigger(Trigger):
+    def __init__(self, *conditions: ThresholdCondition, match: str = "all"):
+        self.conditions = list(conditions)
+        self.threshold_match = match
+
+    def threshold_conditions(self):
+        return self.conditions
+
+
+def _index(*triggers: Trigger) -> ThresholdIndex:
+    index = ThresholdIndex()
+    for trigger in triggers:
+        index.add(trigger)
+    return index
+
+
+def test_above_and_below_are_strict_at_the_threshold():
+    above = ThresholdTrigger(
+        ThresholdCondition(field="cpu", comparison="above", value=90)
+    )
+    below = ThresholdTrigger(
+        ThresholdCondition(field="cpu", comparison="below", value=10)
+    )
+    index = _index(above, below)
+    assert index.match({"cpu": 90}) == []
+    assert index.match({"cpu": 90.0001}) == [above]
+    assert index.match({"cpu": 10}) == []
+    assert index.match({"cpu": 9.9999}) == [below]
+
+
+def test_equal_matches_only_the_exact_value():
+    equal = ThresholdTrigger(
+        ThresholdCondition(field="level", comparison="equal", value=3)
+    )
+    index = _index(equal)
+    assert index.match({"level": 3}) == [equal]
+    assert index.match({"level": 3.0}) == [equal]
+    assert index.match({"level": 2.999}) == []
+
+
+def test_non_numeric_and_nan_readings_never_match():
+    above = ThresholdTrigger(
+        ThresholdCondition(field="cpu", comparison="above", value=0)
+    )
+    index = _index(above)
+    assert index.match({"cpu": "95"}) == []
+    assert index.match({"cpu": True}) == []
+    assert index.match({"cpu": float("nan")}) == []
+    assert index.match({}) == []
+
+
+def test_all_and_any_conditions():
+    window = [
+        ThresholdCondition(field="temp", comparison="above", value=20),
+        ThresholdCondition(field="temp", comparison="below", value=30),
+    ]
+    inside = ThresholdTrigger(*window)
+    outside = ThresholdTrigger(
+        ThresholdCondition(field="temp", comparison="below", value=20),
+        ThresholdCondition(field="temp", comparison="above", value=30),
+        match="any",
+    )
+    index = _index(inside, outside)
+    assert index.match({"temp": 25}) == [inside]
+    assert index.match({"temp": 20}) == []
+    assert index.match({"temp": 35}) == [outside]
+    assert index.match_many([{"temp": 25}, {"temp": 15}, {"temp": 30}]) == [
+        [inside],
+        [outside],
+        [],
+    ]
+
+
+def test_where_restricts_conditions_to_matching_events():
+    acme = ThresholdTrigger(
+        ThresholdCondition(
+            field="price", comparison="above", value=100, where={"symbol": "ACME"}
+        )
+    )
+    index = _index(acme)
+    assert index.match({"symbol": "ACME", "price": 101}) == [acme]
+    assert index.match({"symbol": "INIT", "price": 101}) == []
+
+
+def test_removed_triggers_stop_matching():
+    first = ThresholdTrigger(ThresholdCondition(field="x", comparison="above", value=1))
+    second = ThresholdTrigger(
+        ThresholdCondition(field="x", comparison="above", value=2)
+    )
+    index = _index(first, second)
+    assert index.match({"x": 5}) == [first, second]
+    index.remove(first)
+    assert index.match({"x": 5}) == [second]
+    assert len(index) == 1